@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from app.core.metrics import metrics
+
+
+def normalize_text(text: str) -> str:
+    """Normalisiert Text für inhaltsbasierte Cache-Keys (Unicode NFC, Whitespace zusammengefasst)."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_cache_key(*parts) -> str:
+    """Erzeugt einen stabilen SHA-256-Key aus beliebigen JSON-serialisierbaren Teilen."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_lookup(name: str, hit: bool):
+    """Zählt einen Cache-Zugriff unter cache.<name>.hit / .miss und aktualisiert cache.<name>.hit_ratio."""
+    metrics.incr(f"cache.{name}.{'hit' if hit else 'miss'}")
+    metrics.ratio(f"cache.{name}.hit_ratio", f"cache.{name}.hit", (f"cache.{name}.hit", f"cache.{name}.miss"))
+
+
+class LRUCache:
+    """Größenbegrenzter, threadsicherer In-Memory-LRU-Cache mit optionalem Ablaufzeitpunkt pro Eintrag."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds: float = None):
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DocumentCache:
+    """
+    Inhaltsadressierter Cache: In-Process-LRU vor einer Mongo-Collection.
+    Abgelaufene Einträge werden von Mongo über einen TTL-Index auf 'expireAt' entfernt
+    (registriert in app.core.indexes).
+    Hits und Misses werden unter 'cache.<name>.hit' / 'cache.<name>.miss' gezählt,
+    die Trefferquote unter 'cache.<name>.hit_ratio'.
+    """
+
+    def __init__(self, name: str, get_collection, ttl_seconds: int, maxsize: int):
+        # get_collection: Callable, das die (async) Mongo-Collection liefert
+        self.name = name
+        self._get_collection = get_collection
+        self.ttl_seconds = ttl_seconds
+        self._lru = LRUCache(maxsize)
+
+    @property
+    def collection(self):
+        return self._get_collection()
+
+    async def get(self, key: str):
+        value = self._lru.get(key)
+        if value is None:
+            doc = await self.collection.find_one(
+                {"_id": key, "expireAt": {"$gt": datetime.utcnow()}},
+                {"value": 1, "expireAt": 1}
+            )
+            if doc:
+                value = doc["value"]
+                remaining = (doc["expireAt"] - datetime.utcnow()).total_seconds()
+                self._lru.set(key, value, remaining)
+
+        record_lookup(self.name, value is not None)
+        return value
+
+    async def set(self, key: str, value):
+        self._lru.set(key, value, self.ttl_seconds)
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "value": value,
+                "createdAt": now,
+                "expireAt": now + timedelta(seconds=self.ttl_seconds)
+            }},
+            upsert=True
+        )
+
+
+def new_fingerprint():
+    """Inkrementeller BLAKE2b-Hash für Upload-Bytes (update() pro Block, hexdigest() am Ende)."""
+    return hashlib.blake2b(digest_size=32)
+
+
+class DiskLRUCache:
+    """
+    Größenbegrenzter JSON-Cache in einem Verzeichnis (eine Datei pro Key).
+    Die Reihenfolge für die Verdrängung ergibt sich aus der mtime, die bei jedem Treffer
+    aktualisiert wird. Die Methoden sind blockierend und werden über asyncio.to_thread aufgerufen.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._estimated_bytes = None  # Wird beim ersten Schreiben per Verzeichnis-Scan ermittelt
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, key: str, value):
+        os.makedirs(self.directory, exist_ok=True)
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        temp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, self._path(key))
+
+        with self._lock:
+            if self._estimated_bytes is None:
+                self._evict()
+            else:
+                self._estimated_bytes += len(payload)
+                if self._estimated_bytes > self.max_bytes:
+                    self._evict()
+
+    def _evict(self):
+        """Löscht die am längsten nicht genutzten Dateien, bis das Limit eingehalten ist."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._estimated_bytes = total
+
+
+class ExtractionCache:
+    """
+    Cache für extrahierte Dokumenttexte, adressiert über den Fingerprint der Upload-Bytes.
+    Zwei Ebenen: In-Process-LRU vor einem größenbegrenzten Verzeichnis auf der Platte.
+
+    Metriken: cache.<name>.hit / .miss, cache.<name>.hit_ratio und
+    cache.<name>.bytes_saved (Upload-Bytes, die nicht erneut geparst werden mussten).
+    """
+
+    def __init__(self, name: str, directory: str, max_disk_bytes: int, maxsize: int):
+        self.name = name
+        self._lru = LRUCache(maxsize)
+        self._disk = DiskLRUCache(directory, max_disk_bytes)
+
+    async def get(self, key: str, size: int):
+        value = self._lru.get(key)
+        if value is None:
+            value = await asyncio.to_thread(self._disk.get, key)
+            if value is not None:
+                self._lru.set(key, value)
+
+        record_lookup(self.name, value is not None)
+        if value is not None:
+            metrics.incr(f"cache.{self.name}.bytes_saved", size)
+        return value
+
+    async def set(self, key: str, value):
+        self._lru.set(key, value)
+        await asyncio.to_thread(self._disk.set, key, value)
@@ -0,0 +1,103 @@
+# 🪜 Modell-Kaskade: erst das schnelle Modell, bei ungültiger Ausgabe das große
+import time
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.llm import llm
+from app.core.metrics import metrics
+from app.schemas import AnalysisResult, CoverLetterAnalysisResult, CoverLetterDocument, Resume, jobdescription
+
+# Task -> Pydantic-Schema, gegen das die Ausgabe des schnellen Modells geprüft wird
+TASK_SCHEMAS = {
+    "structure_resume": Resume,
+    "structure_coverletter": CoverLetterDocument,
+    "structure_jobdescription": jobdescription,
+    "analysis": AnalysisResult,
+    "coverletter_analysis": CoverLetterAnalysisResult,
+    # Analyse optimierter Dokumente: Ausgabe in der Form von RESUME_SCHEMA bzw. COVERLETTER_SCHEMA
+    "analysis_optimized_resume": Resume,
+    "analysis_optimized_coverletter": CoverLetterDocument,
+}
+
+# Tasks der ATS-Analysen; ihre Modelle sind Teil der Cache-Keys der Analyse-Ergebnisse
+ANALYSIS_TASKS = ("analysis", "coverletter_analysis", "analysis_optimized_resume", "analysis_optimized_coverletter")
+
+
+def _split(value: str) -> tuple:
+    return tuple(item.strip() for item in (value or "").split(",") if item.strip())
+
+
+class ModelCascade:
+    """
+    Führt JSON-Completions pro Task über eine Modell-Kaskade aus.
+
+    Für Tasks aus LLM_CASCADE_TASKS werden zuerst die Modelle aus LLM_CASCADE_MODELS
+    (schnell, günstig) versucht. Ist die Ausgabe kein gültiges JSON oder besteht sie die
+    Validierung gegen das Pydantic-Schema des Tasks nicht, wird auf das nächste Modell und
+    zuletzt auf OPENAI_MODEL eskaliert. Die Ausgabe des letzten Modells wird ungeprüft übernommen.
+
+    Metriken pro Task: llm.<task>.calls, .escalations (eskalierte Aufrufe), .escalation_rate,
+    .latency_seconds (Summe) und .latency_avg_seconds.
+    """
+
+    def __init__(self, fast_models: tuple, tasks: tuple, final_model: str):
+        self.fast_models = fast_models
+        self.tasks = tasks
+        self.final_model = final_model
+
+    def models(self, task: str) -> list:
+        """Modelle in Kaskadenreihenfolge; auch Teil der Cache-Keys der Ergebnisse."""
+        if task not in self.tasks or task not in TASK_SCHEMAS:
+            return [self.final_model]
+        return [model for model in self.fast_models if model != self.final_model] + [self.final_model]
+
+    def accepts(self, task: str, result) -> bool:
+        """
+        Ob eine Ausgabe des ersten Modells der Kaskade ohne Eskalation übernommen würde
+        (z. B. Ergebnisse der OpenAI Batch API, die nur das erste Modell ausführt).
+        """
+        return len(self.models(task)) == 1 or self.is_valid(task, result)
+
+    @staticmethod
+    def is_valid(task: str, result) -> bool:
+        try:
+            TASK_SCHEMAS[task].model_validate(result)
+            return True
+        except ValidationError:
+            return False
+
+    async def chat_json(self, task: str, messages: list, status_prefix: str, **kwargs):
+        """Wie llm.chat_json, Rückgabe: Tupel (result_json, status)."""
+        models = self.models(task)
+        started = time.perf_counter()
+        for position, model in enumerate(models):
+            result, status = await llm.chat_json(messages, status_prefix, model=model, **kwargs)
+            if position == len(models) - 1:
+                break
+            if status == f"{status_prefix}_complete" and self.is_valid(task, result):
+                break
+
+        metrics.incr(f"llm.{task}.calls")
+        if position > 0:
+            metrics.incr(f"llm.{task}.escalations")
+        metrics.incr(f"llm.{task}.latency_seconds", time.perf_counter() - started)
+        metrics.ratio(f"llm.{task}.escalation_rate", f"llm.{task}.escalations", (f"llm.{task}.calls",))
+        metrics.ratio(f"llm.{task}.latency_avg_seconds", f"llm.{task}.latency_seconds", (f"llm.{task}.calls",))
+        return result, status
+
+
+def failure_detail(result, status: str, limit: int = 500) -> str:
+    """Fehlertext für HTTP-Antworten: Fehler des LLM-Gateways bzw. Anfang der nicht parsebaren Antwort."""
+    if isinstance(result, dict) and result.get("error"):
+        reason = str(result["error"])
+    elif isinstance(result, dict) and "raw_response" in result:
+        reason = f"Antwort ist kein gültiges JSON: {str(result['raw_response'])[:limit]}"
+    else:
+        reason = "unbekannter Fehler"
+    return f"{status}: {reason}"
+
+
+cascade = ModelCascade(
+    fast_models=_split(settings.LLM_CASCADE_MODELS),
+    tasks=_split(settings.LLM_CASCADE_TASKS),
+    final_model=settings.OPENAI_MODEL
+)
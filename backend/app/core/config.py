@@ -3,6 +3,7 @@
 from pydantic import BaseModel
 from functools import lru_cache
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Lade die Umgebungsvariablen aus der .env Datei
@@ -19,9 +20,73 @@ class Settings(BaseModel):
     OPENAI_API_KEY: str = os.getenv("RESUME_OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4")
     MAX_TOKENS: int = 12000
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "120"))  # Sekunden pro Completion
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Gleichzeitige Completions pro Worker
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    # Startwerte der Rate-Limit-Budgets pro Modell; werden durch die x-ratelimit-* Header ersetzt
+    LLM_RPM_LIMIT: int = int(os.getenv("LLM_RPM_LIMIT", "500"))
+    LLM_TPM_LIMIT: int = int(os.getenv("LLM_TPM_LIMIT", "30000"))
+    LLM_COMPLETION_TOKENS_ESTIMATE: int = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "1000"))  # ohne max_tokens
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "5"))  # bei 429/5xx
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # Sekunden, verdoppelt pro Versuch
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+    # Modell-Kaskade: diese Modelle zuerst, OPENAI_MODEL nur bei ungültiger Ausgabe (leer = keine Kaskade)
+    LLM_CASCADE_MODELS: str = os.getenv("LLM_CASCADE_MODELS", "gpt-4o-mini")
+    LLM_CASCADE_TASKS: str = os.getenv(
+        "LLM_CASCADE_TASKS",
+        "structure_resume,structure_coverletter,structure_jobdescription,analysis,coverletter_analysis,"
+        "analysis_optimized_resume,analysis_optimized_coverletter"
+    )
+    # Bei Änderungen an den Prompts erhöhen, damit gecachte Ergebnisse nicht wiederverwendet werden
+    PROMPT_VERSION: str = "2"
+    # Anteil der Prompts, für die prompt.<name>.tokens_before/_after gemessen werden (0 = aus, 1 = jeder)
+    PROMPT_TOKEN_SAMPLE_RATE: float = float(os.getenv("PROMPT_TOKEN_SAMPLE_RATE", "0.01"))
+
+    # Strukturierung langer Rohtexte in Abschnitten (Lebenslauf, Stellenbeschreibung)
+    # Darüber wird zerlegt (Budget pro Chunk); übliche Lebensläufe (1-3k Tokens) bleiben ein Aufruf
+    STRUCTURE_CHUNK_TOKENS: int = int(os.getenv("STRUCTURE_CHUNK_TOKENS", "6000"))
+    STRUCTURE_MAX_CHUNKS: int = int(os.getenv("STRUCTURE_MAX_CHUNKS", "16"))
+
+    # Batch-Strukturierung (/extract-structured-documents)
+    STRUCTURE_BATCH_MAX_ITEMS: int = int(os.getenv("STRUCTURE_BATCH_MAX_ITEMS", "100"))
+    STRUCTURE_BATCH_CONCURRENCY: int = int(os.getenv("STRUCTURE_BATCH_CONCURRENCY", "4"))  # Gleichzeitige Completions pro Batch
+
+    # Ranking (/analysis-ats-rank)
+    RANK_MAX_JOBDESCRIPTIONS: int = int(os.getenv("RANK_MAX_JOBDESCRIPTIONS", "50"))
+    RANK_TOP_K: int = int(os.getenv("RANK_TOP_K", "3"))  # Stellen mit LLM-Analyse
+
+    # Cache Konfiguration
+    STRUCTURE_CACHE_TTL_SECONDS: int = int(os.getenv("STRUCTURE_CACHE_TTL_SECONDS", str(60 * 60 * 24 * 30)))  # 30 Tage
+    STRUCTURE_CACHE_MAXSIZE: int = int(os.getenv("STRUCTURE_CACHE_MAXSIZE", "512"))  # Einträge im In-Process-LRU
+    ANALYSIS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(60 * 60 * 24 * 7)))  # 7 Tage
+    ANALYSIS_CACHE_MAXSIZE: int = int(os.getenv("ANALYSIS_CACHE_MAXSIZE", "256"))
+
+    # Hintergrund-Jobs
+    JOB_BACKEND: str = os.getenv("JOB_BACKEND", "memory")  # memory oder redis
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_DELAY: float = float(os.getenv("JOB_RETRY_BASE_DELAY", "5"))  # Sekunden, verdoppelt pro Versuch
+
+    # Text-Extraktion (/extract-text)
+    EXTRACT_WORKERS: int = int(os.getenv("EXTRACT_WORKERS", "2"))  # Prozesse im Extraktions-Pool
+    EXTRACT_MAX_UPLOAD_BYTES: int = int(os.getenv("EXTRACT_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+    EXTRACT_MAX_PAGES: int = int(os.getenv("EXTRACT_MAX_PAGES", "100"))
+    EXTRACT_PAGES_PER_TASK: int = int(os.getenv("EXTRACT_PAGES_PER_TASK", "4"))
+    EXTRACT_CACHE_DIR: str = os.getenv("EXTRACT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "resume_extract_cache"))
+    EXTRACT_CACHE_MAX_DISK_BYTES: int = int(os.getenv("EXTRACT_CACHE_MAX_DISK_BYTES", str(256 * 1024 * 1024)))
+    EXTRACT_CACHE_MAXSIZE: int = int(os.getenv("EXTRACT_CACHE_MAXSIZE", "128"))  # Einträge im In-Process-LRU
+    EXTRACT_SPOOL_THRESHOLD_BYTES: int = int(os.getenv("EXTRACT_SPOOL_THRESHOLD_BYTES", str(1024 * 1024)))  # darüber temporäre Datei
+
+    # Listenansichten (Cursor-Pagination)
+    LISTING_MAX_LIMIT: int = int(os.getenv("LISTING_MAX_LIMIT", "200"))
 
     # MongoDB Konfiguration
     MONGODB_URI: str = os.getenv("MONGODB_URI")
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
 
     # Sicherheitskonfiguration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -1,26 +1,77 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 import certifi
 from app.core.config import settings
 
-# MongoDB Client initialisieren
-client_db = MongoClient(
-    settings.MONGODB_URI,
-    tls=True,
-    tlsCAFile=certifi.where()
-)
 
-# Collections für Resume
-db_resume = client_db["resume_db"]
-collection_resume = db_resume["resumes"]
+class Database:
+    """
+    Gemeinsamer asynchroner MongoDB-Client der Anwendung.
+    Der Client (und damit der Connection-Pool) wird im Lifespan-Hook der
+    FastAPI-App erzeugt und beim Herunterfahren geschlossen.
+    """
 
-# Collections für Cover Letter
-db_coverletter = client_db["coverletter_db"]
-collection_coverletter = db_coverletter["coverLetter"]
+    def __init__(self):
+        self.client = None
 
-# Collections für jobdescription
-db_jobdesc = client_db["jobposting_db"]
-collection_jobdesc = db_jobdesc["jobPostings"]
+    def connect(self):
+        self.client = AsyncMongoClient(
+            settings.MONGODB_URI,
+            tls=True,
+            tlsCAFile=certifi.where(),
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS
+        )
 
-# Collection für die Analyse
-db_analysis = client_db["analysis_db"]
-collection_analysis = db_analysis["analysis"]
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    def _collection(self, db_name: str, collection_name: str):
+        if self.client is None:
+            raise RuntimeError("MongoDB-Client ist nicht initialisiert. Wurde der Lifespan-Hook gestartet?")
+        return self.client[db_name][collection_name]
+
+    # Collections für Resume
+    @property
+    def collection_resume(self):
+        return self._collection("resume_db", "resumes")
+
+    # Collections für Cover Letter
+    @property
+    def collection_coverletter(self):
+        return self._collection("coverletter_db", "coverLetter")
+
+    # Collections für jobdescription
+    @property
+    def collection_jobdesc(self):
+        return self._collection("jobposting_db", "jobPostings")
+
+    # Collection für die Analyse
+    @property
+    def collection_analysis(self):
+        return self._collection("analysis_db", "analysis")
+
+    # Collection für den inhaltsadressierten Strukturierungs-Cache
+    @property
+    def collection_structure_cache(self):
+        return self._collection("cache_db", "structureCache")
+
+    # Collection für den Analyse-Cache (Ergebnisse je Eingabe-Hash)
+    @property
+    def collection_analysis_cache(self):
+        return self._collection("cache_db", "analysisCache")
+
+    # Collection für Hintergrund-Jobs
+    @property
+    def collection_jobs(self):
+        return self._collection("jobs_db", "jobs")
+
+    # Collection für die denormalisierten Benutzer-Statistiken
+    @property
+    def collection_user_stats(self):
+        return self._collection("user_db", "user_stats")
+
+
+db = Database()
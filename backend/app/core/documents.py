@@ -0,0 +1,109 @@
+import asyncio
+from typing import NamedTuple
+from bson import ObjectId
+from fastapi import HTTPException
+from app.core.database import db
+
+
+class DocumentRequest(NamedTuple):
+    collection: object
+    document_id: str
+    field: str   # Benötigtes Inhaltsfeld, z. B. "structured_resume"
+    label: str   # Bezeichnung für Fehlermeldungen, z. B. "Resume"
+
+
+async def load_owned_documents(user_id: str, *requests: DocumentRequest) -> list:
+    """
+    Lädt mehrere Dokumente parallel und prüft die Zugehörigkeit zum Benutzer an einer Stelle.
+
+    Pro Dokument werden nur userId, status und das angeforderte Feld geladen.
+    Wirft 404, wenn ein Dokument fehlt, und 403, wenn es einem anderen Benutzer gehört.
+    Rückgabe: Liste der Dokumente in der Reihenfolge der Requests.
+    """
+    docs = await asyncio.gather(*(
+        request.collection.find_one(
+            {"_id": ObjectId(request.document_id)},
+            {"userId": 1, "status": 1, request.field: 1}
+        )
+        for request in requests
+    ))
+
+    for request, doc in zip(requests, docs):
+        if not doc:
+            raise HTTPException(status_code=404, detail=f"{request.label} not found.")
+    for request, doc in zip(requests, docs):
+        if str(doc.get("userId", "")) != user_id:
+            raise HTTPException(status_code=403, detail=f"Access forbidden: {request.label} does not belong to this user.")
+
+    return list(docs)
+
+
+async def load_analysis_documents(
+    user_id: str,
+    resume_id: str,
+    coverletter_id: str,
+    jobdescription_id: str,
+    resume_field: str = "structured_resume",
+    coverletter_field: str = "structured_coverletter"
+):
+    """
+    Lädt Resume, Anschreiben und Stellenbeschreibung für die Analyse-Endpunkte in einem Roundtrip.
+    Rückgabe: Tupel (resume_doc, coverletter_doc, jobdesc_doc)
+    """
+    resume_doc, coverletter_doc, jobdesc_doc = await load_owned_documents(
+        user_id,
+        DocumentRequest(db.collection_resume, resume_id, resume_field, "Resume"),
+        DocumentRequest(db.collection_coverletter, coverletter_id, coverletter_field, "Cover letter"),
+        DocumentRequest(db.collection_jobdesc, jobdescription_id, "structured_jobdescription", "Job description")
+    )
+    return resume_doc, coverletter_doc, jobdesc_doc
+
+
+# Felder für Listenansichten; die Vorschau wird in der Datenbank aus rawText berechnet,
+# damit rawText und die strukturierten Inhalte nicht übertragen werden.
+LISTING_PREVIEW_LENGTH = 100
+LISTING_PROJECTION = {
+    "title": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+    "status": 1,
+    "preview": {"$substrCP": [{"$ifNull": ["$rawText", ""]}, 0, LISTING_PREVIEW_LENGTH]}
+}
+
+
+async def list_documents(collection, user_id: str, limit: int = None, after: str = None) -> tuple:
+    """
+    Cursor-basierte Seite der Dokumente eines Benutzers, sortiert nach _id.
+
+    :param limit: Einträge pro Seite; None = alle Dokumente (bisheriges Verhalten der Listen,
+                  das Frontend folgt next_cursor nicht)
+    :param after: _id des letzten Dokuments der vorherigen Seite (None für die erste Seite)
+    Rückgabe: Tupel (Liste der Listeneinträge, next_cursor oder None auf der letzten Seite)
+    """
+    query = {"userId": user_id}
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        query["_id"] = {"$gt": ObjectId(after)}
+
+    pipeline = [{"$match": query}, {"$sort": {"_id": 1}}]
+    if limit is not None:
+        # Ein Dokument mehr laden, um zu erkennen, ob es eine weitere Seite gibt
+        pipeline.append({"$limit": limit + 1})
+    pipeline.append({"$project": LISTING_PROJECTION})
+    cursor = await collection.aggregate(pipeline)
+    docs = await cursor.to_list(length=None)
+
+    items = [
+        {
+            "id": str(doc["_id"]),
+            "title": doc.get("title", ""),
+            "createdAt": doc["createdAt"].isoformat() if doc.get("createdAt") else None,
+            "updatedAt": doc["updatedAt"].isoformat() if doc.get("updatedAt") else None,
+            "status": doc.get("status"),
+            "preview": doc.get("preview", "")
+        }
+        for doc in docs[:limit]
+    ]
+    next_cursor = items[-1]["id"] if limit is not None and len(docs) > limit else None
+    return items, next_cursor
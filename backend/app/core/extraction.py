@@ -0,0 +1,199 @@
+# 📄 Text-Extraktion aus PDF/DOCX in einem Prozess-Pool
+import asyncio
+import io
+import math
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+from fastapi import HTTPException, UploadFile
+from app.core.cache import ExtractionCache, new_fingerprint
+from app.core.config import settings
+
+ALLOWED_EXTENSIONS = ("pdf", "doc", "docx")
+READ_CHUNK_SIZE = 1024 * 1024
+PAGE_SEPARATOR = "\n\n"
+
+
+class UploadSource(NamedTuple):
+    extension: str
+    size: int
+    digest: str         # BLAKE2b der Upload-Bytes
+    data: bytes = None  # Kleine Uploads bleiben im Speicher
+    path: str = None    # Große Uploads liegen in einer temporären Datei
+
+    def open(self):
+        return open(self.path, "rb") if self.path else io.BytesIO(self.data)
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.extension}-{self.digest}"
+
+
+# ------------------------------------------------------------
+# Funktionen für die Worker-Prozesse (auf Modulebene, damit sie picklebar sind)
+# ------------------------------------------------------------
+def _pdf_page_count(source: UploadSource) -> int:
+    from PyPDF2 import PdfReader
+    with source.open() as stream:
+        return len(PdfReader(stream).pages)
+
+
+def _pdf_pages(source: UploadSource, start: int, end: int) -> list:
+    from PyPDF2 import PdfReader
+    with source.open() as stream:
+        pages = PdfReader(stream).pages
+        return [pages[index].extract_text() or "" for index in range(start, end)]
+
+
+def _docx_text(source: UploadSource) -> str:
+    import mammoth
+    with source.open() as stream:
+        return mammoth.extract_raw_text(stream).value
+
+
+class ExtractionEngine:
+    """
+    Extrahiert Text aus Uploads, ohne den Event-Loop zu blockieren.
+
+    - spool(): liest den Upload in Blöcken, prüft die Größe und lagert große Dateien
+      in eine temporäre Datei aus
+    - page_count(): prüft das Seitenlimit (vor dem Extrahieren bzw. Streamen)
+    - iter_pages(): extrahiert PDF-Seiten blockweise parallel im Prozess-Pool und
+      liefert den Text Seite für Seite in der richtigen Reihenfolge
+    """
+
+    def __init__(self, workers: int, max_bytes: int, max_pages: int, pages_per_task: int, spool_threshold: int):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self.spool_threshold = spool_threshold
+        self._pool = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Erst beim ersten Upload starten; "spawn", damit keine Threads/Sockets der App geforkt werden
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def spool(self, upload: UploadFile) -> UploadSource:
+        extension = (upload.filename or "").lower().split(".")[-1]
+        if extension not in ALLOWED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="Nur PDF- und Word-Dateien sind erlaubt")
+
+        buffer = []
+        size = 0
+        temp = None
+        hasher = new_fingerprint()
+        try:
+            while chunk := await upload.read(READ_CHUNK_SIZE):
+                size += len(chunk)
+                hasher.update(chunk)
+                if size > self.max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Datei ist zu groß (maximal {self.max_bytes // (1024 * 1024)} MB)"
+                    )
+                if temp is not None:
+                    await asyncio.to_thread(temp.write, chunk)
+                    continue
+                buffer.append(chunk)
+                if size > self.spool_threshold:
+                    temp = tempfile.NamedTemporaryFile(prefix="extract_", suffix=f".{extension}", delete=False)
+                    await asyncio.to_thread(temp.write, b"".join(buffer))
+                    buffer = []
+        except BaseException:
+            if temp is not None:
+                temp.close()
+                os.unlink(temp.name)
+            raise
+
+        if temp is not None:
+            temp.close()
+            return UploadSource(extension, size, hasher.hexdigest(), path=temp.name)
+        return UploadSource(extension, size, hasher.hexdigest(), data=b"".join(buffer))
+
+    def cleanup(self, source: UploadSource):
+        if source is not None and source.path:
+            try:
+                os.unlink(source.path)
+            except FileNotFoundError:
+                pass
+
+    async def page_count(self, source: UploadSource) -> int:
+        if source.extension != "pdf":
+            return 1
+        loop = asyncio.get_running_loop()
+        count = await loop.run_in_executor(self.pool, _pdf_page_count, source)
+        if count > self.max_pages:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Dokument hat zu viele Seiten ({count}, maximal {self.max_pages})"
+            )
+        return count
+
+    async def iter_pages(self, source: UploadSource, page_count: int):
+        loop = asyncio.get_running_loop()
+        if source.extension != "pdf":
+            yield await loop.run_in_executor(self.pool, _docx_text, source)
+            return
+
+        # Blöcke so wählen, dass alle Worker beschäftigt sind, aber erste Seiten früh fertig werden
+        step = max(1, min(self.pages_per_task, math.ceil(page_count / self.workers)))
+        tasks = [
+            loop.run_in_executor(self.pool, _pdf_pages, source, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        try:
+            for task in tasks:
+                for text in await task:
+                    yield text
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def extract_pages(self, source: UploadSource) -> list:
+        """Seitentexte eines Uploads; wiederholte Uploads kommen aus dem Fingerprint-Cache."""
+        pages = await extraction_cache.get(source.cache_key, source.size)
+        if pages is None:
+            page_count = await self.page_count(source)
+            pages = [text async for text in self.iter_pages(source, page_count)]
+            await extraction_cache.set(source.cache_key, pages)
+        return pages
+
+    async def extract_text(self, source: UploadSource) -> str:
+        return join_pages(source, await self.extract_pages(source))
+
+
+def join_pages(source: UploadSource, pages: list) -> str:
+    if source.extension != "pdf":
+        return pages[0]
+    return "".join(text + PAGE_SEPARATOR for text in pages)
+
+
+# Extrahierte Seiten, adressiert über den Fingerprint der Upload-Bytes
+extraction_cache = ExtractionCache(
+    "extract",
+    directory=settings.EXTRACT_CACHE_DIR,
+    max_disk_bytes=settings.EXTRACT_CACHE_MAX_DISK_BYTES,
+    maxsize=settings.EXTRACT_CACHE_MAXSIZE
+)
+
+extraction_engine = ExtractionEngine(
+    workers=settings.EXTRACT_WORKERS,
+    max_bytes=settings.EXTRACT_MAX_UPLOAD_BYTES,
+    max_pages=settings.EXTRACT_MAX_PAGES,
+    pages_per_task=settings.EXTRACT_PAGES_PER_TASK,
+    spool_threshold=settings.EXTRACT_SPOOL_THRESHOLD_BYTES
+)
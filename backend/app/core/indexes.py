@@ -0,0 +1,55 @@
+# 🗂️ Deklarative Index-Registry für MongoDB
+from typing import NamedTuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.core.database import db
+
+
+class IndexSpec(NamedTuple):
+    collection: str  # Name der Collection-Property auf `db`, z. B. "collection_resume"
+    keys: list       # [(Feld, Richtung), ...]
+    options: dict = {}
+
+    def model(self) -> IndexModel:
+        # Standardnamen von Mongo (z. B. "userId_1_createdAt_-1"), damit bereits
+        # vorhandene Indexe mit gleichen Feldern wiedererkannt werden
+        return IndexModel(self.keys, **self.options)
+
+
+# Felder, nach denen die Router filtern und sortieren; neue Abfragen hier ergänzen
+INDEXES = [
+    # Dokumente eines Benutzers: Listen (Cursor-Pagination über _id), Zählen, Status-Filter
+    *[
+        spec
+        for collection in ("collection_resume", "collection_coverletter", "collection_jobdesc")
+        for spec in (
+            IndexSpec(collection, [("userId", ASCENDING), ("createdAt", DESCENDING)]),
+            IndexSpec(collection, [("userId", ASCENDING), ("status", ASCENDING)]),
+            IndexSpec(collection, [("userId", ASCENDING), ("_id", ASCENDING)]),
+        )
+    ],
+
+    # Analysen: pro Benutzer sowie Lookups über die analysierten Dokumente
+    IndexSpec("collection_analysis", [("userId", ASCENDING), ("createdAt", DESCENDING)]),
+    IndexSpec("collection_analysis", [("resumeId", ASCENDING)]),
+    IndexSpec("collection_analysis", [("jobdescriptionId", ASCENDING)]),
+
+    # Strukturierungs- und Analyse-Cache: abgelaufene Einträge entfernt Mongo über den TTL-Index
+    IndexSpec("collection_structure_cache", [("expireAt", ASCENDING)], {"expireAfterSeconds": 0}),
+    IndexSpec("collection_analysis_cache", [("expireAt", ASCENDING)], {"expireAfterSeconds": 0}),
+]
+
+
+async def ensure_indexes(specs: list = None) -> dict:
+    """
+    Legt alle registrierten Indexe an (idempotent: vorhandene Indexe mit gleicher
+    Definition bleiben unverändert). Wird im Lifespan-Hook beim Start aufgerufen.
+    Rückgabe: {Collection-Property: [Indexnamen]}
+    """
+    by_collection = {}
+    for spec in specs or INDEXES:
+        by_collection.setdefault(spec.collection, []).append(spec.model())
+
+    created = {}
+    for collection, models in by_collection.items():
+        created[collection] = await getattr(db, collection).create_indexes(models)
+    return created
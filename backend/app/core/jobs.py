@@ -0,0 +1,319 @@
+import asyncio
+import inspect
+import json
+import logging
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from fastapi import HTTPException
+from functools import lru_cache
+from typing import Any
+from pydantic import ConfigDict, ValidationError, create_model
+from app.core.config import settings
+from app.core.database import db
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryJobBackend:
+    """
+    Warteschlange im Prozess (asyncio.Queue). Die Queue geht beim Neustart verloren;
+    JobManager.recover() stellt offene Jobs beim Start aus der Mongo-Collection wieder her.
+    """
+
+    durable = False
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+
+    async def push(self, job_id: str):
+        await self._queue.put(job_id)
+
+    async def pop(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        pass
+
+
+class RedisJobBackend:
+    """
+    Warteschlange in einer Redis-Liste (LPUSH/BRPOP), geteilt zwischen mehreren Worker-Prozessen.
+    Benötigt das optionale Paket 'redis' (redis.asyncio).
+    """
+
+    durable = True
+
+    def __init__(self, url: str, queue_name: str = "jobs"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("JOB_BACKEND=redis benötigt das Paket 'redis' (pip install redis).") from e
+        self._redis = redis.from_url(url)
+        self._queue_name = queue_name
+
+    async def push(self, job_id: str):
+        await self._redis.lpush(self._queue_name, job_id)
+
+    async def pop(self, timeout: float):
+        item = await self._redis.brpop(self._queue_name, timeout=max(1, int(timeout)))
+        if item is None:
+            return None
+        return item[1].decode() if isinstance(item[1], bytes) else item[1]
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_backend(name: str, redis_url: str = None):
+    if name == "memory":
+        return MemoryJobBackend()
+    if name == "redis":
+        return RedisJobBackend(redis_url)
+    raise ValueError(f"Unbekanntes JOB_BACKEND: {name}")
+
+
+@lru_cache(maxsize=None)
+def params_model(handler):
+    """
+    Pydantic-Modell aus der Signatur eines FastAPI-Endpunkts: Typannotationen und
+    Query(...)-Objekte (Defaults, Constraints wie ge/le) werden übernommen.
+    """
+    fields = {}
+    for name, parameter in inspect.signature(handler).parameters.items():
+        annotation = Any if parameter.annotation is inspect.Parameter.empty else parameter.annotation
+        default = ... if parameter.default is inspect.Parameter.empty else parameter.default
+        fields[name] = (annotation, default)
+    return create_model(
+        f"{handler.__name__}_params",
+        __config__=ConfigDict(extra="forbid"),
+        **fields
+    )
+
+
+def resolve_params(handler, params: dict) -> dict:
+    """
+    Validiert die übergebenen Parameter wie FastAPI gegen die Signatur eines Endpunkts
+    (Typumwandlung, z. B. "false" -> False, "3" -> 3; Defaults und Constraints der Query(...)-Objekte).
+    Fehlende Pflichtparameter, unbekannte Parameter und ungültige Werte führen zu HTTP 422.
+    """
+    try:
+        validated = params_model(handler).model_validate(params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    return {name: getattr(validated, name) for name in validated.model_fields}
+
+
+def _result_failed(result) -> bool:
+    """
+    Erkennt Ergebnisse, deren Status auf '_failed' endet (z. B. Timeout beim LLM-Aufruf).
+    Der Handler hat das Ergebnis dann bereits gespeichert; der Job gilt als endgültig fehlgeschlagen.
+    """
+    if not isinstance(result, dict):
+        return False
+    return any(
+        isinstance(result.get(key), str) and result[key].endswith("_failed")
+        for key in ("status", "optimize_status")
+    )
+
+
+class JobManager:
+    """
+    Hintergrund-Jobs für LLM-lastige Endpunkte.
+
+    - submit() legt den Job in der Mongo-Collection 'jobs' an und gibt sofort die Job-ID zurück
+    - Ein Pool von asyncio-Workern holt Job-IDs aus dem Backend (Memory oder Redis) und führt den
+      registrierten Handler aus
+    - Nur Exceptions des Handlers werden mit exponentiellem Backoff wiederholt. Ergebnisse mit
+      Status '*_failed' und HTTP-Fehler gelten als endgültig: die Handler sind nicht idempotent
+      (z. B. legt analysis_ats pro Aufruf ein Analyse-Dokument an), und transiente Fehler des
+      Providers (429/5xx) wiederholt bereits das LLM-Gateway vor dem Speichern
+    """
+
+    def __init__(self, get_collection, backend, workers: int, max_attempts: int, retry_base_delay: float):
+        self._get_collection = get_collection
+        self.backend = backend
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self._handlers = {}
+        self._tasks = []
+        self._retry_tasks = set()
+
+    @property
+    def collection(self):
+        return self._get_collection()
+
+    def register(self, job_type: str, handler):
+        self._handlers[job_type] = handler
+
+    @property
+    def job_types(self) -> list:
+        return sorted(self._handlers)
+
+    async def submit(self, job_type: str, params: dict, user_id: str) -> str:
+        handler = self._handlers.get(job_type)
+        if handler is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job type: {job_type}")
+        params = resolve_params(handler, {**params, "user_id": user_id})
+
+        now = datetime.utcnow()
+        result = await self.collection.insert_one({
+            "type": job_type,
+            "params": params,
+            "userId": user_id,
+            "status": "queued",
+            "attempts": 0,
+            "createdAt": now,
+            "updatedAt": now
+        })
+        job_id = str(result.inserted_id)
+        await self.backend.push(job_id)
+        metrics.incr(f"jobs.{job_type}.submitted")
+        return job_id
+
+    async def get(self, job_id: str):
+        return await self.collection.find_one({"_id": ObjectId(job_id)})
+
+    async def recover(self):
+        """
+        Startup-Sweep für Backends ohne persistente Queue (memory): nach einem Neustart stehen
+        Jobs in Mongo noch auf 'queued'/'running', ihre IDs sind aber verloren.
+          - 'queued' wird erneut eingereiht (ausstehende Retries mit der verbleibenden Wartezeit)
+          - 'running' wird als 'failed' markiert: der Handler wurde mittendrin abgebrochen und ist
+            nicht idempotent, ein erneuter Lauf könnte Ergebnisse doppelt speichern
+        Setzt einen einzelnen Prozess pro Memory-Backend voraus (wie die Queue selbst).
+        """
+        if self.backend.durable:
+            return
+        now = datetime.utcnow()
+        interrupted = await self.collection.update_many(
+            {"status": "running"},
+            {"$set": {
+                "status": "failed",
+                "error": {"detail": "Job wurde durch einen Neustart des Servers unterbrochen"},
+                "finishedAt": now,
+                "updatedAt": now
+            }}
+        )
+        if interrupted.modified_count:
+            metrics.incr("jobs.interrupted", interrupted.modified_count)
+
+        requeued = 0
+        async for job in self.collection.find({"status": "queued"}, {"retryAt": 1}):
+            retry_at = job.get("retryAt")
+            if retry_at and retry_at > now:
+                self._schedule_retry(str(job["_id"]), (retry_at - now).total_seconds())
+            else:
+                await self.backend.push(str(job["_id"]))
+            requeued += 1
+        if requeued:
+            metrics.incr("jobs.requeued", requeued)
+        logger.info("Job-Recovery: %s erneut eingereiht, %s unterbrochen", requeued, interrupted.modified_count)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in [*self._tasks, *self._retry_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retry_tasks, return_exceptions=True)
+        self._tasks = []
+        self._retry_tasks = set()
+        await self.backend.close()
+
+    async def _worker(self):
+        while True:
+            job_id = await self.backend.pop(timeout=5)
+            if job_id is None:
+                continue
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job %s konnte nicht verarbeitet werden", job_id)
+
+    async def _run(self, job_id: str):
+        job = await self.collection.find_one_and_update(
+            {"_id": ObjectId(job_id), "status": "queued"},
+            {"$set": {"status": "running", "startedAt": datetime.utcnow(), "updatedAt": datetime.utcnow()},
+             "$inc": {"attempts": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            # Bereits von einem anderen Worker übernommen oder abgeschlossen
+            return
+
+        job_type = job["type"]
+        handler = self._handlers.get(job_type)
+        try:
+            if handler is None:
+                raise HTTPException(status_code=500, detail=f"No handler registered for job type: {job_type}")
+            result = await handler(**job["params"])
+        except HTTPException as e:
+            await self._finish(job_id, "failed", error={"status_code": e.status_code, "detail": e.detail})
+            metrics.incr(f"jobs.{job_type}.failed")
+            return
+        except Exception as e:
+            if job["attempts"] < self.max_attempts:
+                delay = self.retry_base_delay * 2 ** (job["attempts"] - 1)
+                await self.collection.update_one(
+                    {"_id": ObjectId(job_id)},
+                    {"$set": {
+                        "status": "queued",
+                        "lastError": str(e),
+                        "retryAt": datetime.utcnow() + timedelta(seconds=delay),
+                        "updatedAt": datetime.utcnow()
+                    }}
+                )
+                self._schedule_retry(job_id, delay)
+                metrics.incr(f"jobs.{job_type}.retried")
+            else:
+                await self._finish(job_id, "failed", error={"detail": str(e)})
+                metrics.incr(f"jobs.{job_type}.failed")
+            return
+
+        if _result_failed(result):
+            error = {"detail": json.dumps(result, ensure_ascii=False, default=str)[:1000]}
+            await self._finish(job_id, "failed", result=result, error=error)
+            metrics.incr(f"jobs.{job_type}.failed")
+            return
+
+        await self._finish(job_id, "completed", result=result)
+        metrics.incr(f"jobs.{job_type}.completed")
+
+    def _schedule_retry(self, job_id: str, delay: float):
+        async def requeue():
+            await asyncio.sleep(delay)
+            await self.backend.push(job_id)
+
+        task = asyncio.create_task(requeue())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    async def _finish(self, job_id: str, status: str, result=None, error=None):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {
+                "status": status,
+                "result": result,
+                "error": error,
+                "finishedAt": now,
+                "updatedAt": now
+            }}
+        )
+
+
+job_manager = JobManager(
+    lambda: db.collection_jobs,
+    backend=create_backend(settings.JOB_BACKEND, settings.REDIS_URL),
+    workers=settings.JOB_WORKERS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_base_delay=settings.JOB_RETRY_BASE_DELAY
+)
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.ratelimit import RateLimiter, backoff_delay, retry_after
+
+# Wiederholbare HTTP-Status: Rate-Limit, Timeout/Konflikt des Providers, Serverfehler
+RETRY_STATUS_CODES = (408, 409, 429)
+
+
+def parse_json_output(ai_output: str, status_prefix: str):
+    """
+    Parst die JSON-Ausgabe des Modells.
+    Rückgabe: Tupel (result_json, "<prefix>_complete") oder ({"raw_response": ...}, "<prefix>_incomplete").
+    """
+    try:
+        return json.loads(ai_output), f"{status_prefix}_complete"
+    except (json.JSONDecodeError, TypeError):
+        return {"raw_response": ai_output}, f"{status_prefix}_incomplete"
+
+
+def record_usage(usage):
+    """
+    Schreibt die Token-Nutzung einer Completion in die Metriken (/metrics).
+    llm.prompt_tokens_cached stammt aus usage.prompt_tokens_details.cached_tokens, also aus
+    dem Präfix, das der Provider aus dem Prompt-Cache bedienen konnte.
+    """
+    if usage is None:
+        return
+    prompt_tokens = usage.prompt_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    metrics.incr("llm.prompt_tokens", prompt_tokens)
+    metrics.incr("llm.prompt_tokens_cached", cached_tokens)
+    metrics.incr("llm.prompt_tokens_uncached", prompt_tokens - cached_tokens)
+    metrics.incr("llm.completion_tokens", usage.completion_tokens or 0)
+
+
+class LLMGateway:
+    """
+    Zentraler Zugang zur OpenAI API für alle Endpunkte.
+
+    - Ein einziger AsyncOpenAI-Client mit gepoolten HTTP-Verbindungen
+    - Begrenzung gleichzeitiger Completions über eine Semaphore
+    - Timeout pro Completion
+    - Budgets für Requests/Tokens pro Minute (RateLimiter): Aufrufe warten in der Warteschlange,
+      statt in ein 429 zu laufen; 429/5xx werden mit exponentiellem Backoff (Jitter) wiederholt.
+      Die Retries des SDK sind deaktiviert (max_retries=0), damit nur hier wiederholt wird.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int,
+        timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        rate_limiter: RateLimiter,
+        max_retries: int,
+        retry_base_delay: float,
+        retry_max_delay: float
+    ):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections
+                ),
+                timeout=timeout
+            )
+        )
+
+    async def chat(
+        self,
+        messages: list,
+        model: str = None,
+        temperature: float = 0.0,
+        response_format: dict = None,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> str:
+        """
+        Führt eine Chat-Completion aus und gibt den Inhalt der ersten Antwort zurück.
+        Wirft asyncio.TimeoutError, wenn die Completion länger als `timeout` Sekunden dauert.
+        """
+        params = {
+            "model": model or settings.OPENAI_MODEL,
+            "messages": messages,
+            "temperature": temperature
+        }
+        if response_format:
+            params["response_format"] = response_format
+        if max_tokens:
+            params["max_tokens"] = max_tokens
+
+        async def send():
+            async with self._semaphore:
+                return await asyncio.wait_for(
+                    self._client.chat.completions.with_raw_response.create(**params),
+                    timeout=timeout or self.timeout
+                )
+
+        estimated_tokens = self.estimate_tokens(params)
+        raw = await self._dispatch(params["model"], estimated_tokens, send)
+        response = raw.parse()
+        record_usage(response.usage)
+        self._settle(params["model"], estimated_tokens, raw.headers, response.usage)
+        return response.choices[0].message.content
+
+    async def stream_chat(
+        self,
+        messages: list,
+        model: str = None,
+        temperature: float = 0.0,
+        response_format: dict = None
+    ):
+        """
+        Streamt eine Chat-Completion und liefert die Textstücke, sobald das Modell sie erzeugt.
+        Der Concurrency-Slot bleibt belegt, bis der Stream vollständig gelesen ist.
+        """
+        params = {
+            "model": model or settings.OPENAI_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+            # Letzter Chunk enthält die Token-Nutzung (ohne choices)
+            "stream_options": {"include_usage": True}
+        }
+        if response_format:
+            params["response_format"] = response_format
+
+        async def send():
+            # Der Slot wird erst nach dem vollständig gelesenen Stream freigegeben (siehe unten)
+            await self._semaphore.acquire()
+            try:
+                return await self._client.chat.completions.with_raw_response.create(**params)
+            except BaseException:
+                self._semaphore.release()
+                raise
+
+        estimated_tokens = self.estimate_tokens(params)
+        raw = await self._dispatch(params["model"], estimated_tokens, send)
+        usage = None
+        try:
+            async for chunk in raw.parse():
+                if chunk.usage:
+                    usage = chunk.usage
+                    record_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            self._semaphore.release()
+            self._settle(params["model"], estimated_tokens, raw.headers, usage)
+
+    @staticmethod
+    def estimate_tokens(params: dict) -> int:
+        """
+        Geschätzte Tokens einer Completion: Prompt (~4 Zeichen pro Token) + max_tokens bzw.
+        LLM_COMPLETION_TOKENS_ESTIMATE. Bewusst ohne Tokenizer: günstig, ohne tiktoken-Abhängigkeit,
+        die Abweichung gleicht settle() mit der tatsächlichen Nutzung aus.
+        """
+        contents = [str(message.get("content") or "") for message in params["messages"]]
+        prompt_tokens = sum(len(content) for content in contents) // 4 + 4 * len(contents)
+        return prompt_tokens + (params.get("max_tokens") or settings.LLM_COMPLETION_TOKENS_ESTIMATE)
+
+    def _settle(self, model: str, estimated_tokens: int, headers, usage):
+        self.rate_limiter.update(model, headers)
+        if usage is not None:
+            self.rate_limiter.settle(model, estimated_tokens, usage.total_tokens or estimated_tokens)
+
+    async def _dispatch(self, model: str, estimated_tokens: int, send):
+        """
+        Reiht einen Aufruf in das Budget des Modells ein und führt send() aus.
+        429, 408/409, 5xx und Verbindungsfehler werden bis zu LLM_MAX_RETRIES-mal wiederholt:
+        Wartezeit aus retry-after bzw. exponentielles Backoff mit Jitter. Nach einem 429 pausieren
+        auch die übrigen Aufrufe des Modells. Metriken: llm.retries, llm.retries.<status>.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(model, estimated_tokens)
+            try:
+                return await send()
+            except (APIStatusError, APIConnectionError) as e:
+                status_code = e.status_code if isinstance(e, APIStatusError) else None
+                headers = e.response.headers if isinstance(e, APIStatusError) else None
+                self.rate_limiter.update(model, headers)
+                # Abgelehnte Requests verbrauchen keine Tokens
+                self.rate_limiter.settle(model, estimated_tokens, 0)
+
+                retryable = status_code is None or status_code in RETRY_STATUS_CODES or status_code >= 500
+                if not retryable or attempt == self.max_retries:
+                    raise
+                delay = retry_after(headers) or backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                if status_code == 429:
+                    self.rate_limiter.pause(model, delay)
+                metrics.incr("llm.retries")
+                metrics.incr(f"llm.retries.{status_code or 'connection'}")
+                await asyncio.sleep(delay)
+
+    async def chat_json(self, messages: list, status_prefix: str, **kwargs):
+        """
+        Führt eine JSON-Completion aus und bildet das Ergebnis auf die Status-Logik
+        der Endpunkte ab.
+
+        Rückgabe: Tupel (result_json, status) mit status
+        "<prefix>_complete", "<prefix>_incomplete" oder "<prefix>_failed".
+        """
+        timeout = kwargs.get("timeout") or self.timeout
+        try:
+            ai_output = await self.chat(messages, response_format={"type": "json_object"}, **kwargs)
+            return parse_json_output(ai_output, status_prefix)
+        except asyncio.TimeoutError:
+            return {"error": f"Timeout nach {timeout} Sekunden"}, f"{status_prefix}_failed"
+        except Exception as e:
+            return {"error": str(e)}, f"{status_prefix}_failed"
+
+    async def aclose(self):
+        await self._client.close()
+
+
+llm = LLMGateway(
+    api_key=settings.OPENAI_API_KEY,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    timeout=settings.OPENAI_TIMEOUT,
+    max_connections=settings.LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+    rate_limiter=RateLimiter(settings.LLM_RPM_LIMIT, settings.LLM_TPM_LIMIT),
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+    retry_max_delay=settings.LLM_RETRY_MAX_DELAY
+)
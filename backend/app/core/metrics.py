@@ -0,0 +1,39 @@
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    """
+    Einfache In-Process-Zähler (z. B. Cache-Hits/-Misses).
+    Die Werte gelten pro Worker-Prozess und werden über /metrics ausgeliefert.
+    """
+
+    def __init__(self):
+        self._counters = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set(self, name: str, value: float):
+        """Setzt einen Momentanwert (z. B. eine Hit-Ratio) statt ihn aufzusummieren."""
+        with self._lock:
+            self._counters[name] = value
+
+    def ratio(self, name: str, numerator: str, denominator_parts: tuple):
+        """Setzt name = numerator / Summe(denominator_parts) aus den aktuellen Zählern."""
+        with self._lock:
+            total = sum(self._counters.get(part, 0) for part in denominator_parts)
+            self._counters[name] = self._counters.get(numerator, 0) / total if total else 0.0
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+
+metrics = Metrics()
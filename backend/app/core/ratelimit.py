@@ -0,0 +1,157 @@
+# 🚦 Token-Bucket für Requests/Tokens pro Minute und Backoff bei 429/5xx
+import asyncio
+import random
+import re
+import time
+from app.core.metrics import metrics
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """Parst Zeitangaben der Rate-Limit-Header ("20ms", "1s", "6m0s", "1h2m3.5s") in Sekunden."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_int(headers, name: str):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(headers) -> float:
+    """Wartezeit aus retry-after-ms / retry-after (falls der Provider sie mitschickt)."""
+    if headers is None:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponentielles Backoff mit vollem Jitter: zufällig in [0, min(maximum, base * 2^attempt)]."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Bucket mit `capacity` Einheiten pro Minute, der kontinuierlich aufgefüllt wird."""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.available = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # Anfragen größer als die Kapazität warten nur auf einen vollen Bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60 / self.capacity
+
+    def take(self, amount: float):
+        # Darf negativ werden (Nachbelastung, wenn der tatsächliche Verbrauch höher war)
+        self._refill(time.monotonic())
+        self.available -= amount
+
+    def sync(self, limit: int = None, remaining: int = None):
+        """Übernimmt Limit und Restbudget aus den Response-Headern des Providers."""
+        self._refill(time.monotonic())
+        if limit:
+            self.capacity = limit
+            self.available = min(self.available, limit)
+        if remaining is not None:
+            self.available = min(self.available, remaining)
+
+
+class ModelBudget:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+
+class RateLimiter:
+    """
+    Verteilt Completions pro Modell auf die Budgets für Requests und Tokens pro Minute.
+
+    - acquire(): reiht den Aufruf ein (FIFO), bis beide Buckets genug Budget haben; die
+      Token-Anzahl wird vorab geschätzt (Prompt-Länge / 4 + erwartete Completion)
+    - settle(): verrechnet die tatsächliche Nutzung (usage) mit der Schätzung
+    - update(): übernimmt x-ratelimit-* Header (Limits und Restbudget des Providers)
+    - pause(): hält nach einem 429 alle wartenden Aufrufe des Modells an
+
+    Startwerte kommen aus LLM_RPM_LIMIT / LLM_TPM_LIMIT und werden durch die Header ersetzt.
+    Metriken: llm.ratelimit.queued, llm.ratelimit.wait_seconds.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._budgets = {}
+
+    def budget(self, model: str) -> ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = self._budgets[model] = ModelBudget(self.requests_per_minute, self.tokens_per_minute)
+        return budget
+
+    async def acquire(self, model: str, tokens: int):
+        budget = self.budget(model)
+        async with budget.lock:
+            queued = False
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    budget.paused_until - now,
+                    budget.requests.wait_time(1, now),
+                    budget.tokens.wait_time(tokens, now)
+                )
+                if wait <= 0:
+                    break
+                if not queued:
+                    metrics.incr("llm.ratelimit.queued")
+                    queued = True
+                metrics.incr("llm.ratelimit.wait_seconds", wait)
+                await asyncio.sleep(wait)
+            budget.requests.take(1)
+            budget.tokens.take(tokens)
+
+    def settle(self, model: str, estimated_tokens: int, used_tokens: int):
+        self.budget(model).tokens.take(used_tokens - estimated_tokens)
+
+    def update(self, model: str, headers):
+        if headers is None:
+            return
+        budget = self.budget(model)
+        budget.requests.sync(
+            _header_int(headers, "x-ratelimit-limit-requests"),
+            _header_int(headers, "x-ratelimit-remaining-requests")
+        )
+        budget.tokens.sync(
+            _header_int(headers, "x-ratelimit-limit-tokens"),
+            _header_int(headers, "x-ratelimit-remaining-tokens")
+        )
+
+    def pause(self, model: str, seconds: float):
+        budget = self.budget(model)
+        budget.paused_until = max(budget.paused_until, time.monotonic() + seconds)
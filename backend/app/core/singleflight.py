@@ -0,0 +1,56 @@
+# 🔀 Single-Flight: gleichzeitige identische Anfragen teilen sich einen Aufruf
+import asyncio
+import functools
+from app.core.cache import make_cache_key
+from app.core.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Fasst gleichzeitige Aufrufe mit demselben Key zusammen (pro Worker-Prozess).
+
+    Der erste Aufruf startet die Arbeit als Task, Duplikate (Doppelklick, Retry des Frontends)
+    warten auf dessen Ergebnis bzw. Exception, statt selbst eine Completion zu bezahlen.
+    Der Task ist per asyncio.shield geschützt: bricht der erste Client ab, erhalten die
+    übrigen trotzdem das Ergebnis. Zusammengefasste Aufrufe werden unter
+    'singleflight.<endpoint>.coalesced' gezählt.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, endpoint: str, key: str, func, *args, **kwargs):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            metrics.incr(f"singleflight.{endpoint}.coalesced")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Exception abholen, falls kein Aufrufer mehr wartet (vermeidet "exception was never retrieved")
+        if not task.cancelled():
+            task.exception()
+
+    def coalesce(self, endpoint: str):
+        """
+        Decorator für FastAPI-Endpunkte: Key = (endpoint, alle Parameter).
+        Die Signatur bleibt über functools.wraps erhalten (FastAPI und JobManager lesen sie aus).
+        """
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(**params):
+                key = make_cache_key("singleflight", endpoint, params)
+                return await self.do(endpoint, key, handler, **params)
+            return wrapper
+        return decorator
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,97 @@
+# 📊 Denormalisierte Benutzer-Statistiken (user_stats)
+import asyncio
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from app.core.database import db
+
+# Kriterium für "optimierter Lebenslauf" (unverändert gegenüber der bisherigen Zählung in /user/stats)
+OPTIMIZED_QUERY = {"status": "optimized"}
+
+RESUMES = "resumes_count"
+JOB_DESCRIPTIONS = "job_descriptions_count"
+OPTIMIZED_RESUMES = "optimized_resumes_count"
+COVER_LETTERS = "cover_letters_count"
+COUNTERS = (RESUMES, JOB_DESCRIPTIONS, OPTIMIZED_RESUMES, COVER_LETTERS)
+
+# Versuche, die neu berechneten Zähler ohne gleichzeitiges incr() zu speichern
+REBUILD_ATTEMPTS = 3
+
+
+def is_optimized(resume_doc: dict) -> bool:
+    return bool(resume_doc) and resume_doc.get("status") == OPTIMIZED_QUERY["status"]
+
+
+class UserStatsService:
+    """
+    Hält pro Benutzer ein kleines Zähler-Dokument in user_stats.
+
+    - get(): liest das Dokument; fehlt es (oder refresh=True), werden die Zähler
+      einmalig aus den Collections berechnet (parallel) und gespeichert
+    - incr(): wird bei Anlegen/Löschen und bei Statuswechseln (resume_updated) aufgerufen und
+      aktualisiert nur bereits vorhandene Dokumente; fehlende werden beim nächsten get() berechnet
+
+    Jedes incr() erhöht das Feld 'version'. Die Neuberechnung speichert nur, wenn sich die Version
+    während des Zählens nicht geändert hat, sonst zählt sie erneut; so überschreibt sie keine
+    gleichzeitigen Inkremente mit veralteten Werten.
+    """
+
+    @property
+    def collection(self):
+        return db.collection_user_stats
+
+    async def compute(self, user_id: str) -> dict:
+        """Zählt die Dokumente des Benutzers direkt in den Collections (parallel)."""
+        counts = await asyncio.gather(
+            db.collection_resume.count_documents({"userId": user_id}),
+            db.collection_jobdesc.count_documents({"userId": user_id}),
+            db.collection_resume.count_documents({"userId": user_id, **OPTIMIZED_QUERY}),
+            db.collection_coverletter.count_documents({"userId": user_id})
+        )
+        return dict(zip(COUNTERS, counts))
+
+    async def get(self, user_id: str, refresh: bool = False) -> dict:
+        if not refresh:
+            doc = await self.collection.find_one({"_id": user_id}, {counter: 1 for counter in COUNTERS})
+            if doc:
+                return {counter: max(doc.get(counter, 0), 0) for counter in COUNTERS}
+
+        return await self.rebuild(user_id)
+
+    async def rebuild(self, user_id: str) -> dict:
+        for _ in range(REBUILD_ATTEMPTS):
+            current = await self.collection.find_one({"_id": user_id}, {"version": 1})
+            version = current["version"] if current and "version" in current else {"$exists": False}
+            counts = await self.compute(user_id)
+            try:
+                # Ohne Treffer (Version geändert) versucht das Upsert ein Insert mit
+                # vorhandener _id und scheitert mit DuplicateKeyError -> erneut zählen
+                await self.collection.update_one(
+                    {"_id": user_id, "version": version},
+                    {"$set": {**counts, "updatedAt": datetime.utcnow()}, "$inc": {"version": 1}},
+                    upsert=True
+                )
+                return counts
+            except DuplicateKeyError:
+                continue
+        return counts
+
+    async def incr(self, user_id, counter: str, amount: int = 1):
+        if not user_id or not amount:
+            return
+        await self.collection.update_one(
+            {"_id": str(user_id)},
+            {"$inc": {counter: amount, "version": 1}, "$set": {"updatedAt": datetime.utcnow()}}
+        )
+
+    async def resume_updated(self, previous: dict, update: dict):
+        """
+        Passt optimized_resumes_count an, wenn ein Update den Status eines Lebenslaufs ändert.
+        previous: Dokument vor dem Update (mindestens userId und status), update: gesetzte Felder.
+        """
+        if not previous:
+            return
+        delta = int(is_optimized({**previous, **update})) - int(is_optimized(previous))
+        await self.incr(previous.get("userId"), OPTIMIZED_RESUMES, delta)
+
+
+user_stats = UserStatsService()
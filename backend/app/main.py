@@ -1,22 +1,40 @@
 from fastapi import FastAPI, HTTPException, Query, Body, UploadFile, File, Form
-from pydantic import BaseModel
-from pymongo import MongoClient
+from pydantic import BaseModel, Field
+from typing import List
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 import os
 import json
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from openai import OpenAI
-import certifi
 from datetime import datetime
-from app.routers import resume, coverletter, jobdescription, analysis, coverletter_analysis, extract, user
+from app.routers import resume, coverletter, jobdescription, analysis, coverletter_analysis, extract, user, jobs
 from app.core.config import settings
+from app.core.llm import llm, parse_json_output
+from app.core.cascade import ANALYSIS_TASKS, cascade
+from app.core.cache import DocumentCache, make_cache_key, normalize_text
+from app.core.indexes import ensure_indexes
+from app.core.metrics import metrics
+from app.core.database import db
+from app.core.jobs import job_manager
+from app.core.extraction import extraction_engine
+from app.core.singleflight import single_flight
+from app.core.stats import user_stats
+from app.core.documents import DocumentRequest, load_owned_documents, load_analysis_documents
 from fastapi.middleware.cors import CORSMiddleware
-from app.utils.calc import count_tokens
+from fastapi.responses import StreamingResponse
+from app.utils.calc import count_tokens, count_tokens_many
+from app.utils.streaming import JsonSectionParser, sse_event
+from app.utils.skills import match_skills, merge_skill_match
+from app.utils.scoring import MATCH_SCORE_PATHS, apply_match_score, compute_match_scores, get_path
+from app.utils.chunking import CHUNK_SCHEMAS, chunk_text, merge_structured
 
 # Eigene Prompt-Funktionen importieren
 from app.prompts.prompt_resume import get_prompt_messages as get_prompt_messages_resume
 from app.prompts.prompt_coverletter import get_prompt_messages as get_prompt_messages_coverletter
 from app.prompts.prompt_jobdescription import get_prompt_messages as get_prompt_messages_jobdescription
+from app.prompts.prompt_chunk import with_chunk_note
 from app.prompts.prompt_analysis import get_prompt_messages as get_prompt_messages_analysis
 
 from app.prompts.prompt_resume_optimize import get_prompt_messages as get_prompt_messages_resume_optimize
@@ -31,31 +49,40 @@ from app.prompts.prompt_coverletter_optimize import get_prompt_messages as get_p
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("RESUME_OPENAI_API_KEY"))
-
-client_db = MongoClient(
-    os.getenv("MONGODB_URI"),
-    tls=True,
-    tlsCAFile=certifi.where()
+# Inhaltsadressierter Cache für /extract-structured-document
+structure_cache = DocumentCache(
+    "structure",
+    lambda: db.collection_structure_cache,
+    ttl_seconds=settings.STRUCTURE_CACHE_TTL_SECONDS,
+    maxsize=settings.STRUCTURE_CACHE_MAXSIZE
 )
 
-# Collections für Resume
-db_resume = client_db["resume_db"]
-collection_resume = db_resume["resumes"]
-
-# Collections für Cover Letter
-db_coverletter = client_db["coverletter_db"]
-collection_coverletter = db_coverletter["coverLetter"]
-
-# Collections für jobdescription
-db_jobdesc = client_db["jobposting_db"]
-collection_jobdesc = db_jobdesc["jobPostings"]
+# Analyse-Ergebnisse je Hash der Eingabedokumente (/analysis-ats, /analysis-ats_optimized, /analysis-ats-optimized)
+analysis_cache = DocumentCache(
+    "analysis",
+    lambda: db.collection_analysis_cache,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    maxsize=settings.ANALYSIS_CACHE_MAXSIZE
+)
 
-# Collection für die Analyse
-db_analysis = client_db["analysis_db"]
-collection_analysis = db_analysis["analysis"]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ein gemeinsamer MongoDB-Client (Connection-Pool) für alle Router
+    db.connect()
+    # Indexe aus der Registry anlegen (idempotent)
+    await ensure_indexes()
+    # Offene Jobs aus einem vorherigen Lauf wieder einreihen bzw. als unterbrochen markieren
+    await job_manager.recover()
+    job_manager.start()
+    yield
+    # Job-Worker und Extraktions-Pool stoppen, HTTP-Verbindungen des LLM-Gateways und MongoDB-Client schließen
+    await job_manager.stop()
+    extraction_engine.shutdown()
+    await llm.aclose()
+    await db.close()
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.VERSION,
@@ -79,31 +106,37 @@ app.include_router(analysis.router, prefix="/api/v1/analysis", tags=["analysis"]
 app.include_router(coverletter_analysis.router, prefix="/api/v1/coverletter-analysis", tags=["coverletter-analysis"])
 app.include_router(extract.router, prefix="/api/v1", tags=["extract"])
 app.include_router(user.router, prefix="/api/v1/user", tags=["user"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
-def count_documents(collection):
-    return collection.count_documents({})
+@app.get("/metrics")
+async def get_metrics():
+    """Gibt die In-Process-Zähler (z. B. Cache-Hits/-Misses) dieses Workers zurück."""
+    return metrics.snapshot()
+
+async def count_documents(collection):
+    return await collection.count_documents({})
 
 # ##################################################
 # ## Lese-Endpunkte für die Dokumentenzählung     ##
 # ##################################################
 @app.get("/count/analysis")
 async def count_analysis():
-    count = count_documents(collection_analysis)
+    count = await count_documents(db.collection_analysis)
     return {"collection": "analysis", "count": count}
 
 @app.get("/count/resumes")
 async def count_resumes():
-    count = count_documents(collection_resume)
+    count = await count_documents(db.collection_resume)
     return {"collection": "resumes", "count": count}
 
 @app.get("/count/coverletters")
 async def count_coverletters():
-    count = count_documents(collection_coverletter)
+    count = await count_documents(db.collection_coverletter)
     return {"collection": "coverletters", "count": count}
 
 @app.get("/count/jobdescriptions")
 async def count_jobdescriptions():
-    count = count_documents(collection_jobdesc)
+    count = await count_documents(db.collection_jobdesc)
     return {"collection": "jobdescriptions", "count": count}
 
 # #############################
@@ -152,16 +185,16 @@ async def view_document(
     collection_name = ""
     
     if analysis_id:
-        doc = collection_analysis.find_one({"_id": ObjectId(analysis_id)})
+        doc = await db.collection_analysis.find_one({"_id": ObjectId(analysis_id)})
         collection_name = "analysis"
     elif resume_id:
-        doc = collection_resume.find_one({"_id": ObjectId(resume_id)})
+        doc = await db.collection_resume.find_one({"_id": ObjectId(resume_id)})
         collection_name = "resumes"
     elif coverLetter_id:
-        doc = collection_coverletter.find_one({"_id": ObjectId(coverLetter_id)})
+        doc = await db.collection_coverletter.find_one({"_id": ObjectId(coverLetter_id)})
         collection_name = "coverletters"
     elif jobdescription_id:
-        doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+        doc = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
         collection_name = "jobdescriptions"
     else:
         raise HTTPException(status_code=400, detail="Bitte mindestens einen Parameter (analysis_id, resume_id, coverLetter_id oder jobdescription_id) angeben.")
@@ -178,10 +211,109 @@ async def view_document(
     
     return doc
 
+def validate_token_budget(*documents):
+    """
+    Prüft die Token-Anzahl eines ganzen Dokument-Bündels (z. B. Resume, Anschreiben
+    und Stellenbeschreibung) in einem Aufruf, bevor die Analyse-Prompts gebaut werden.
+    """
+    texts = [doc if isinstance(doc, str) else json.dumps(doc, ensure_ascii=False) for doc in documents]
+    token_count = sum(count_tokens_many(texts, settings.OPENAI_MODEL))
+    if token_count > settings.MAX_TOKENS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dokumente zu lang: {token_count} Tokens. Maximum erlaubt: {settings.MAX_TOKENS}"
+        )
+
 # ###############################
 # ## Dokument-Strukturierungen ##
 # ###############################
+def structure_target(document_type: str):
+    """Collection, Prompt-Funktion und Ergebnisfeld für einen document_type."""
+    if document_type == "resume":
+        return db.collection_resume, get_prompt_messages_resume, "structured_resume"
+    if document_type == "coverletter":
+        return db.collection_coverletter, get_prompt_messages_coverletter, "structured_coverletter"
+    if document_type == "jobdescription":
+        return db.collection_jobdesc, get_prompt_messages_jobdescription, "structured_jobdescription"
+    raise HTTPException(
+        status_code=400,
+        detail=f"Ungültiger document_type: {document_type}. Erlaubte Werte: resume, coverletter, jobdescription"
+    )
+
+def structure_cache_key(raw_text: str, document_type: str, language: str) -> str:
+    """Inhaltsadressierter Key: identischer rawText (auch aus anderen Dokumenten) wird nicht erneut strukturiert."""
+    return make_cache_key(
+        normalize_text(raw_text),
+        document_type,
+        language,
+        settings.PROMPT_VERSION,
+        cascade.models(f"structure_{document_type}")
+    )
+
+async def structure_raw_text(raw_text: str, document_type: str, language: str):
+    """
+    Strukturiert einen Rohtext per LLM. Rückgabe: Tupel (structured_json, status).
+
+    Lebensläufe und Stellenbeschreibungen über STRUCTURE_CHUNK_TOKENS werden entlang erkannter
+    Abschnitte (Werdegang, Ausbildung, Skills, ...) zerlegt, parallel strukturiert und
+    deterministisch in die Form von RESUME_SCHEMA bzw. jobdescription_SCHEMA zusammengeführt.
+    Anschreiben werden weiterhin in einem Aufruf strukturiert (Limit: MAX_TOKENS).
+    """
+    _, prompt_func, _ = structure_target(document_type)
+    task = f"structure_{document_type}"
+    token_count = count_tokens(raw_text, settings.OPENAI_MODEL)
+    schema = CHUNK_SCHEMAS.get(document_type)
+
+    if schema is None or token_count <= settings.STRUCTURE_CHUNK_TOKENS:
+        if token_count > settings.MAX_TOKENS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Dokument zu lang: {token_count} Tokens. Maximum erlaubt: {settings.MAX_TOKENS}"
+            )
+        return await cascade.chat_json(task, prompt_func(raw_text, language), "structured", temperature=0.3)
+
+    # Zerlegung und Tokenisierung sind CPU-gebunden: außerhalb des Event-Loops ausführen
+    chunks = await asyncio.to_thread(chunk_text, raw_text, document_type, settings.STRUCTURE_CHUNK_TOKENS, settings.OPENAI_MODEL)
+    if len(chunks) > settings.STRUCTURE_MAX_CHUNKS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dokument zu lang: {token_count} Tokens in {len(chunks)} Abschnitten. Maximum erlaubt: {settings.STRUCTURE_MAX_CHUNKS} Abschnitte"
+        )
+
+    parts = await asyncio.gather(*(
+        cascade.chat_json(task, with_chunk_note(prompt_func(chunk, language), index, len(chunks), language), "structured", temperature=0.3)
+        for index, chunk in enumerate(chunks, start=1)
+    ))
+
+    # Ein fehlgeschlagener Teil macht das Ergebnis unbrauchbar; unparsbare Teile fehlen im Ergebnis
+    for part_json, part_status in parts:
+        if part_status == "structured_failed":
+            return part_json, part_status
+    complete = [part_json for part_json, part_status in parts if part_status == "structured_complete"]
+    status = "structured_complete" if len(complete) == len(parts) else "structured_incomplete"
+    return merge_structured(complete, schema), status
+
+async def save_structured_document(collection, document_id: str, structured_key: str, structured_json: dict, status: str, language: str):
+    update = {
+        structured_key: structured_json,
+        "status": status,
+        "language": language
+    }
+    if collection != db.collection_resume:
+        await collection.update_one({"_id": ObjectId(document_id)}, {"$set": update})
+        return
+
+    # Der Status wird überschrieben: Zähler optimierter Lebensläufe beim Statuswechsel anpassen
+    previous = await collection.find_one_and_update(
+        {"_id": ObjectId(document_id)},
+        {"$set": update},
+        projection={"userId": 1, "status": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    await user_stats.resume_updated(previous, update)
+
 @app.get("/extract-structured-document")
+@single_flight.coalesce("extract-structured-document")
 async def extract_structured_document(
     document_id: str = Query(..., description="Die MongoDB _id des Dokuments"),
     document_type: str = Query(..., regex="^(resume|coverletter|jobdescription)$", description="Type of document: resume, coverletter, oder jobdescription"),
@@ -203,31 +335,17 @@ async def extract_structured_document(
       - language: Zielsprache ("en", "de", "pl")
       - user_id: User ID zur Zugriffsbeschränkung
     
+    Gleichzeitige identische Aufrufe (gleiche Parameter) teilen sich eine Ausführung.
+
     Rückgabe: 
       JSON mit "status", "document_type" und "result" (das strukturierte Dokument)
     """
     # Collection und Prompt-Funktion basierend auf document_type auswählen
-    if document_type == "resume":
-        collection = collection_resume
-        prompt_func = get_prompt_messages_resume
-        structured_key = "structured_resume"
-    elif document_type == "coverletter":
-        collection = collection_coverletter
-        prompt_func = get_prompt_messages_coverletter
-        structured_key = "structured_coverletter"
-    elif document_type == "jobdescription":
-        collection = collection_jobdesc
-        prompt_func = get_prompt_messages_jobdescription
-        structured_key = "structured_jobdescription"
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Ungültiger document_type: {document_type}. Erlaubte Werte: resume, coverletter, jobdescription"
-        )
+    collection, _, structured_key = structure_target(document_type)
 
     # Dokument laden und Validierung
     try:
-        doc = collection.find_one({"_id": ObjectId(document_id)})
+        doc = await collection.find_one({"_id": ObjectId(document_id)})
         if not doc:
             raise HTTPException(
                 status_code=404,
@@ -266,46 +384,22 @@ async def extract_structured_document(
             "result": existing_structure
         }
 
-    # Token-Count validieren
-    token_count = count_tokens(raw_text, settings.OPENAI_MODEL)
-    if token_count > settings.MAX_TOKENS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Dokument zu lang: {token_count} Tokens. Maximum erlaubt: {settings.MAX_TOKENS}"
-        )
+    # Inhaltsadressierter Cache: identischer rawText (auch aus anderen Dokumenten) wird nicht erneut strukturiert
+    cache_key = structure_cache_key(raw_text, document_type, language)
+    cached_structure = await structure_cache.get(cache_key)
 
-    # Prompt erstellen und API-Aufruf
-    messages = prompt_func(raw_text, language)
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
-        ai_output = response.choices[0].message.content
+    if cached_structure is not None:
+        structured_json = cached_structure
+        status = "structured_complete"
+    else:
+        # Lange Dokumente werden in Abschnitten parallel strukturiert (Token-Limits werden dort geprüft)
+        structured_json, status = await structure_raw_text(raw_text, document_type, language)
 
-        try:
-            structured_json = json.loads(ai_output)
-            status = "structured_complete"
-        except json.JSONDecodeError:
-            structured_json = {"raw_response": ai_output}
-            status = "structured_incomplete"
-    except Exception as e:
-        structured_json = {"error": str(e)}
-        status = "structured_failed"
+        if status == "structured_complete":
+            await structure_cache.set(cache_key, structured_json)
 
     # Update in der Datenbank
-    collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {
-            "$set": {
-                structured_key: structured_json,
-                "status": status,
-                "language": language
-            }
-        }
-    )
+    await save_structured_document(collection, document_id, structured_key, structured_json, status, language)
 
     return {
         "status": status,
@@ -313,9 +407,311 @@ async def extract_structured_document(
         "result": structured_json
     }
 
+class StructureBatchItem(BaseModel):
+    document_id: str
+    document_type: str = Field(..., pattern="^(resume|coverletter|jobdescription)$")
+    language: str = "de"
+
+class StructureBatchRequest(BaseModel):
+    user_id: str
+    items: List[StructureBatchItem]
+    # inline: sofort strukturieren; openai_batch: Eingabedatei für die OpenAI Batch API erzeugen
+    output: str = Field("inline", pattern="^(inline|openai_batch)$")
+
+def batch_item_error(result: dict, status_code: int, detail: str):
+    result.update({"status": "structured_failed", "error": {"status_code": status_code, "detail": detail}})
+
+def batch_custom_id(item: StructureBatchItem) -> str:
+    return f"{item.document_type}:{item.document_id}:{item.language}"
+
+async def load_structuring_documents(items: list, user_id: str) -> list:
+    """
+    Lädt die Dokumente eines Batches parallel (nur die benötigten Felder) und prüft sie einzeln.
+    Rückgabe: Liste von (doc, fehler) mit fehler = (status_code, detail) oder None.
+    """
+    async def load(item):
+        collection, _, structured_key = structure_target(item.document_type)
+        if not ObjectId.is_valid(item.document_id):
+            return None
+        return await collection.find_one(
+            {"_id": ObjectId(item.document_id)},
+            {"userId": 1, "rawText": 1, "status": 1, "language": 1, structured_key: 1}
+        )
+
+    docs = await asyncio.gather(*(load(item) for item in items))
+    checked = []
+    for item, doc in zip(items, docs):
+        if not doc:
+            checked.append((None, (404, f"{item.document_type.capitalize()} mit ID {item.document_id} nicht gefunden.")))
+        elif str(doc.get("userId", "")) != user_id:
+            checked.append((None, (403, "Zugriff verweigert: Dokument gehört nicht zu diesem Benutzer.")))
+        elif not doc.get("rawText") or not isinstance(doc.get("rawText"), str):
+            checked.append((None, (400, "Dokument enthält keinen gültigen rawText.")))
+        else:
+            checked.append((doc, None))
+    return checked
+
+@app.post("/extract-structured-documents")
+async def extract_structured_documents(batch: StructureBatchRequest):
+    """
+    Batch-Variante von /extract-structured-document für viele Dokumente in einem Request.
+
+    - Bereits strukturierte Dokumente (gleiche Sprache) werden direkt zurückgegeben
+    - Identischer Inhalt wird nur einmal nachgeschlagen bzw. strukturiert (source: "deduplicated")
+    - Cache-Misses laufen parallel, begrenzt durch STRUCTURE_BATCH_CONCURRENCY
+    - output="openai_batch": statt der Completions wird eine JSONL-Eingabedatei für die
+      OpenAI Batch API geliefert (Items mit Status "structured_pending"); die Ergebnisdatei
+      wird über /extract-structured-documents/batch-results importiert
+
+    Rückgabe:
+      JSON mit "status" ("batch_complete" | "batch_incomplete"), "results" (ein Eintrag pro Item)
+      und bei output="openai_batch" zusätzlich "batch_file" (JSONL).
+    """
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="Keine Dokumente angegeben.")
+    if len(batch.items) > settings.STRUCTURE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Zu viele Dokumente: {len(batch.items)}. Maximum erlaubt: {settings.STRUCTURE_BATCH_MAX_ITEMS}"
+        )
+
+    results = [
+        {"document_id": item.document_id, "document_type": item.document_type, "language": item.language, "status": None}
+        for item in batch.items
+    ]
+    checked = await load_structuring_documents(batch.items, batch.user_id)
+
+    # 1) Vorhandene Strukturen übernehmen, übrige Items nach Inhalt gruppieren
+    pending = {}  # cache_key -> [Index, ...]
+    raw_texts = {}
+    for index, (item, (doc, error)) in enumerate(zip(batch.items, checked)):
+        if error:
+            batch_item_error(results[index], *error)
+            continue
+        _, _, structured_key = structure_target(item.document_type)
+        if doc.get("status") == "structured_complete" and doc.get("language", "") == item.language and doc.get(structured_key):
+            results[index].update({"status": "structured_complete", "source": "existing", "result": doc[structured_key]})
+            continue
+        cache_key = structure_cache_key(doc["rawText"], item.document_type, item.language)
+        pending.setdefault(cache_key, []).append(index)
+        raw_texts.setdefault(cache_key, doc["rawText"])
+
+    async def apply_result(cache_key: str, structured_json: dict, status: str, source: str):
+        saves = []
+        for position, index in enumerate(pending[cache_key]):
+            item = batch.items[index]
+            collection, _, structured_key = structure_target(item.document_type)
+            results[index].update({
+                "status": status,
+                "source": source if position == 0 else "deduplicated",
+                "result": structured_json
+            })
+            saves.append(save_structured_document(collection, item.document_id, structured_key, structured_json, status, item.language))
+        await asyncio.gather(*saves)
+
+    # 2) Cache-Lookups: einmal pro eindeutigem Inhalt
+    cache_keys = list(pending)
+    cached = await asyncio.gather(*(structure_cache.get(cache_key) for cache_key in cache_keys))
+    misses = []
+    for cache_key, cached_structure in zip(cache_keys, cached):
+        if cached_structure is not None:
+            await apply_result(cache_key, cached_structure, "structured_complete", "cache")
+        else:
+            misses.append(cache_key)
+
+    def build_messages(cache_key: str) -> list:
+        item = batch.items[pending[cache_key][0]]
+        _, prompt_func, _ = structure_target(item.document_type)
+        return prompt_func(raw_texts[cache_key], item.language)
+
+    response = {}
+    if batch.output == "openai_batch":
+        # 3a) Token-Budget aller Misses in einem Aufruf prüfen (eine Batch-Zeile pro Dokument, keine Zerlegung)
+        token_counts = count_tokens_many([raw_texts[cache_key] for cache_key in misses], settings.OPENAI_MODEL)
+        allowed = []
+        for cache_key, token_count in zip(misses, token_counts):
+            if token_count > settings.MAX_TOKENS:
+                for index in pending[cache_key]:
+                    batch_item_error(results[index], 400, f"Dokument zu lang: {token_count} Tokens. Maximum erlaubt: {settings.MAX_TOKENS}")
+            else:
+                allowed.append(cache_key)
+
+        # 4a) Eine Zeile pro eindeutigem Inhalt; Duplikate profitieren nach dem Import vom Cache.
+        # Modell: erste Stufe der Kaskade, die auch im Cache-Key steht (Eskalation erst beim Import)
+        lines = []
+        for cache_key in allowed:
+            item = batch.items[pending[cache_key][0]]
+            custom_id = batch_custom_id(item)
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": cascade.models(f"structure_{item.document_type}")[0],
+                    "messages": build_messages(cache_key),
+                    "temperature": 0.3,
+                    "response_format": {"type": "json_object"}
+                }
+            }, ensure_ascii=False))
+            for index in pending[cache_key]:
+                results[index].update({"status": "structured_pending", "custom_id": custom_id})
+        response["batch_file"] = "\n".join(lines) + ("\n" if lines else "")
+    else:
+        # 4b) Misses parallel strukturieren, begrenzt pro Batch (lange Dokumente in Abschnitten)
+        semaphore = asyncio.Semaphore(settings.STRUCTURE_BATCH_CONCURRENCY)
+
+        async def structure(cache_key: str):
+            item = batch.items[pending[cache_key][0]]
+            try:
+                async with semaphore:
+                    structured_json, status = await structure_raw_text(raw_texts[cache_key], item.document_type, item.language)
+            except HTTPException as e:
+                for index in pending[cache_key]:
+                    batch_item_error(results[index], e.status_code, e.detail)
+                return
+            if status == "structured_complete":
+                await structure_cache.set(cache_key, structured_json)
+            await apply_result(cache_key, structured_json, status, "llm")
+
+        await asyncio.gather(*(structure(cache_key) for cache_key in misses))
+
+    complete = all(result["status"] == "structured_complete" for result in results)
+    return {
+        "status": "batch_complete" if complete else "batch_incomplete",
+        "results": results,
+        **response
+    }
+
+@app.post("/extract-structured-documents/batch-results")
+async def import_structured_batch_results(
+    user_id: str = Form(...),
+    file: UploadFile = File(..., description="Ergebnisdatei (JSONL) der OpenAI Batch API")
+):
+    """
+    Importiert die Ergebnisse eines mit output="openai_batch" erzeugten Batches.
+    Jede Zeile wird über ihre custom_id ("<document_type>:<document_id>:<language>") dem
+    Dokument zugeordnet, gespeichert und in den Strukturierungs-Cache übernommen.
+    Besteht die Ausgabe des schnellen Modells die Schema-Validierung der Kaskade nicht, wird sie
+    gespeichert, aber nicht gecacht; die nächste Strukturierung eskaliert dann wie gewohnt.
+    """
+    try:
+        lines = [line for line in (await file.read()).decode("utf-8").splitlines() if line.strip()]
+        entries = [json.loads(line) for line in lines]
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Ungültige Ergebnisdatei: {str(e)}")
+    finally:
+        await file.close()
+
+    items = []
+    results = []
+    for entry in entries:
+        custom_id = str(entry.get("custom_id", ""))
+        document_type, _, rest = custom_id.partition(":")
+        document_id, _, language = rest.partition(":")
+        try:
+            items.append(StructureBatchItem(document_id=document_id, document_type=document_type, language=language))
+        except ValueError:
+            items.append(None)
+        results.append({"custom_id": custom_id, "document_id": document_id, "document_type": document_type, "status": None})
+
+    valid = [index for index, item in enumerate(items) if item is not None]
+    checked = await load_structuring_documents([items[index] for index in valid], user_id)
+    docs = dict(zip(valid, checked))
+
+    for index, (entry, item) in enumerate(zip(entries, items)):
+        if item is None:
+            batch_item_error(results[index], 400, "Ungültige custom_id.")
+            continue
+        doc, error = docs[index]
+        if error:
+            batch_item_error(results[index], *error)
+            continue
+
+        body = (entry.get("response") or {}).get("body") or {}
+        if entry.get("error") or not body.get("choices"):
+            structured_json, status = {"error": entry.get("error") or body.get("error")}, "structured_failed"
+        else:
+            structured_json, status = parse_json_output(body["choices"][0]["message"]["content"], "structured")
+
+        if status == "structured_complete" and cascade.accepts(f"structure_{item.document_type}", structured_json):
+            await structure_cache.set(structure_cache_key(doc["rawText"], item.document_type, item.language), structured_json)
+        collection, _, structured_key = structure_target(item.document_type)
+        await save_structured_document(collection, item.document_id, structured_key, structured_json, status, item.language)
+        results[index].update({"status": status, "result": structured_json})
+
+    complete = all(result["status"] == "structured_complete" for result in results)
+    return {
+        "status": "batch_complete" if complete else "batch_incomplete",
+        "results": results
+    }
+
 # ########################################
 # ## ATS Analyse (Resume + Coverletter) ##
 # ########################################
+def analysis_cache_key(variant: str, user_id: str, language: str, *documents, **flags) -> str:
+    """
+    Stabiler Key aus den Eingabedokumenten (JSON mit sortierten Keys), Sprache, Flags,
+    PROMPT_VERSION und Modell-Kaskade. Die user_id gehört dazu, damit Ergebnisse nur innerhalb
+    eines Benutzers wiederverwendet werden.
+    """
+    return make_cache_key(
+        "analysis", variant, user_id, language, flags, *documents,
+        settings.PROMPT_VERSION, [cascade.models(task) for task in ANALYSIS_TASKS]
+    )
+
+async def cached_analysis_exists(cached: dict) -> bool:
+    """Prüft, ob das Analyse-Dokument eines gecachten Laufs noch existiert (sonst wird neu gespeichert)."""
+    analysis_id = cached.get("analysis_id")
+    if not analysis_id or not ObjectId.is_valid(analysis_id):
+        return False
+    return await db.collection_analysis.find_one({"_id": ObjectId(analysis_id)}, {"_id": 1}) is not None
+
+async def run_ats_analysis(structured_resume: dict, structured_coverletter: dict, structured_jobdesc: dict, language: str):
+    """
+    ATS-Analyse (Resume + Cover Letter + Jobdesc) und separate Anschreiben-Analyse per LLM.
+    Rückgabe: Tupel (combined_analysis, overall_status)
+    """
+    validate_token_budget(structured_resume, structured_coverletter, structured_jobdesc)
+
+    # Skill-Matching lokal vorberechnen, das Modell liefert dafür nur noch leere Listen
+    skill_match = match_skills(structured_resume, structured_jobdesc)
+
+    # 1) ATS Analyse (Resume + Cover Letter + Jobdesc)
+    ats_messages = get_prompt_messages_analysis(
+        job_description=structured_jobdesc,
+        cover_letter=structured_coverletter,
+        resume=structured_resume,
+        language=language,
+        skill_match=skill_match._asdict()
+    )
+
+    # 2) Cover Letter Analyse (Anschreiben separat analysieren)
+    cl_messages = get_prompt_messages_coverletter_analysis(
+        cover_letter=structured_coverletter,
+        job_description=structured_jobdesc,
+        language=language
+    )
+
+    # Beide Completions parallel ausführen
+    (ats_analysis_json, ats_status), (cl_analysis_json, cl_status) = await asyncio.gather(
+        cascade.chat_json("analysis", ats_messages, "analysis", temperature=0.0),
+        cascade.chat_json("coverletter_analysis", cl_messages, "analysis", temperature=0.7)
+    )
+    apply_match_score(merge_skill_match(ats_analysis_json, skill_match))
+
+    # Kombiniere die Ergebnisse in einer flachen Struktur
+    combined_analysis = {
+        "resume": ats_analysis_json,
+        "coverletter": cl_analysis_json
+    }
+    
+    # Bestimme den Gesamtstatus: Falls einer der beiden Analysen fehlschlägt, gilt das Gesamtergebnis als "analysis_failed".
+    overall_status = "analysis_complete" if ats_status == "analysis_complete" and cl_status == "analysis_complete" else "analysis_incomplete"
+    if ats_status == "analysis_failed" or cl_status == "analysis_failed":
+        overall_status = "analysis_failed"
+
+    return combined_analysis, overall_status
+
 @app.get("/analysis-ats")
 async def analysis_ats(
     resume_id: str = Query(..., description="MongoDB _id of the resume"),
@@ -325,6 +721,7 @@ async def analysis_ats(
     use_optimized_resume: bool = Query(False, description="Wenn true, wird der optimierte Lebenslauf verwendet, sonst der strukturierte"),
     use_optimized_coverletter: bool = Query(False, description="Wenn true, wird das optimierte Anschreiben verwendet, sonst das strukturierte"),
     update_existing_analysis_id: str = Query(None, description="Wenn gesetzt, wird das bestehende Analyse-Dokument aktualisiert"),
+    force: bool = Query(False, description="Wenn true, wird der Analyse-Cache umgangen und neu analysiert"),
     user_id: str = Query(..., description="User ID (als String) zur Zugriffsbeschränkung")
 ):
     """
@@ -340,6 +737,7 @@ async def analysis_ats(
       - use_optimized_resume: Wenn true, wird der optimierte Lebenslauf verwendet, sonst der strukturierte
       - use_optimized_coverletter: Wenn true, wird das optimierte Anschreiben verwendet, sonst das strukturierte
       - update_existing_analysis_id: Falls gesetzt, wird das bestehende Analyse-Dokument aktualisiert
+      - force: Analyse-Cache umgehen (sonst liefern identische Eingaben das gespeicherte Ergebnis)
       - user_id: User ID zur Zugriffsbeschränkung
     
     Beispiel-URL:
@@ -348,28 +746,17 @@ async def analysis_ats(
     Rückgabe:
       JSON mit "analysis_id", "status" und "analysisResult" (mit den Schlüsseln "ats_analysis" und "coverletter_analysis")
     """
-    # Dokumente laden
-    resume_doc = collection_resume.find_one({"_id": ObjectId(resume_id)})
-    coverletter_doc = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
-    jobdesc_doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
-
-    if not resume_doc or not coverletter_doc or not jobdesc_doc:
-        raise HTTPException(status_code=404, detail="Mindestens ein Dokument nicht gefunden.")
-
-    # Sicherheitsprüfung: Überprüfe, ob alle Dokumente zum gleichen user_id gehören.
-    if str(resume_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Resume does not belong to this user.")
-    if str(coverletter_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Cover letter does not belong to this user.")
-    if str(jobdesc_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Job description does not belong to this user.")
+    resume_field = "optimized_resume" if use_optimized_resume else "structured_resume"
+    coverletter_field = "optimized_coverletter" if use_optimized_coverletter else "structured_coverletter"
 
+    # Dokumente parallel laden (inkl. Sicherheitsprüfung: alle Dokumente gehören zum gleichen user_id)
+    resume_doc, coverletter_doc, jobdesc_doc = await load_analysis_documents(
+        user_id, resume_id, coverletter_id, jobdescription_id,
+        resume_field=resume_field,
+        coverletter_field=coverletter_field
+    )
 
-    resume_field = "optimized_resume" if use_optimized_resume else "structured_resume"
     structured_resume = resume_doc.get(resume_field)
-    
-    # ... und für das Anschreiben.
-    coverletter_field = "optimized_coverletter" if use_optimized_coverletter else "structured_coverletter"
     structured_coverletter = coverletter_doc.get(coverletter_field)
 
     print(structured_coverletter)
@@ -379,70 +766,23 @@ async def analysis_ats(
         raise HTTPException(status_code=400,
             detail="Bitte stelle sicher, dass alle Dokumente strukturiert sind. (Nutze /extract-structured-document)")
 
-    # 1) ATS Analyse (Resume + Cover Letter + Jobdesc)
-    ats_messages = get_prompt_messages_analysis(
-        job_description=structured_jobdesc,
-        cover_letter=structured_coverletter,
-        resume=structured_resume,
-        language=language
+    # Analyse-Cache: identische Eingaben liefern das gespeicherte Ergebnis ohne LLM-Aufruf
+    cache_key = analysis_cache_key(
+        "ats", user_id, language, structured_resume, structured_coverletter, structured_jobdesc,
+        use_optimized_resume=use_optimized_resume, use_optimized_coverletter=use_optimized_coverletter
     )
-    try:
-        ats_response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=ats_messages,
-            temperature=0.0,
-            response_format={"type": "json_object"}
-        )
-        ats_output = ats_response.choices[0].message.content
-        try:
-            ats_analysis_json = json.loads(ats_output)
-            ats_status = "analysis_complete"
-        except json.JSONDecodeError:
-            ats_analysis_json = {"raw_response": ats_output}
-            ats_status = "analysis_incomplete"
-    except Exception as e:
-        ats_analysis_json = {"error": str(e)}
-        ats_status = "analysis_failed"
-
-    # 2) Cover Letter Analyse (Anschreiben separat analysieren)
-    cl_messages = get_prompt_messages_coverletter_analysis(
-        cover_letter=structured_coverletter,
-        job_description=structured_jobdesc,
-        language=language
-    )
-    try:
-        cl_response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=cl_messages,
-            temperature=0.7,
-            response_format={"type": "json_object"}
+    cached = None if force else await analysis_cache.get(cache_key)
+    if cached is not None:
+        combined_analysis, overall_status = cached["analysisResult"], cached["status"]
+    else:
+        combined_analysis, overall_status = await run_ats_analysis(
+            structured_resume, structured_coverletter, structured_jobdesc, language
         )
-        cl_output = cl_response.choices[0].message.content
-        try:
-            cl_analysis_json = json.loads(cl_output)
-            cl_status = "analysis_complete"
-        except json.JSONDecodeError:
-            cl_analysis_json = {"raw_response": cl_output}
-            cl_status = "analysis_incomplete"
-    except Exception as e:
-        cl_analysis_json = {"error": str(e)}
-        cl_status = "analysis_failed"
 
-    # Kombiniere die Ergebnisse in einer flachen Struktur
-    combined_analysis = {
-        "resume": ats_analysis_json,
-        "coverletter": cl_analysis_json
-    }
-    
-    # Bestimme den Gesamtstatus: Falls einer der beiden Analysen fehlschlägt, gilt das Gesamtergebnis als "analysis_failed".
-    overall_status = "analysis_complete" if ats_status == "analysis_complete" and cl_status == "analysis_complete" else "analysis_incomplete"
-    if ats_status == "analysis_failed" or cl_status == "analysis_failed":
-        overall_status = "analysis_failed"
-    
     # Speichere das kombinierte Analyse-Ergebnis in der Collection analysis_db.analysis.
     # Dabei werden die IDs von Lebenslauf, Anschreiben und Stellenbeschreibung gespeichert.
     if update_existing_analysis_id:
-        collection_analysis.update_one(
+        await db.collection_analysis.update_one(
             {"_id": ObjectId(update_existing_analysis_id)},
             {"$set": {
                 "analysisResult": combined_analysis,
@@ -451,6 +791,8 @@ async def analysis_ats(
             }}
         )
         analysis_id = update_existing_analysis_id
+    elif cached is not None and await cached_analysis_exists(cached):
+        analysis_id = cached["analysis_id"]
     else:
         result_doc = {
             "resumeId": resume_id,
@@ -462,18 +804,257 @@ async def analysis_ats(
             "language": language,
             "createdAt": datetime.utcnow()
         }
-        insert_result = collection_analysis.insert_one(result_doc)
+        insert_result = await db.collection_analysis.insert_one(result_doc)
         analysis_id = str(insert_result.inserted_id)
     
+    if overall_status == "analysis_complete" and (cached is None or cached.get("analysis_id") != analysis_id):
+        await analysis_cache.set(cache_key, {
+            "analysis_id": analysis_id,
+            "status": overall_status,
+            "analysisResult": combined_analysis
+        })
+
     return {
         "analysis_id": analysis_id,
         "status": overall_status,
-        "analysisResult": combined_analysis
+        "analysisResult": combined_analysis,
+        "cached": cached is not None
+    }
+
+# ##############################################
+# ## Schnelle ATS-Analyse ohne LLM (Skill-Match) ##
+# ##############################################
+@app.get("/analysis-ats-fast")
+async def analysis_ats_fast(
+    resume_id: str = Query(..., description="MongoDB _id of the resume"),
+    jobdescription_id: str = Query(..., description="MongoDB _id of the job description"),
+    use_optimized_resume: bool = Query(False, description="Wenn true, wird der optimierte Lebenslauf verwendet, sonst der strukturierte"),
+    user_id: str = Query(..., description="User ID (als String) zur Zugriffsbeschränkung")
+):
+    """
+    Berechnet den Match-Score (matching_skills, missing_skills, additional_keywords, total_score)
+    lokal aus Lebenslauf und Stellenbeschreibung – ohne LLM-Aufruf und ohne Speicherung.
+    """
+    resume_field = "optimized_resume" if use_optimized_resume else "structured_resume"
+    resume_doc, jobdesc_doc = await load_owned_documents(
+        user_id,
+        DocumentRequest(db.collection_resume, resume_id, resume_field, "Resume"),
+        DocumentRequest(db.collection_jobdesc, jobdescription_id, "structured_jobdescription", "Job description")
+    )
+
+    structured_resume = resume_doc.get(resume_field)
+    structured_jobdesc = jobdesc_doc.get("structured_jobdescription")
+    if not structured_resume or not structured_jobdesc:
+        raise HTTPException(status_code=400,
+            detail="Bitte stelle sicher, dass alle Dokumente strukturiert sind. (Nutze /extract-structured-document)")
+
+    analysis_json = apply_match_score({
+        "analysis": {"match_score": match_skills(structured_resume, structured_jobdesc).as_match_score()}
+    })
+
+    return {
+        "resume_id": resume_id,
+        "jobdescription_id": jobdescription_id,
+        "status": "analysis_complete",
+        "analysisResult": {"resume": analysis_json}
+    }
+
+# ###################################################
+# ## Ranking: ein Lebenslauf gegen mehrere Stellen ##
+# ###################################################
+def analysis_total(analysis_json: dict, score: str) -> int:
+    """total_score von analysis.<score> (ats_score oder match_score), 0 falls nicht vorhanden."""
+    value = ((analysis_json or {}).get("analysis") or {}).get(score) or {}
+    total = value.get("total_score", 0) if isinstance(value, dict) else 0
+    return total if isinstance(total, (int, float)) else 0
+
+@app.get("/analysis-ats-rank")
+async def analysis_ats_rank(
+    resume_id: str = Query(..., description="MongoDB _id of the resume"),
+    jobdescription_ids: List[str] = Query(..., description="MongoDB _ids of the job descriptions (Parameter mehrfach angeben)"),
+    coverletter_id: str = Query(None, description="Optional: MongoDB _id of the cover letter"),
+    language: str = Query("de", description="Target language: en, de, pl"),
+    top_k: int = Query(None, ge=1, description="Anzahl der Stellen mit LLM-Analyse (Standard: RANK_TOP_K)"),
+    use_optimized_resume: bool = Query(False, description="Wenn true, wird der optimierte Lebenslauf verwendet, sonst der strukturierte"),
+    user_id: str = Query(..., description="User ID (als String) zur Zugriffsbeschränkung")
+):
+    """
+    Vergleicht einen Lebenslauf mit mehreren Stellenbeschreibungen und liefert eine Rangliste.
+
+    1) Lokaler Vorab-Score für alle Stellen (Skill-Match, ohne LLM)
+    2) ATS-Analyse per LLM parallel nur für die top_k Stellen mit dem höchsten Vorab-Score;
+       die Ergebnisse werden wie bei /analysis-ats in collection_analysis gespeichert
+    3) Rangliste: analysierte Stellen nach rank_score (Mittel aus ats_score und match_score),
+       danach die übrigen Stellen nach Vorab-Score
+
+    Rückgabe:
+      JSON mit "resume_id", "status" ("ranking_complete" | "ranking_incomplete") und "ranking".
+    """
+    jobdescription_ids = list(dict.fromkeys(jobdescription_ids))
+    if len(jobdescription_ids) > settings.RANK_MAX_JOBDESCRIPTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Zu viele Stellenbeschreibungen: {len(jobdescription_ids)}. Maximum erlaubt: {settings.RANK_MAX_JOBDESCRIPTIONS}"
+        )
+    top_k = top_k or settings.RANK_TOP_K
+
+    # Alle Dokumente in einem Roundtrip laden (inkl. Sicherheitsprüfung)
+    resume_field = "optimized_resume" if use_optimized_resume else "structured_resume"
+    document_requests = [DocumentRequest(db.collection_resume, resume_id, resume_field, "Resume")]
+    if coverletter_id:
+        document_requests.append(DocumentRequest(db.collection_coverletter, coverletter_id, "structured_coverletter", "Cover letter"))
+    document_requests += [
+        DocumentRequest(db.collection_jobdesc, jobdescription_id, "structured_jobdescription", "Job description")
+        for jobdescription_id in jobdescription_ids
+    ]
+    docs = await load_owned_documents(user_id, *document_requests)
+    resume_doc, jobdesc_docs = docs[0], docs[-len(jobdescription_ids):]
+    coverletter_doc = docs[1] if coverletter_id else {}
+
+    structured_resume = resume_doc.get(resume_field)
+    structured_coverletter = coverletter_doc.get("structured_coverletter") or {}
+    if not structured_resume or (coverletter_id and not structured_coverletter):
+        raise HTTPException(status_code=400,
+            detail="Bitte stelle sicher, dass alle Dokumente strukturiert sind. (Nutze /extract-structured-document)")
+
+    # 1) Lokaler Vorab-Score für alle strukturierten Stellen
+    entries = []
+    for jobdescription_id, jobdesc_doc in zip(jobdescription_ids, jobdesc_docs):
+        structured_jobdesc = jobdesc_doc.get("structured_jobdescription")
+        entry = {
+            "jobdescription_id": jobdescription_id,
+            "job_title": (structured_jobdesc or {}).get("job_title", ""),
+            "company": (structured_jobdesc or {}).get("company", ""),
+            "pre_score": None,
+            "status": "not_structured",
+            "analysis_id": None
+        }
+        if structured_jobdesc:
+            entry["skill_match"] = match_skills(structured_resume, structured_jobdesc)
+            entry["structured_jobdesc"] = structured_jobdesc
+        entries.append(entry)
+
+    scored = [entry for entry in entries if "skill_match" in entry]
+    pre_scores = compute_match_scores(
+        [len(entry["skill_match"].matching_skills) for entry in scored],
+        [len(entry["skill_match"].missing_skills) for entry in scored],
+        [len(entry["skill_match"].additional_keywords) for entry in scored]
+    )
+    for entry, pre_score in zip(scored, pre_scores):
+        entry["pre_score"] = pre_score
+        entry["status"] = "pruned"
+    scored.sort(key=lambda entry: entry["pre_score"], reverse=True)
+
+    # 2) LLM-Analyse parallel nur für die besten top_k
+    async def analyze(entry: dict):
+        try:
+            validate_token_budget(structured_resume, structured_coverletter, entry["structured_jobdesc"])
+        except HTTPException as e:
+            entry["status"] = "analysis_failed"
+            entry["error"] = e.detail
+            return
+        messages = get_prompt_messages_analysis(
+            job_description=entry["structured_jobdesc"],
+            cover_letter=structured_coverletter,
+            resume=structured_resume,
+            language=language,
+            skill_match=entry["skill_match"]._asdict()
+        )
+        ats_analysis_json, ats_status = await cascade.chat_json("analysis", messages, "analysis", temperature=0.0)
+        apply_match_score(merge_skill_match(ats_analysis_json, entry["skill_match"]))
+        entry["status"] = ats_status
+        entry["analysisResult"] = {"resume": ats_analysis_json}
+
+    analyzed = scored[:top_k]
+    await asyncio.gather(*(analyze(entry) for entry in analyzed))
+
+    # Ergebnisse wie bei /analysis-ats speichern (ein Dokument pro Stelle)
+    stored = [entry for entry in analyzed if "analysisResult" in entry]
+    if stored:
+        now = datetime.utcnow()
+        insert_result = await db.collection_analysis.insert_many([
+            {
+                "resumeId": resume_id,
+                "coverLetterId": coverletter_id,
+                "jobdescriptionId": entry["jobdescription_id"],
+                "userId": user_id,
+                "analysisResult": entry["analysisResult"],
+                "analysis_status": entry["status"],
+                "language": language,
+                "createdAt": now
+            }
+            for entry in stored
+        ])
+        for entry, inserted_id in zip(stored, insert_result.inserted_ids):
+            entry["analysis_id"] = str(inserted_id)
+
+    # 3) Rangliste
+    for entry in analyzed:
+        resume_analysis = entry.get("analysisResult", {}).get("resume")
+        entry["ats_score"] = analysis_total(resume_analysis, "ats_score")
+        entry["match_score"] = analysis_total(resume_analysis, "match_score")
+        entry["rank_score"] = round((entry["ats_score"] + entry["match_score"]) / 2)
+    analyzed.sort(key=lambda entry: (entry["status"] == "analysis_complete", entry["rank_score"], entry["pre_score"]), reverse=True)
+    ranked = analyzed + scored[top_k:] + [entry for entry in entries if "skill_match" not in entry]
+
+    ranking = []
+    for rank, entry in enumerate(ranked, start=1):
+        entry.pop("skill_match", None)
+        entry.pop("structured_jobdesc", None)
+        ranking.append({"rank": rank, **entry})
+
+    complete = all(entry["status"] == "analysis_complete" for entry in analyzed) and len(scored) == len(entries)
+    return {
+        "resume_id": resume_id,
+        "status": "ranking_complete" if complete else "ranking_incomplete",
+        "ranking": ranking
     }
 
 # ########################################
 # ## ATS Analyse (Resume + Coverletter) ##
 # ########################################
+async def run_ats_optimized_analysis(structured_resume: dict, structured_coverletter: dict, structured_jobdesc: dict, language: str):
+    """
+    ATS-Analyse mit den Prompts für optimierte Dokumente (Lebenslauf und Anschreiben separat).
+    Rückgabe: Tupel (combined_analysis, overall_status)
+    """
+    validate_token_budget(structured_resume, structured_coverletter, structured_jobdesc)
+
+    # 1) ATS Analyse (Resume + Cover Letter + Jobdesc)
+    ats_messages = get_prompt_messages_optimized_resume(
+        job_description=structured_jobdesc,
+        cover_letter=structured_coverletter,
+        resume=structured_resume,
+        language=language
+    )
+
+    # 2) Cover Letter Analyse (Anschreiben separat analysieren)
+    cl_messages = get_prompt_messages_optimized_coverletter(
+        cover_letter=structured_coverletter,
+        job_description=structured_jobdesc,
+        language=language
+    )
+
+    # Beide Completions parallel ausführen
+    (ats_analysis_json, ats_status), (cl_analysis_json, cl_status) = await asyncio.gather(
+        cascade.chat_json("analysis_optimized_resume", ats_messages, "analysis", temperature=0.0),
+        cascade.chat_json("analysis_optimized_coverletter", cl_messages, "analysis", temperature=0.7)
+    )
+    apply_match_score(ats_analysis_json)
+
+    # Kombiniere die Ergebnisse in einer flachen Struktur
+    combined_analysis = {
+        "resume": ats_analysis_json,
+        "coverletter": cl_analysis_json
+    }
+    
+    # Bestimme den Gesamtstatus: Falls einer der beiden Analysen fehlschlägt, gilt das Gesamtergebnis als "analysis_failed".
+    overall_status = "analysis_complete" if ats_status == "analysis_complete" and cl_status == "analysis_complete" else "analysis_incomplete"
+    if ats_status == "analysis_failed" or cl_status == "analysis_failed":
+        overall_status = "analysis_failed"
+
+    return combined_analysis, overall_status
+
 @app.get("/analysis-ats_optimized")
 async def analysis_ats_optimized(
     resume_id: str = Query(..., description="MongoDB _id of the resume"),
@@ -483,6 +1064,7 @@ async def analysis_ats_optimized(
     use_optimized_resume: bool = Query(False, description="Set to true to use optimized_resume instead of structured_resume"),
     use_optimized_coverletter: bool = Query(False, description="Set to true to use optimized_coverletter instead of structured_coverletter"),
     update_existing_analysis_id: str = Query(None, description="If set, update this analysisId instead of creating new one"),
+    force: bool = Query(False, description="Set to true to bypass the analysis cache"),
     user_id: str = Query(..., description="User ID (as string) to restrict access")
 
 ):
@@ -500,6 +1082,7 @@ async def analysis_ats_optimized(
       - language: Zielsprache ("en", "de", "pl").
       - use_optimized_resume: Wenn true, wird der optimierte Lebenslauf verwendet.
       - update_existing_analysis_id: Falls gesetzt, wird das bestehende Analyse-Dokument aktualisiert.
+      - force: Analyse-Cache umgehen (sonst liefern identische Eingaben das gespeicherte Ergebnis).
     
       http://127.0.0.1:8000/analysis-ats?resume_id=67e2bfb64a73a557d0035844&coverletter_id=67e2bf3030e88d7728f5b057&jobdescription_id=67e2bf5403d2f0385ecbe633&language=de&use_optimized_resume=true&update_existing_analysis_id=67e2c256ed0b3455107e49a5
       http://127.0.0.1:8000/analysis-ats?resume_id=67e2bfb64a73a557d0035844&coverletter_id=67e2bf3030e88d7728f5b057&jobdescription_id=67e2bf5403d2f0385ecbe633&language=de
@@ -509,28 +1092,17 @@ async def analysis_ats_optimized(
     Rückgabe:
       JSON mit "analysis_id", "status" und "analysisResult" (mit den Schlüsseln "ats_analysis" und "coverletter_analysis").
     """
-    # Dokumente laden
-    resume_doc = collection_resume.find_one({"_id": ObjectId(resume_id)})
-    coverletter_doc = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
-    jobdesc_doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
-
-    if not resume_doc or not coverletter_doc or not jobdesc_doc:
-        raise HTTPException(status_code=404, detail="Mindestens ein Dokument nicht gefunden.")
-
-    # Sicherheitsprüfung: Überprüfe, ob alle Dokumente zum gleichen user_id gehören.
-    if str(resume_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Resume does not belong to this user.")
-    if str(coverletter_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Cover letter does not belong to this user.")
-    if str(jobdesc_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Job description does not belong to this user.")
+    resume_field = "optimized_resume" if use_optimized_resume else "structured_resume"
+    coverletter_field = "optimized_coverletter" if use_optimized_coverletter else "structured_coverletter"
 
+    # Dokumente parallel laden (inkl. Sicherheitsprüfung: alle Dokumente gehören zum gleichen user_id)
+    resume_doc, coverletter_doc, jobdesc_doc = await load_analysis_documents(
+        user_id, resume_id, coverletter_id, jobdescription_id,
+        resume_field=resume_field,
+        coverletter_field=coverletter_field
+    )
 
-    resume_field = "optimized_resume" if use_optimized_resume else "structured_resume"
     structured_resume = resume_doc.get(resume_field)
-    
-    # ... und für das Anschreiben.
-    coverletter_field = "optimized_coverletter" if use_optimized_coverletter else "structured_coverletter"
     structured_coverletter = coverletter_doc.get(coverletter_field)
 
     structured_jobdesc = jobdesc_doc.get("structured_jobdescription")
@@ -539,70 +1111,23 @@ async def analysis_ats_optimized(
         raise HTTPException(status_code=400,
             detail="Bitte stelle sicher, dass alle Dokumente strukturiert sind. (Nutze /extract-structured-document)")
 
-    # 1) ATS Analyse (Resume + Cover Letter + Jobdesc)
-    ats_messages = get_prompt_messages_optimized_resume(
-        job_description=structured_jobdesc,
-        cover_letter=structured_coverletter,
-        resume=structured_resume,
-        language=language
+    # Analyse-Cache: identische Eingaben liefern das gespeicherte Ergebnis ohne LLM-Aufruf
+    cache_key = analysis_cache_key(
+        "ats_optimized", user_id, language, structured_resume, structured_coverletter, structured_jobdesc,
+        use_optimized_resume=use_optimized_resume, use_optimized_coverletter=use_optimized_coverletter
     )
-    try:
-        ats_response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=ats_messages,
-            temperature=0.0,
-            response_format={"type": "json_object"}
+    cached = None if force else await analysis_cache.get(cache_key)
+    if cached is not None:
+        combined_analysis, overall_status = cached["analysisResult"], cached["status"]
+    else:
+        combined_analysis, overall_status = await run_ats_optimized_analysis(
+            structured_resume, structured_coverletter, structured_jobdesc, language
         )
-        ats_output = ats_response.choices[0].message.content
-        try:
-            ats_analysis_json = json.loads(ats_output)
-            ats_status = "analysis_complete"
-        except json.JSONDecodeError:
-            ats_analysis_json = {"raw_response": ats_output}
-            ats_status = "analysis_incomplete"
-    except Exception as e:
-        ats_analysis_json = {"error": str(e)}
-        ats_status = "analysis_failed"
 
-    # 2) Cover Letter Analyse (Anschreiben separat analysieren)
-    cl_messages = get_prompt_messages_optimized_coverletter(
-        cover_letter=structured_coverletter,
-        job_description=structured_jobdesc,
-        language=language
-    )
-    try:
-        cl_response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=cl_messages,
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-        cl_output = cl_response.choices[0].message.content
-        try:
-            cl_analysis_json = json.loads(cl_output)
-            cl_status = "analysis_complete"
-        except json.JSONDecodeError:
-            cl_analysis_json = {"raw_response": cl_output}
-            cl_status = "analysis_incomplete"
-    except Exception as e:
-        cl_analysis_json = {"error": str(e)}
-        cl_status = "analysis_failed"
-
-    # Kombiniere die Ergebnisse in einer flachen Struktur
-    combined_analysis = {
-        "resume": ats_analysis_json,
-        "coverletter": cl_analysis_json
-    }
-    
-    # Bestimme den Gesamtstatus: Falls einer der beiden Analysen fehlschlägt, gilt das Gesamtergebnis als "analysis_failed".
-    overall_status = "analysis_complete" if ats_status == "analysis_complete" and cl_status == "analysis_complete" else "analysis_incomplete"
-    if ats_status == "analysis_failed" or cl_status == "analysis_failed":
-        overall_status = "analysis_failed"
-    
     # Speichere das kombinierte Analyse-Ergebnis in der Collection analysis_db.analysis.
     # Dabei werden die IDs von Lebenslauf, Anschreiben und Stellenbeschreibung gespeichert.
     if update_existing_analysis_id:
-        collection_analysis.update_one(
+        await db.collection_analysis.update_one(
             {"_id": ObjectId(update_existing_analysis_id)},
             {"$set": {
                 "analysisResult": combined_analysis,
@@ -611,6 +1136,8 @@ async def analysis_ats_optimized(
             }}
         )
         analysis_id = update_existing_analysis_id
+    elif cached is not None and await cached_analysis_exists(cached):
+        analysis_id = cached["analysis_id"]
     else:
         result_doc = {
             "resumeId": resume_id,
@@ -622,13 +1149,21 @@ async def analysis_ats_optimized(
             "language": language,
             "createdAt": datetime.utcnow()
         }
-        insert_result = collection_analysis.insert_one(result_doc)
+        insert_result = await db.collection_analysis.insert_one(result_doc)
         analysis_id = str(insert_result.inserted_id)
     
+    if overall_status == "analysis_complete" and (cached is None or cached.get("analysis_id") != analysis_id):
+        await analysis_cache.set(cache_key, {
+            "analysis_id": analysis_id,
+            "status": overall_status,
+            "analysisResult": combined_analysis
+        })
+
     return {
         "analysis_id": analysis_id,
         "status": overall_status,
-        "analysisResult": combined_analysis
+        "analysisResult": combined_analysis,
+        "cached": cached is not None
     }
 
 '''# ################################################################
@@ -646,14 +1181,14 @@ async def analysis_coverletter(
     
     Endpoint: GET /analysis-coverletter?coverletter_id=...&jobdescription_id=...&language=...
     """
-    coverletter_doc = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
+    coverletter_doc = await db.collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
     if not coverletter_doc:
         raise HTTPException(status_code=404, detail="Cover letter not found.")
     structured_coverletter = coverletter_doc.get("structured_coverletter")
     if not structured_coverletter:
         raise HTTPException(status_code=400, detail="Cover letter not structured yet. Use /extract-structured-document first.")
 
-    jobdesc_doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+    jobdesc_doc = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
     if not jobdesc_doc:
         raise HTTPException(status_code=404, detail="Job description not found.")
     structured_jobdesc = jobdesc_doc.get("structured_jobdescription")
@@ -661,23 +1196,7 @@ async def analysis_coverletter(
         raise HTTPException(status_code=400, detail="Job description not structured yet. Use /extract-structured-document first.")
 
     messages = get_prompt_messages_coverletter_analysis(structured_coverletter, structured_jobdesc, language)
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-        ai_output = response.choices[0].message.content
-        try:
-            coverletter_analysis_json = json.loads(ai_output)
-            analysis_status = "analysis_complete"
-        except json.JSONDecodeError:
-            coverletter_analysis_json = {"raw_response": ai_output}
-            analysis_status = "analysis_incomplete"
-    except Exception as e:
-        coverletter_analysis_json = {"error": str(e)}
-        analysis_status = "analysis_failed"
+    coverletter_analysis_json, analysis_status = await cascade.chat_json("coverletter_analysis", messages, "analysis", temperature=0.7)
 
     result_doc = {
         "coverLetterId": coverletter_id,
@@ -687,7 +1206,7 @@ async def analysis_coverletter(
         "language": language,
         "createdAt": datetime.utcnow()
     }
-    insert_result = collection_analysis.insert_one(result_doc)
+    insert_result = await db.collection_analysis.insert_one(result_doc)
     return {
         "analysis_id": str(insert_result.inserted_id),
         "status": analysis_status,
@@ -698,30 +1217,13 @@ async def analysis_coverletter(
 # ###########################################################
 # ## Optimierung des Lebenslaufs basierend auf der Analyse ##
 # ###########################################################
-@app.get("/optimize-resume-from-analysis")
-async def optimize_resume_from_analysis(
-    analysis_id: str = Query(..., description="MongoDB _id from the analysis document"),
-    language: str = Query("de", description="Target language: en, de, pl"),
-    user_id: str = Query(..., description="User ID (as string) to restrict access")
-
-):
+async def prepare_resume_optimization(analysis_id: str, language: str, user_id: str):
     """
-    Optimiert den Lebenslauf basierend auf einem existierenden Analyse-Dokument.
-    - Das Analyse-Dokument enthält die resumeId und Verbesserungsvorschläge.
-    - Der zugehörige Lebenslauf wird geladen und der Prompt zur Optimierung wird erstellt.
-    - Das optimierte Ergebnis wird in der Resume-Collection gespeichert.
-    
-    Endpoint-Beispiel:
-      /optimize-resume-from-analysis?analysis_id=...&language=de
-      
-    http://127.0.0.1:8000/optimize-resume-from-analysis?analysis_id=DEINE_ID&language=de
-    http://127.0.0.1:8000/optimize-resume-from-analysis?analysis_id=67e3258314faaade09bf8e38&language=de
-    
-    Rückgabe:
-      JSON mit "analysis_id", "resume_id", "optimize_status" und "optimized_resume".
+    Lädt Analyse- und Resume-Dokument, prüft die Berechtigung und baut den Optimierungs-Prompt.
+    Rückgabe: Tupel (resume_id, messages)
     """
     # 1. Analysis-Dokument laden
-    analysis_doc = collection_analysis.find_one({"_id": ObjectId(analysis_id)})
+    analysis_doc = await db.collection_analysis.find_one({"_id": ObjectId(analysis_id)})
     if not analysis_doc:
         raise HTTPException(status_code=404, detail="Analysis record not found.")
 
@@ -754,7 +1256,7 @@ async def optimize_resume_from_analysis(
 
 
     # 3. Resume-Dokument laden
-    resume_doc = collection_resume.find_one({"_id": ObjectId(resume_id)})
+    resume_doc = await db.collection_resume.find_one({"_id": ObjectId(resume_id)})
     if not resume_doc:
         raise HTTPException(status_code=404, detail="Resume not found in database.")
 
@@ -776,27 +1278,11 @@ async def optimize_resume_from_analysis(
         language=language
     )
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            temperature=0.2,
-            response_format={"type": "json_object"}
-        )
-        ai_output = response.choices[0].message.content
+    return resume_id, messages
 
-        try:
-            optimized_resume_json = json.loads(ai_output)
-            optimize_status = "optimized_complete"
-        except json.JSONDecodeError:
-            optimized_resume_json = {"raw_response": ai_output}
-            optimize_status = "optimized_incomplete"
-    except Exception as e:
-        optimized_resume_json = {"error": str(e)}
-        optimize_status = "optimized_failed"
-
-    # 5. Speichern (z. B. unter 'optimized_resume')
-    collection_resume.update_one(
+async def save_optimized_resume(resume_id, optimized_resume_json: dict, optimize_status: str):
+    """Speichert das Optimierungsergebnis unter 'optimized_resume' im Resume-Dokument."""
+    await db.collection_resume.update_one(
         {"_id": ObjectId(resume_id)},
         {
             "$set": {
@@ -807,6 +1293,37 @@ async def optimize_resume_from_analysis(
         }
     )
 
+@app.get("/optimize-resume-from-analysis")
+@single_flight.coalesce("optimize-resume-from-analysis")
+async def optimize_resume_from_analysis(
+    analysis_id: str = Query(..., description="MongoDB _id from the analysis document"),
+    language: str = Query("de", description="Target language: en, de, pl"),
+    user_id: str = Query(..., description="User ID (as string) to restrict access")
+
+):
+    """
+    Optimiert den Lebenslauf basierend auf einem existierenden Analyse-Dokument.
+    - Das Analyse-Dokument enthält die resumeId und Verbesserungsvorschläge.
+    - Der zugehörige Lebenslauf wird geladen und der Prompt zur Optimierung wird erstellt.
+    - Das optimierte Ergebnis wird in der Resume-Collection gespeichert.
+    - Gleichzeitige identische Aufrufe (gleiche Parameter) teilen sich eine Ausführung.
+    
+    Endpoint-Beispiel:
+      /optimize-resume-from-analysis?analysis_id=...&language=de
+      
+    http://127.0.0.1:8000/optimize-resume-from-analysis?analysis_id=DEINE_ID&language=de
+    http://127.0.0.1:8000/optimize-resume-from-analysis?analysis_id=67e3258314faaade09bf8e38&language=de
+    
+    Rückgabe:
+      JSON mit "analysis_id", "resume_id", "optimize_status" und "optimized_resume".
+    """
+    resume_id, messages = await prepare_resume_optimization(analysis_id, language, user_id)
+
+    optimized_resume_json, optimize_status = await llm.chat_json(messages, "optimized", temperature=0.2)
+
+    # 5. Speichern (z. B. unter 'optimized_resume')
+    await save_optimized_resume(resume_id, optimized_resume_json, optimize_status)
+
     return {
         "analysis_id": analysis_id,
         "resume_id": str(resume_id),
@@ -814,6 +1331,57 @@ async def optimize_resume_from_analysis(
         "optimized_resume": optimized_resume_json
     }
 
+@app.get("/optimize-resume-from-analysis/stream")
+async def optimize_resume_from_analysis_stream(
+    analysis_id: str = Query(..., description="MongoDB _id from the analysis document"),
+    language: str = Query("de", description="Target language: en, de, pl"),
+    user_id: str = Query(..., description="User ID (as string) to restrict access")
+):
+    """
+    Streaming-Variante von /optimize-resume-from-analysis (Server-Sent Events).
+
+    Events:
+      - token:   {"delta": "..."} für jedes vom Modell erzeugte Textstück
+      - section: {"key": "summary", "value": {...}} sobald ein Top-Level-Abschnitt vollständig ist
+      - done:    dieselbe Antwort wie /optimize-resume-from-analysis
+
+    Das Ergebnis wird wie beim nicht-streamenden Endpunkt in der Resume-Collection gespeichert.
+    """
+    # Validierung vor dem Stream, damit Fehler weiterhin als HTTP-Status ankommen
+    resume_id, messages = await prepare_resume_optimization(analysis_id, language, user_id)
+
+    async def event_stream():
+        parser = JsonSectionParser()
+        chunks = []
+        try:
+            async for delta in llm.stream_chat(
+                messages,
+                temperature=0.2,
+                response_format={"type": "json_object"}
+            ):
+                chunks.append(delta)
+                yield sse_event("token", {"delta": delta})
+                for key, value in parser.feed(delta):
+                    yield sse_event("section", {"key": key, "value": value})
+            optimized_resume_json, optimize_status = parse_json_output("".join(chunks), "optimized")
+        except Exception as e:
+            optimized_resume_json, optimize_status = {"error": str(e)}, "optimized_failed"
+
+        await save_optimized_resume(resume_id, optimized_resume_json, optimize_status)
+
+        yield sse_event("done", {
+            "analysis_id": analysis_id,
+            "resume_id": str(resume_id),
+            "optimize_status": optimize_status,
+            "optimized_resume": optimized_resume_json
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ###########################################################
 # ## Optimierung des Anschreiben basierend auf der Analyse ##
 # ###########################################################
@@ -838,7 +1406,10 @@ async def optimize_coverletter_from_analysis(
       JSON mit "analysis_id", "coverletter_id", "optimize_status" und "optimized_coverletter".
     """
     # 1. Analyse-Dokument laden
-    analysis_doc = collection_analysis.find_one({"_id": ObjectId(analysis_id)})
+    analysis_doc = await db.collection_analysis.find_one(
+        {"_id": ObjectId(analysis_id)},
+        {"userId": 1, "coverLetterId": 1, "jobdescriptionId": 1, "analysisResult.coverletter": 1}
+    )
     if not analysis_doc:
         raise HTTPException(status_code=404, detail="Analysis record not found.")
 
@@ -856,22 +1427,21 @@ async def optimize_coverletter_from_analysis(
     improvement_suggestions = analysis_result.get("coverletter", {}).get("cover_letter_analysis", {})
 
     print('improvement_suggestion of main:', improvement_suggestions)
-    # 4. Anschreiben aus der Datenbank laden
-    coverletter_doc = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
-    if not coverletter_doc:
-        raise HTTPException(status_code=404, detail="Cover letter not found in database.")
-    
+    jobdesc_id = analysis_doc.get("jobdescriptionId")
+    if not jobdesc_id:
+        raise HTTPException(status_code=400, detail="No jobdescriptionId in analysis document.")
+
+    # 4./5. Anschreiben und Jobbeschreibung (zum Vergleich des Betreffs) parallel laden
+    coverletter_doc, jobdesc_doc = await load_owned_documents(
+        user_id,
+        DocumentRequest(db.collection_coverletter, coverletter_id, "structured_coverletter", "Cover letter"),
+        DocumentRequest(db.collection_jobdesc, jobdesc_id, "structured_jobdescription", "Job description")
+    )
+
     structured_coverletter = coverletter_doc.get("structured_coverletter")
     if not structured_coverletter:
         raise HTTPException(status_code=400, detail="Cover letter has not been structured yet. Use /extract-structured-document first.")
 
-    # 5. Jobbeschreibung laden (zum Vergleich des Betreffs)
-    jobdesc_id = analysis_doc.get("jobdescriptionId")
-    if not jobdesc_id:
-        raise HTTPException(status_code=400, detail="No jobdescriptionId in analysis document.")
-    jobdesc_doc = collection_jobdesc.find_one({"_id": ObjectId(jobdesc_id)})
-    if not jobdesc_doc:
-        raise HTTPException(status_code=404, detail="Job description not found in database.")
     structured_jobdesc = jobdesc_doc.get("structured_jobdescription")
     if not structured_jobdesc:
         raise HTTPException(status_code=400, detail="Job description has not been structured yet. Use /extract-structured-document first.")
@@ -884,26 +1454,10 @@ async def optimize_coverletter_from_analysis(
         language=language
     )
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            temperature=0.2,
-            response_format={"type": "json_object"}
-        )
-        ai_output = response.choices[0].message.content
-        try:
-            optimized_coverletter_json = json.loads(ai_output)
-            optimize_status = "optimized_complete"
-        except json.JSONDecodeError:
-            optimized_coverletter_json = {"raw_response": ai_output}
-            optimize_status = "optimized_incomplete"
-    except Exception as e:
-        optimized_coverletter_json = {"error": str(e)}
-        optimize_status = "optimized_failed"
+    optimized_coverletter_json, optimize_status = await llm.chat_json(messages, "optimized", temperature=0.2)
 
     # 7. Speichern des optimierten Anschreibens in der CoverLetter-Collection
-    collection_coverletter.update_one(
+    await db.collection_coverletter.update_one(
         {"_id": ObjectId(coverletter_id)},
         {
             "$set": {
@@ -924,6 +1478,16 @@ async def optimize_coverletter_from_analysis(
 # ############################################
 # ## ATS Analyse auf optimiertem Lebenslauf ##
 # ############################################
+async def cache_optimized_analysis(cache_key: str, cached: dict, analysis_id: str, status: str, optimized_analysis: dict):
+    """Legt vollständige Ergebnisse im Analyse-Cache ab (bzw. verweist einen Treffer auf das neue Dokument)."""
+    if status != "analysis_complete" or (cached is not None and cached.get("analysis_id") == analysis_id):
+        return
+    await analysis_cache.set(cache_key, {
+        "analysis_id": analysis_id,
+        "status": status,
+        "optimized_analysis": optimized_analysis
+    })
+
 @app.get("/analysis-ats-optimized")
 async def analysis_ats_optimized(
     resume_id: str = Query(...),
@@ -931,6 +1495,7 @@ async def analysis_ats_optimized(
     jobdescription_id: str = Query(...),
     language: str = Query("de"),
     update_existing_analysis_id: str = Query(None),
+    force: bool = Query(False, description="Set to true to bypass the analysis cache"),
     user_id: str = Query(..., description="User ID (as string) to restrict access")
 
 ):
@@ -938,6 +1503,7 @@ async def analysis_ats_optimized(
     Führt eine neue ATS-Analyse basierend auf dem optimierten Lebenslauf durch.
     Optional: Wenn update_existing_analysis_id angegeben ist, wird das bestehende Analyse-Dokument
     in der Collection analysis_db.analysis aktualisiert.
+    Identische Eingaben liefern das gespeicherte Ergebnis aus dem Analyse-Cache (force=true umgeht ihn).
     
     Endpoint-Beispiele:
       - Neuer Eintrag:
@@ -949,57 +1515,42 @@ async def analysis_ats_optimized(
       JSON mit "analysis_id", "status" und "analysisResult" (das optimierte Analyse-Ergebnis).
     """
 
-    resume_doc = collection_resume.find_one({"_id": ObjectId(resume_id)})
-    coverletter_doc = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
-    jobdesc_doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
-
-
-    
-    if not resume_doc or not coverletter_doc or not jobdesc_doc:
-        raise HTTPException(status_code=404, detail="One or more documents not found.")
+    # Dokumente parallel laden (inkl. Sicherheitsprüfung: alle Dokumente gehören zum gleichen user_id)
+    resume_doc, coverletter_doc, jobdesc_doc = await load_analysis_documents(
+        user_id, resume_id, coverletter_id, jobdescription_id,
+        resume_field="optimized_resume"
+    )
 
-    # Sicherheitsprüfung: Überprüfe, ob alle Dokumente zum gleichen user_id gehören.
-    if str(resume_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Resume does not belong to this user.")
-    if str(coverletter_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Cover letter does not belong to this user.")
-    if str(jobdesc_doc.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden: Job description does not belong to this user.")
-    
     optimized_resume = resume_doc.get("optimized_resume")
-    resume_str = json.dumps(resume_doc.get("optimized_resume"), ensure_ascii=False, indent=2)
 
     if not optimized_resume:
         raise HTTPException(status_code=400, detail="Resume not optimized yet.")
 
-    messages = get_prompt_messages_analysis_optimized(
-        job_description=jobdesc_doc.get("structured_jobdescription", {}),
-        cover_letter=coverletter_doc.get("structured_coverletter", {}),
-        optimized_resume=optimized_resume,
-        language=language
+    structured_coverletter = coverletter_doc.get("structured_coverletter", {})
+    structured_jobdesc = jobdesc_doc.get("structured_jobdescription", {})
+
+    cache_key = analysis_cache_key(
+        "ats-optimized", user_id, language, optimized_resume, structured_coverletter, structured_jobdesc
     )
+    cached = None if force else await analysis_cache.get(cache_key)
+    if cached is not None:
+        optimized_analysis_json, analysis_status = cached["optimized_analysis"], cached["status"]
+    else:
+        validate_token_budget(optimized_resume, structured_coverletter, structured_jobdesc)
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            temperature=0.0,
-            response_format={"type": "json_object"}
+        messages = get_prompt_messages_analysis_optimized(
+            job_description=structured_jobdesc,
+            cover_letter=structured_coverletter,
+            optimized_resume=optimized_resume,
+            language=language
         )
-        ai_output = response.choices[0].message.content
-        try:
-            optimized_analysis_json = json.loads(ai_output)
-            analysis_status = "analysis_complete"
-        except json.JSONDecodeError:
-            optimized_analysis_json = {"raw_response": ai_output}
-            analysis_status = "analysis_incomplete"
-    except Exception as e:
-        optimized_analysis_json = {"error": str(e)}
-        analysis_status = "analysis_failed"
+
+        optimized_analysis_json, analysis_status = await cascade.chat_json("analysis", messages, "analysis", temperature=0.0)
+        apply_match_score(optimized_analysis_json)
 
     # Optional: Bestehendes Analysis-Doc updaten
     if update_existing_analysis_id:
-        collection_analysis.update_one(
+        await db.collection_analysis.update_one(
             {"_id": ObjectId(update_existing_analysis_id)},
             {
                 "$set": {
@@ -1009,10 +1560,20 @@ async def analysis_ats_optimized(
                 }
             }
         )
+        await cache_optimized_analysis(cache_key, cached, update_existing_analysis_id, analysis_status, optimized_analysis_json)
         return {
             "updated_analysis_id": update_existing_analysis_id,
             "status": analysis_status,
-            "optimized_analysis": optimized_analysis_json
+            "optimized_analysis": optimized_analysis_json,
+            "cached": cached is not None
+        }
+
+    if cached is not None and await cached_analysis_exists(cached):
+        return {
+            "analysis_id": cached["analysis_id"],
+            "status": analysis_status,
+            "optimized_analysis": optimized_analysis_json,
+            "cached": True
         }
 
     # Neu speichern
@@ -1028,14 +1589,79 @@ async def analysis_ats_optimized(
         "createdAt": datetime.utcnow()
     }
 
-    insert_result = collection_analysis.insert_one(result_doc)
+    insert_result = await db.collection_analysis.insert_one(result_doc)
+    analysis_id = str(insert_result.inserted_id)
+    await cache_optimized_analysis(cache_key, cached, analysis_id, analysis_status, optimized_analysis_json)
 
     return {
-        "analysis_id": str(insert_result.inserted_id),
+        "analysis_id": analysis_id,
         "status": analysis_status,
-        "optimized_analysis": optimized_analysis_json
+        "optimized_analysis": optimized_analysis_json,
+        "cached": cached is not None
     }
 
+# ###########################################################
+# ## Match-Score gespeicherter Analysen neu berechnen ##
+# ###########################################################
+async def rescore_batch(docs: list) -> int:
+    """Berechnet die match_scores eines Dokument-Batches in einem Durchlauf und schreibt Änderungen per bulk_write."""
+    entries = []
+    for doc in docs:
+        for path in MATCH_SCORE_PATHS:
+            match_score = get_path(doc, path)
+            if isinstance(match_score, dict):
+                entries.append((doc["_id"], path, match_score))
+    if not entries:
+        return 0
+
+    scores = compute_match_scores(
+        [len(match_score.get("matching_skills") or []) for _, _, match_score in entries],
+        [len(match_score.get("missing_skills") or []) for _, _, match_score in entries],
+        [len(match_score.get("additional_keywords") or []) for _, _, match_score in entries]
+    )
+    updates = [
+        UpdateOne({"_id": doc_id}, {"$set": {f"{path}.total_score": score}})
+        for (doc_id, path, match_score), score in zip(entries, scores)
+        if match_score.get("total_score") != score
+    ]
+    if updates:
+        await db.collection_analysis.bulk_write(updates, ordered=False)
+    return len(updates)
+
+@app.post("/rescore-analyses")
+async def rescore_analyses(
+    user_id: str = Query(..., description="User ID: nur die Analysen dieses Benutzers werden neu berechnet"),
+    batch_size: int = Query(500, ge=1, le=5000, description="Anzahl Dokumente pro bulk_write")
+):
+    """
+    Berechnet match_score.total_score der gespeicherten Analysen eines Benutzers lokal neu
+    (aus matching_skills, missing_skills und additional_keywords), ohne LLM-Aufruf.
+    """
+    query = {"userId": user_id, "$or": [{path: {"$exists": True}} for path in MATCH_SCORE_PATHS]}
+    projection = {path: 1 for path in MATCH_SCORE_PATHS}
+
+    scanned = 0
+    updated = 0
+    batch = []
+    async for doc in db.collection_analysis.find(query, projection):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            scanned += len(batch)
+            updated += await rescore_batch(batch)
+            batch = []
+    if batch:
+        scanned += len(batch)
+        updated += await rescore_batch(batch)
+
+    return {"scanned": scanned, "updated": updated}
+
+# Hintergrund-Jobs: die LLM-lastigen Endpunkte können auch über POST /jobs ausgeführt werden
+job_manager.register("extract-structured-document", extract_structured_document)
+job_manager.register("analysis-ats", analysis_ats)
+job_manager.register("analysis-ats-rank", analysis_ats_rank)
+job_manager.register("optimize-resume-from-analysis", optimize_resume_from_analysis)
+job_manager.register("optimize-coverletter-from-analysis", optimize_coverletter_from_analysis)
+
 @app.get("/")
 async def root():
     return {
@@ -1,9 +1,52 @@
-import json
 from app.core.config import RESUME_SCHEMA, COVERLETTER_SCHEMA  # oder SCHEMAS["resume"], SCHEMAS["coverletter"]
 from app.utils.resume_formatter import simplify_optimized_resume
+from app.utils.prompt_encoding import PromptEncoder
+from app.prompts.registry import get_system_prompt, register_system_prompt
 from app.utils.prompts import system_prompt_resume_coverletter_analysis_after_optimize_part_resume
 from app.utils.prompts import system_prompt_resume_coverletter_analysis_after_optimize_part_coverletter
 
+# Überschriften der dynamischen Abschnitte im User-Prompt
+SECTION_LABELS = {
+    "en": {
+        "job_description": "JOB DESCRIPTION (JSON)",
+        "cover_letter": "COVER LETTER (contains *SUGGESTION* markers)",
+        "resume": "RESUME (contains *SUGGESTION* markers)"
+    },
+    "de": {
+        "job_description": "STELLENBESCHREIBUNG (jobdescription)",
+        "cover_letter": "ANSCHREIBEN (CoverLetter, enthält *SUGGESTION*-Markierungen)",
+        "resume": "LEBENSLAUF (Resume, enthält *SUGGESTION*-Markierungen)"
+    },
+    "pl": {
+        "job_description": "OPIS STANOWISKA (jobdescription)",
+        "cover_letter": "LIST MOTYWACYJNY (CoverLetter, zawiera oznaczenia *SUGGESTION*)",
+        "resume": "CV (Resume, zawiera oznaczenia *SUGGESTION*)"
+    }
+}
+
+# Statische Schlussanweisungen (früher am Ende des User-Prompts)
+OUTPUT_RULES = {
+    "en": "All field names (keys) must be in English.\nThe contents (values) remain in English.\nFollow the instructions above and return only JSON in the structure given in the system message.",
+    "de": "Alle Feldnamen (keys) müssen auf Englisch sein.\nDie Inhalte (Werte) bleiben auf Deutsch.\nBitte befolge die obigen Anweisungen und liefere nur ein reines JSON-Objekt in der Struktur aus der System-Nachricht.",
+    "pl": "Wszystkie nazwy pól (klucze) muszą być w języku angielskim.\nZawartość (wartości) pozostaje w języku polskim.\nPostępuj zgodnie z powyższymi instrukcjami i zwróć wyłącznie obiekt JSON w strukturze podanej w wiadomości systemowej."
+}
+
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("analysis_all_optimized_resume", schema=RESUME_SCHEMA, legacy_schema_copies=2)
+def render_system_prompt_analysis_all_optimized_resume(language: str, structure: str) -> str:
+    system_base = system_prompt_resume_coverletter_analysis_after_optimize_part_resume()
+    lang = system_base.get(language, system_base["en"])
+    system_prompt = f"""
+            {lang['intro']}
+            {lang['input_desc']}
+            {lang['ats_logic']}
+            {lang['instructions']}
+            {lang['format']}
+            {structure}
+            """
+    return system_prompt.strip() + "\n\n" + OUTPUT_RULES.get(language, OUTPUT_RULES["en"])
+
+
 def get_prompt_messages_optimized_resume(job_description: dict,
                        cover_letter: dict,
                        resume: dict,
@@ -21,98 +64,46 @@ def get_prompt_messages_optimized_resume(job_description: dict,
     """
 
     # ----------------------------------------------------
-    # 1) Definiere unsere Ziel-Ausgabe-Struktur als String
+    # 1) Encoder für kompakte Inputs und Token-Metriken
     # ----------------------------------------------------
-    structure = RESUME_SCHEMA.strip()
+    encoder = PromptEncoder("analysis_all_optimized_resume")
 
     # -----------------------------------------------
-    # 2) JSON-Dumps für jobdescription / CoverLetter / Resume
+    # 2) Kompaktes JSON für jobdescription, Zeilenformat für CoverLetter / Resume
     # -----------------------------------------------
-    job_desc_str = json.dumps(job_description, ensure_ascii=False, indent=2)
+    job_desc_str = encoder.json(job_description)
     cover_letter_str = simplify_optimized_resume(cover_letter)
     resume_str = simplify_optimized_resume(resume)
 
     # -----------------------------------------------
-    # 3) System-Prompts in verschiedenen Sprachen
+    # 3) Vorgerenderter System-Prompt (inkl. Schema) aus der Registry
     # -----------------------------------------------
-    system_base = system_prompt_resume_coverletter_analysis_after_optimize_part_resume()
+    system_prompt = encoder.prefix(get_system_prompt("analysis_all_optimized_resume", language))
+    # -----------------------------------------------
+    # 4) User-Prompt: nur die dynamischen Abschnitte
+    # -----------------------------------------------
+    labels = SECTION_LABELS.get(language, SECTION_LABELS["en"])
+    encoder.report()
+    return system_prompt.messages([
+        (labels["job_description"], job_desc_str),
+        (labels["cover_letter"], cover_letter_str),
+        (labels["resume"], resume_str)
+    ])
+
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("analysis_all_optimized_coverletter", schema=COVERLETTER_SCHEMA, legacy_schema_copies=2)
+def render_system_prompt_analysis_all_optimized_coverletter(language: str, structure: str) -> str:
+    system_base = system_prompt_resume_coverletter_analysis_after_optimize_part_coverletter()
     lang = system_base.get(language, system_base["en"])
     system_prompt = f"""
             {lang['intro']}
             {lang['input_desc']}
-            {lang['ats_logic']}
-            {lang['match_logic']}
             {lang['instructions']}
             {lang['format']}
             {structure}
             """
-    # -----------------------------------------------
-    # 4) User-Prompts in verschiedenen Sprachen
-    # -----------------------------------------------
-    user_prompts = {
-        "en": f"""
-Below are the three JSON inputs:
-
-JOB DESCRIPTION (JSON):
-{job_desc_str}
-
-COVER LETTER (contains *SUGGESTION* markers):
-{cover_letter_str}
-
-RESUME (contains *SUGGESTION* markers):
-{resume_str}
-
-All field names (keys) must be in English.
-The contents (values) remain in English.
-Follow the instructions above and return only JSON in this structure:
-
-{structure}
-""",
-        "de": f"""
-Untenstehend findest du die drei JSON-Daten:
-
-STELLENBESCHREIBUNG (jobdescription):
-{job_desc_str}
-
-ANSCHREIBEN (CoverLetter, (enthält *SUGGESTION*-Markierungen):
-{cover_letter_str}
-
-LEBENSLAUF (Resume, enthält *SUGGESTION*-Markierungen):
-{resume_str}
-
-Alle Feldnamen (keys) müssen auf Englisch sein.
-Die Inhalte (Werte) bleiben auf Deutsch.
-Bitte befolge die obigen Anweisungen und liefere nur ein reines JSON-Objekt in dieser Struktur:
-
-{structure}
-""",
-        "pl": f"""
-Poniżej znajdują się trzy dane w formacie JSON:
-
-OPIS STANOWISKA (jobdescription):
-{job_desc_str}
-
-LIST MOTYWACYJNY (CoverLetter, zawiera oznaczenia *SUGGESTION*):
-{cover_letter_str}
+    return system_prompt.strip() + "\n\n" + OUTPUT_RULES.get(language, OUTPUT_RULES["en"])
 
-CV (Resume, zawiera oznaczenia *SUGGESTION*):
-{resume_str}
-
-Wszystkie nazwy pól (klucze) muszą być w języku angielskim.
-Zawartość (wartości) pozostaje w języku polskim.
-Postępuj zgodnie z powyższymi instrukcjami i zwróć wyłącznie obiekt JSON w poniższej strukturze:
-
-{structure}
-"""
-    }
-
-    # -----------------------------------------------
-    # 5) Zusammenbau der Prompts
-    # -----------------------------------------------
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompts.get(language, user_prompts["en"]).strip()}
-    ]
 
 def get_prompt_messages_optimized_coverletter(job_description: dict,
                        cover_letter: dict,
@@ -130,86 +121,28 @@ def get_prompt_messages_optimized_coverletter(job_description: dict,
     """
 
     # ----------------------------------------------------
-    # 1) Definiere unsere Ziel-Ausgabe-Struktur als String
+    # 1) Encoder für kompakte Inputs und Token-Metriken
     # ----------------------------------------------------
-    structure = COVERLETTER_SCHEMA.strip()
+    encoder = PromptEncoder("analysis_all_optimized_coverletter")
 
     # -----------------------------------------------
-    # 2) JSON-Dumps für jobdescription / CoverLetter / Resume
+    # 2) Kompaktes JSON für jobdescription, Zeilenformat für CoverLetter
     # -----------------------------------------------
-    job_desc_str = json.dumps(job_description, ensure_ascii=False, indent=2)
+    job_desc_str = encoder.json(job_description)
     cover_letter_str = simplify_optimized_resume(cover_letter)
 
     # -----------------------------------------------
-    # 3) System-Prompts in verschiedenen Sprachen
-    # -----------------------------------------------
-    system_base = system_prompt_resume_coverletter_analysis_after_optimize_part_coverletter()
-    lang = system_base.get(language, system_base["en"])
-    system_prompt = f"""
-            {lang['intro']}
-            {lang['input_desc']}
-            {lang['instructions']}
-            {lang['format']}
-            {structure}
-            """
-
-
-    # -----------------------------------------------
-    # 4) User-Prompts in verschiedenen Sprachen
+    # 3) Vorgerenderter System-Prompt (inkl. Schema) aus der Registry
     # -----------------------------------------------
-    user_prompts = {
-        "en": f"""
-Below are the three JSON inputs:
-
-JOB DESCRIPTION (JSON):
-{job_desc_str}
-
-COVER LETTER (contains *SUGGESTION* markers):
-{cover_letter_str}
-
-All field names (keys) must be in English.
-The contents (values) remain in English.
-Follow the instructions above and return only JSON in this structure:
-
-{structure}
-""",
-        "de": f"""
-Untenstehend findest du die drei JSON-Daten:
-
-STELLENBESCHREIBUNG (jobdescription):
-{job_desc_str}
-
-ANSCHREIBEN (CoverLetter, (enthält *SUGGESTION*-Markierungen):
-{cover_letter_str}
-
-Alle Feldnamen (keys) müssen auf Englisch sein.
-Die Inhalte (Werte) bleiben auf Deutsch.
-Bitte befolge die obigen Anweisungen und liefere nur ein reines JSON-Objekt in dieser Struktur:
-
-{structure}
-""",
-        "pl": f"""
-Poniżej znajdują się trzy dane w formacie JSON:
-
-OPIS STANOWISKA (jobdescription):
-{job_desc_str}
-
-LIST MOTYWACYJNY (CoverLetter, zawiera oznaczenia *SUGGESTION*):
-{cover_letter_str}
-
-Wszystkie nazwy pól (klucze) muszą być w języku angielskim.
-Zawartość (wartości) pozostaje w języku polskim.
-Postępuj zgodnie z powyższymi instrukcjami i zwróć wyłącznie obiekt JSON w poniższej strukturze:
-
-{structure}
-"""
-    }
+    system_prompt = encoder.prefix(get_system_prompt("analysis_all_optimized_coverletter", language))
 
     # -----------------------------------------------
-    # 5) Zusammenbau der Prompts
+    # 4) User-Prompt: nur die dynamischen Abschnitte
     # -----------------------------------------------
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompts.get(language, user_prompts["en"]).strip()}
-    ]
+    labels = SECTION_LABELS.get(language, SECTION_LABELS["en"])
+    encoder.report()
+    return system_prompt.messages([
+        (labels["job_description"], job_desc_str),
+        (labels["cover_letter"], cover_letter_str)
+    ])
 
@@ -1,75 +1,72 @@
 import json
 from app.core.config import ANALYSIS_SCHEMA
 from app.utils.resume_formatter import simplify_optimized_resume
+from app.utils.prompt_encoding import PromptEncoder
+from app.prompts.registry import get_system_prompt, register_system_prompt
 from app.utils.prompts import system_prompt_resume_analysis_after_optimize
 
-def get_prompt_messages(job_description: dict,
-                        cover_letter: dict,
-                        optimized_resume: dict,
-                        language: str = "en") -> list:
-    """
-    Erzeugt eine Liste von Nachrichten (System + User), um eine
-    ATS-/Recruiting-Analyse auf Basis des optimierten Lebenslaufs durchzuführen.
-    """
-
-    structure = ANALYSIS_SCHEMA.strip()
-
-    job_desc_str = json.dumps(job_description, ensure_ascii=False, indent=2)
-    cover_letter_str = json.dumps(cover_letter, ensure_ascii=False, indent=2)
-    resume_str = simplify_optimized_resume(optimized_resume)
-
-    print("📝 Optimized Resume being analyzed:\n")
-    print(json.dumps(optimized_resume, indent=2, ensure_ascii=False))
+# Überschriften der dynamischen Abschnitte im User-Prompt
+SECTION_LABELS = {
+    "en": {
+        "job_description": "JOB DESCRIPTION",
+        "cover_letter": "COVER LETTER",
+        "resume": "OPTIMIZED RESUME (contains *SUGGESTION* markers)"
+    },
+    "de": {
+        "job_description": "STELLENBESCHREIBUNG",
+        "cover_letter": "ANSCHREIBEN",
+        "resume": "OPTIMIERTER LEBENSLAUF (enthält *SUGGESTION*-Markierungen)"
+    },
+    "pl": {
+        "job_description": "OPIS STANOWISKA",
+        "cover_letter": "LIST MOTYWACYJNY",
+        "resume": "CV PO OPTYMALIZACJI (zawiera oznaczenia *SUGGESTION*)"
+    }
+}
 
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("analysis_optimized", schema=ANALYSIS_SCHEMA)
+def render_system_prompt_analysis_optimized(language: str, structure: str) -> str:
     system_base = system_prompt_resume_analysis_after_optimize()
     lang = system_base.get(language, system_base["en"])
     system_prompt = f"""
             {lang['intro']}
             {lang['input_desc']}
             {lang['ats_logic']}
-            {lang['match_logic']}
             {lang['instructions']}
             {lang['format']}
             {structure}
             """
+    return system_prompt
 
-    # ------------------------
-    # USER PROMPTS
-    # ------------------------
-    user_prompts = {
-        "en": f"""
-        JOB DESCRIPTION:
-        {job_desc_str}
-
-        COVER LETTER:
-        {cover_letter_str}
 
-        OPTIMIZED RESUME (contains *SUGGESTION* markers):
-        {resume_str}
-        """,
-                "de": f"""
-        STELLENBESCHREIBUNG:
-        {job_desc_str}
+def get_prompt_messages(job_description: dict,
+                        cover_letter: dict,
+                        optimized_resume: dict,
+                        language: str = "en") -> list:
+    """
+    Erzeugt eine Liste von Nachrichten (System + User), um eine
+    ATS-/Recruiting-Analyse auf Basis des optimierten Lebenslaufs durchzuführen.
+    """
 
-        ANSCHREIBEN:
-        {cover_letter_str}
+    encoder = PromptEncoder("analysis_optimized")
 
-        OPTIMIERTER LEBENSLAUF (enthält *SUGGESTION*-Markierungen):
-        {resume_str}
-        """,
-                "pl": f"""
-        OPIS STANOWISKA:
-        {job_desc_str}
+    job_desc_str = encoder.json(job_description)
+    cover_letter_str = encoder.json(cover_letter)
+    resume_str = simplify_optimized_resume(optimized_resume)
 
-        LIST MOTYWACYJNY:
-        {cover_letter_str}
+    print("📝 Optimized Resume being analyzed:\n")
+    print(json.dumps(optimized_resume, indent=2, ensure_ascii=False))
 
-        CV PO OPTYMALIZACJI (zawiera oznaczenia *SUGGESTION*):
-        {resume_str}
-        """
-    }
+    system_prompt = encoder.prefix(get_system_prompt("analysis_optimized", language))
 
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompts.get(language, user_prompts["en"]).strip()}
-    ]
+    # ------------------------
+    # USER PROMPT: nur die dynamischen Abschnitte
+    # ------------------------
+    labels = SECTION_LABELS.get(language, SECTION_LABELS["en"])
+    encoder.report()
+    return system_prompt.messages([
+        (labels["job_description"], job_desc_str),
+        (labels["cover_letter"], cover_letter_str),
+        (labels["resume"], resume_str)
+    ])
@@ -0,0 +1,27 @@
+CHUNK_NOTES = {
+    "de": (
+        "HINWEIS: Dies ist Ausschnitt {index} von {total} des Dokuments. "
+        "Übernimm nur Informationen, die in diesem Ausschnitt stehen, und lass alle übrigen Felder leer "
+        "(leere Strings bzw. leere Listen). Erfinde keine Platzhalter."
+    ),
+    "en": (
+        "NOTE: This is excerpt {index} of {total} of the document. "
+        "Only include information contained in this excerpt and leave all other fields empty "
+        "(empty strings or empty lists). Do not invent placeholders."
+    ),
+    "pl": (
+        "UWAGA: To jest fragment {index} z {total} dokumentu. "
+        "Uwzględnij tylko informacje zawarte w tym fragmencie, a pozostałe pola pozostaw puste "
+        "(puste ciągi znaków lub puste listy). Nie wymyślaj wartości zastępczych."
+    ),
+}
+
+
+def with_chunk_note(messages: list, index: int, total: int, language: str = "en") -> list:
+    """
+    Hängt den Hinweis für Teil-Dokumente an die letzte (User-)Nachricht an.
+    Der System-Prompt bleibt unverändert und damit als Präfix cachebar.
+    """
+    note = CHUNK_NOTES.get(language, CHUNK_NOTES["en"]).format(index=index, total=total)
+    last = messages[-1]
+    return messages[:-1] + [{**last, "content": f"{last['content']}\n\n{note}"}]
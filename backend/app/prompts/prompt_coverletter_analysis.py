@@ -1,6 +1,31 @@
-import json
 from app.core.config import COVERLETTER_ANALYSIS_SCHEMA
 from app.utils.prompts import system_prompt_coverletter_analysis
+from app.utils.prompt_encoding import PromptEncoder
+from app.prompts.registry import get_system_prompt, register_system_prompt
+
+# Überschriften der dynamischen Abschnitte im User-Prompt
+SECTION_LABELS = {
+    "en": {"cover_letter": "COVER LETTER (JSON)", "job_description": "JOB DESCRIPTION (JSON)"},
+    "de": {"cover_letter": "ANSCHREIBEN (JSON)", "job_description": "STELLENBESCHREIBUNG (JSON)"},
+    "pl": {"cover_letter": "LIST MOTYWACYJNY (JSON)", "job_description": "OPIS STANOWISKA (JSON)"}
+}
+
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("coverletter_analysis", schema=COVERLETTER_ANALYSIS_SCHEMA)
+def render_system_prompt_coverletter_analysis(language: str, structure: str) -> str:
+    system_base = system_prompt_coverletter_analysis()
+    lang_data = system_base.get(language, system_base["en"])
+    system_prompt = f"""
+        {lang_data['intro']}
+        {lang_data['input_desc']}
+
+        {lang_data['instructions']}
+
+        {lang_data['format']}
+        {structure}
+        """
+    return system_prompt
+
 
 # ------------------------
 # Funktion zur Erstellung des vollständigen Prompts für die Analyse des Anschreibens
@@ -12,48 +37,16 @@ def get_prompt_messages(cover_letter: dict, job_description: dict, language: str
     ATS-/Recruiting-Analyse auf Basis des optimierten Lebenslaufs durchzuführen.
     """
 
-    structure = COVERLETTER_ANALYSIS_SCHEMA.strip()
+    encoder = PromptEncoder("coverletter_analysis")
 
-    cover_letter_str = json.dumps(cover_letter, ensure_ascii=False, indent=2)
-    job_desc_str = json.dumps(job_description, ensure_ascii=False, indent=2)
+    cover_letter_str = encoder.json(cover_letter)
+    job_desc_str = encoder.json(job_description)
 
-    system_base = system_prompt_coverletter_analysis()
-    lang_data = system_base.get(language, system_base["en"])
-    system_prompt = f"""
-        {lang_data['intro']}
-        {lang_data['input_desc']}
-
-        {lang_data['instructions']}
-
-        {lang_data['format']}
-        {structure}
-        """
-
-    user_prompts = {
-                "en": f"""
-        COVER LETTER (JSON):
-        {cover_letter_str}
-
-        JOB DESCRIPTION (JSON):
-        {job_desc_str}
-        """,
-                "de": f"""
-        ANSCHREIBEN (JSON):
-        {cover_letter_str}
-
-        STELLENBESCHREIBUNG (JSON):
-        {job_desc_str}
-        """,
-                "pl": f"""
-        LIST MOTYWACYJNY (JSON):
-        {cover_letter_str}
-
-        OPIS STANOWISKA (JSON):
-        {job_desc_str}
-        """
-        }
+    system_prompt = encoder.prefix(get_system_prompt("coverletter_analysis", language))
 
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompts.get(language, user_prompts["en"]).strip()}
-    ]
\ No newline at end of file
+    labels = SECTION_LABELS.get(language, SECTION_LABELS["en"])
+    encoder.report()
+    return system_prompt.messages([
+        (labels["cover_letter"], cover_letter_str),
+        (labels["job_description"], job_desc_str)
+    ])
@@ -1,6 +1,37 @@
-import json
 from app.core.config import COVERLETTER_SCHEMA  # oder SCHEMAS["coverletter"]
 from app.utils.prompts import system_prompt_coverletter_optimize  # Wir definieren einen speziellen System-Prompt
+from app.utils.prompt_encoding import PromptEncoder
+from app.prompts.registry import get_system_prompt, register_system_prompt
+
+# Überschriften der dynamischen Abschnitte im User-Prompt
+SECTION_LABELS = {
+    "en": {"cover_letter": "COVER LETTER (JSON)", "job_description": "JOB DESCRIPTION (JSON)", "suggestions": "IMPROVEMENT SUGGESTIONS"},
+    "de": {"cover_letter": "ANSCHREIBEN (JSON)", "job_description": "STELLENBESCHREIBUNG (JSON)", "suggestions": "VERBESSERUNGSVORSCHLÄGE"},
+    "pl": {"cover_letter": "LIST MOTYWACYJNY (JSON)", "job_description": "OPIS STANOWISKA (JSON)", "suggestions": "SUGESTIE ULEPSZEŃ"}
+}
+
+# Statische Schlussanweisungen (früher am Ende des User-Prompts)
+OUTPUT_RULES = {
+    "en": "Ensure the JSON structure remains unchanged.\nReturn only a single JSON object.",
+    "de": "Behalte die ursprüngliche JSON-Struktur bei.\nGib nur ein einziges JSON-Objekt zurück.",
+    "pl": "Zachowaj strukturę JSON.\nZwróć tylko jeden obiekt JSON."
+}
+
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("coverletter_optimize", schema=COVERLETTER_SCHEMA)
+def render_system_prompt_coverletter_optimize(language: str, structure: str) -> str:
+    system_base = system_prompt_coverletter_optimize()  # Neuer System-Prompt speziell für die Optimierung
+    lang_data = system_base.get(language, system_base["en"])
+    system_prompt = f"""
+    {lang_data['intro']}
+    {lang_data['input_desc']}
+    {lang_data['instructions']}
+    {lang_data['compare_instructions']}
+    {lang_data['format']}
+    {structure}
+    """
+    return system_prompt.strip() + "\n\n" + OUTPUT_RULES.get(language, OUTPUT_RULES["en"])
+
 
 def get_prompt_messages(coverletter_content: dict, job_description: dict, improvement_suggestions: dict, language: str = "en") -> list:
     """
@@ -15,70 +46,23 @@ def get_prompt_messages(coverletter_content: dict, job_description: dict, improv
     :return: Liste von Nachrichten für das KI-Modell.
     """
     # 1) Definiere das Ziel-Schema
-    structure = COVERLETTER_SCHEMA.strip()
+    encoder = PromptEncoder("coverletter_optimize")
 
-    # 2) Die Inputs als JSON-Strings vorbereiten
-    coverletter_str = json.dumps(coverletter_content, ensure_ascii=False, indent=2)
-    jobdesc_str = json.dumps(job_description, ensure_ascii=False, indent=2)
-    suggestions_str = json.dumps(improvement_suggestions, ensure_ascii=False, indent=2)
+    # 2) Die Inputs als kompakte JSON-Strings vorbereiten
+    #    (leere Felder im Anschreiben bleiben erhalten, die Struktur soll identisch zurückkommen)
+    coverletter_str = encoder.json(coverletter_content, strip=False)
+    jobdesc_str = encoder.json(job_description)
+    suggestions_str = encoder.json(improvement_suggestions)
 
     
     # 3) System-Prompt anhand des speziellen Coverletter-Optimierungs-Prompts erstellen
-    system_base = system_prompt_coverletter_optimize()  # Neuer System-Prompt speziell für die Optimierung
-    lang_data = system_base.get(language, system_base["en"])
-    system_prompt = f"""
-    {lang_data['intro']}
-    {lang_data['input_desc']}
-    {lang_data['instructions']}
-    {lang_data['compare_instructions']}
-    {lang_data['format']}
-    {structure}
-    """
-
-    # 4) User-Prompt erstellen
-    user_prompts = {
-        "en": f"""
-COVER LETTER (JSON):
-{coverletter_str}
-
-JOB DESCRIPTION (JSON):
-{jobdesc_str}
-
-IMPROVEMENT SUGGESTIONS:
-{suggestions_str}
-
-Ensure the JSON structure remains unchanged.
-Return only a single JSON object.
-""",
-        "de": f"""
-ANSCHREIBEN (JSON):
-{coverletter_str}
-
-STELLENBESCHREIBUNG (JSON):
-{jobdesc_str}
-
-VERBESSERUNGSVORSCHLÄGE:
-{suggestions_str}
-
-Behalte die ursprüngliche JSON-Struktur bei.
-Gib nur ein einziges JSON-Objekt zurück.
-""",
-        "pl": f"""
-LIST MOTYWACYJNY (JSON):
-{coverletter_str}
-
-OPIS STANOWISKA (JSON):
-{jobdesc_str}
-
-SUGESTIE ULEPSZEŃ:
-{suggestions_str}
-
-Zachowaj strukturę JSON.
-Zwróć tylko jeden obiekt JSON.
-"""
-    }
+    system_prompt = encoder.prefix(get_system_prompt("coverletter_optimize", language))
 
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompts.get(language, user_prompts["en"]).strip()}
-    ]
\ No newline at end of file
+    # 4) User-Prompt: nur die dynamischen Abschnitte
+    labels = SECTION_LABELS.get(language, SECTION_LABELS["en"])
+    encoder.report()
+    return system_prompt.messages([
+        (labels["cover_letter"], coverletter_str),
+        (labels["job_description"], jobdesc_str),
+        (labels["suggestions"], suggestions_str)
+    ])
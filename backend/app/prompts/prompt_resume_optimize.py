@@ -1,6 +1,37 @@
-import json
 from app.core.config import RESUME_SCHEMA  # oder SCHEMAS["resume"]
 from app.utils.prompts import system_prompt_resume_analysis_before_optimize
+from app.utils.prompt_encoding import PromptEncoder
+from app.prompts.registry import get_system_prompt, register_system_prompt
+
+# Überschriften der dynamischen Abschnitte im User-Prompt
+SECTION_LABELS = {
+    "en": {"resume": "Here is the current resume (JSON)", "suggestions": "Here are the improvement suggestions"},
+    "de": {"resume": "Hier ist der aktuelle Lebenslauf (JSON)", "suggestions": "Hier sind die Verbesserungsvorschläge"},
+    "pl": {"resume": "Oto aktualne CV (JSON)", "suggestions": "Oto sugestie ulepszeń"}
+}
+
+# Statische Schlussanweisungen (früher am Ende des User-Prompts)
+OUTPUT_RULES = {
+    "en": "Please incorporate these suggestions, marking newly added text with (*SUGGESTION*).\nRemember to keep the JSON structure identical.\nReturn only a single JSON object.",
+    "de": "Bitte integriere diese Vorschläge und kennzeichne neu hinzugefügten Text mit (*SUGGESTION*).\nBehalte die JSON-Struktur bei.\nGib nur ein einziges JSON-Objekt zurück.",
+    "pl": "Proszę wprowadzić te sugestie, oznaczając nowo dodany tekst jako (*SUGGESTION*).\nZachowaj strukturę JSON.\nZwróć tylko jeden obiekt JSON."
+}
+
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("resume_optimize", schema=RESUME_SCHEMA)
+def render_system_prompt_resume_optimize(language: str, structure: str) -> str:
+    system_base = system_prompt_resume_analysis_before_optimize()
+    lang = system_base.get(language, system_base["en"])
+    system_prompt = f"""
+            {lang['intro']}
+            {lang['input_desc']}
+            {lang['ats_logic']}
+            {lang['instructions']}
+            {lang['format']}
+            {structure}
+            """
+    return system_prompt.strip() + "\n\n" + OUTPUT_RULES.get(language, OUTPUT_RULES["en"])
+
 
 def get_prompt_messages(
     resume_content: dict,
@@ -19,75 +50,28 @@ def get_prompt_messages(
     """
 
     # ----------------------------------------------------------------
-    # 1) Definiere die bekannte Resume-Struktur (gleich wie prompt_resume.py)
+    # 1) Encoder für kompakte Inputs und Token-Metriken
     # ----------------------------------------------------------------
-    structure = RESUME_SCHEMA.strip()
+    encoder = PromptEncoder("resume_optimize")
     # ----------------------------------------------------------------
-    # 2) Die Inputs als JSON-Strings fürs Prompt
+    # 2) Die Inputs als kompakte JSON-Strings fürs Prompt
+    #    (leere Felder im Resume bleiben erhalten, die Struktur soll identisch zurückkommen)
     # ----------------------------------------------------------------
-    resume_json_str = json.dumps(resume_content, ensure_ascii=False, indent=2)
-    suggestions_str = json.dumps(improvement_suggestions, ensure_ascii=False, indent=2)
+    resume_json_str = encoder.json(resume_content, strip=False)
+    suggestions_str = encoder.json(improvement_suggestions)
 
     # ----------------------------------------------------------------
-    # 3) System-Prompt in verschiedenen Sprachen
+    # 3) Vorgerenderter System-Prompt (inkl. Resume-Schema) aus der Registry
     # ----------------------------------------------------------------
-    system_base = system_prompt_resume_analysis_before_optimize()
-    lang = system_base.get(language, system_base["en"])
-    system_prompt = f"""
-            {lang['intro']}
-            {lang['input_desc']}
-            {lang['ats_logic']}
-            {lang['match_logic']}
-            {lang['instructions']}
-            {lang['format']}
-            {structure}
-            """
+    system_prompt = encoder.prefix(get_system_prompt("resume_optimize", language))
     
     # ----------------------------------------------------------------
-    # 4) User-Prompt in verschiedenen Sprachen
-    # ----------------------------------------------------------------
-    user_prompts = {
-        "en": f"""
-Here is the current resume (JSON):
-{resume_json_str}
-
-Here are the improvement suggestions:
-{suggestions_str}
-
-Please incorporate these suggestions, marking newly added text with (*SUGGESTION*). 
-Remember to keep the JSON structure identical. 
-Return only a single JSON object.
-""",
-        "de": f"""
-Hier ist der aktuelle Lebenslauf (JSON):
-{resume_json_str}
-
-Hier sind die Verbesserungsvorschläge:
-{suggestions_str}
-
-Bitte integriere diese Vorschläge und kennzeichne neu hinzugefügten Text mit (*SUGGESTION*).
-Behalte die JSON-Struktur bei. 
-Gib nur ein einziges JSON-Objekt zurück.
-""",
-        "pl": f"""
-Oto aktualne CV (JSON):
-{resume_json_str}
-
-Oto sugestie ulepszeń:
-{suggestions_str}
-
-Proszę wprowadzić te sugestie, oznaczając nowo dodany tekst jako (*SUGGESTION*).
-Zachowaj strukturę JSON. 
-Zwróć tylko jeden obiekt JSON.
-"""
-    }
-
-    # ----------------------------------------------------------------
-    # 5) Zusammenbau der Prompts (System + User)
+    # 4) User-Prompt: nur die dynamischen Abschnitte
     # ----------------------------------------------------------------
-    user_prompt_template = user_prompts.get(language, user_prompts["en"])
+    labels = SECTION_LABELS.get(language, SECTION_LABELS["en"])
+    encoder.report()
 
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompt_template.strip()}
-    ]
+    return system_prompt.messages([
+        (labels["resume"], resume_json_str),
+        (labels["suggestions"], suggestions_str)
+    ])
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from app.core.config import settings
+from app.utils.calc import count_tokens
+from app.utils.prompt_encoding import compact_schema
+
+SUPPORTED_LANGUAGES = ("en", "de", "pl")
+
+# name -> (render(language, structure) -> str, schema, Anzahl Schema-Kopien in der alten Prompt-Variante)
+_templates = {}
+
+
+@dataclass(frozen=True)
+class SystemPrompt:
+    """
+    Fertig gerenderter, unveränderlicher System-Prompt inkl. vorberechneter Token-Anzahl.
+
+    Der System-Prompt enthält alle statischen Teile (Anweisungen, Ausgaberegeln, Schema) und ist
+    pro (Prompt, Sprache, PROMPT_VERSION) byte-identisch. Damit bildet er das Präfix, das der
+    Provider zwischen Requests cachen kann; dynamische Daten stehen ausschließlich danach.
+    """
+    name: str
+    language: str
+    content: str
+    tokens: int
+    legacy_tokens: int  # Tokens der früheren Darstellung (Schema eingerückt, ggf. mehrfach gesendet)
+
+    def messages(self, sections: list) -> list:
+        """
+        Baut die Nachrichtenliste aus dem statischen Präfix und den dynamischen Abschnitten.
+        sections: Liste von (Überschrift, Inhalt); leere Inhalte werden übersprungen.
+        """
+        return assemble_messages(self, sections)
+
+
+def assemble_messages(system_prompt: SystemPrompt, sections: list) -> list:
+    """
+    Message-Assembly: [System (statisch, inkl. Schema)] + [User (nur Dokument-Payload)].
+    Statischer Text gehört in den registrierten System-Prompt, nicht in die Abschnitte.
+    """
+    user_content = "\n\n".join(
+        f"{label}:\n{content}" for label, content in sections if content
+    )
+    return [
+        {"role": "system", "content": system_prompt.content},
+        {"role": "user", "content": user_content}
+    ]
+
+
+def register_system_prompt(name: str, schema: str = None, legacy_schema_copies: int = 1):
+    """
+    Decorator für statische System-Prompts. Die dekorierte Funktion erhält
+    (language, structure) und liefert den Prompt-Text; sie wird pro
+    (Prompt, Sprache, PROMPT_VERSION) genau einmal aufgerufen.
+    """
+    def decorator(render):
+        _templates[name] = (render, schema, legacy_schema_copies)
+        return render
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def _render(name: str, language: str, prompt_version: str) -> SystemPrompt:
+    render, schema, legacy_schema_copies = _templates[name]
+    structure = compact_schema(schema) if schema else ""
+    content = render(language, structure).strip()
+
+    tokens = count_tokens(content)
+    legacy_tokens = tokens
+    if schema:
+        legacy_tokens += legacy_schema_copies * count_tokens(schema.strip()) - count_tokens(structure)
+    return SystemPrompt(name, language, content, tokens, legacy_tokens)
+
+
+def get_system_prompt(name: str, language: str = "en") -> SystemPrompt:
+    """Liefert den gecachten System-Prompt; unbekannte Sprachen fallen auf Englisch zurück."""
+    if language not in SUPPORTED_LANGUAGES:
+        language = "en"
+    return _render(name, language, settings.PROMPT_VERSION)
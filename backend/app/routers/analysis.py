@@ -1,26 +1,25 @@
 from fastapi import APIRouter, HTTPException, Query
 from bson import ObjectId
 from datetime import datetime
-from app.core.database import collection_analysis, collection_resume, collection_coverletter, collection_jobdesc
+from app.core.database import db
+from app.core.documents import load_analysis_documents
 from app.prompts.prompt_analysis import get_prompt_messages as get_prompt_messages_analysis
 from app.prompts.prompt_analysis_optimized import get_prompt_messages as get_prompt_messages_analysis_optimized
 from app.prompts.prompt_analysis_all_optimized import get_prompt_messages_optimized_resume, get_prompt_messages_optimized_coverletter
 from app.utils.calc import count_tokens
-from openai import OpenAI
-import os
-import json
+from app.utils.scoring import apply_match_score
+from app.core.cascade import cascade, failure_detail
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("RESUME_OPENAI_API_KEY"))
 
 @router.get("/count")
 async def count_analysis(user_id: str = Query(..., description="User ID to count analyses for")):
-    count = collection_analysis.count_documents({"userId": user_id})
+    count = await db.collection_analysis.count_documents({"userId": user_id})
     return {"collection": "analysis", "count": count}
 
 @router.get("/view/{analysis_id}")
 async def view_analysis(analysis_id: str, user_id: str):
-    doc = collection_analysis.find_one({"_id": ObjectId(analysis_id)})
+    doc = await db.collection_analysis.find_one({"_id": ObjectId(analysis_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Analysis not found")
     if str(doc.get("userId", "")) != user_id:
@@ -48,17 +47,12 @@ async def analysis_ats(
     update_existing_analysis_id: str = Query(None, description="If set, update this analysisId instead of creating new one"),
     user_id: str = Query(..., description="User ID (as string) to restrict access")
 ):
-    # Hole die Dokumente aus der Datenbank
-    resume = collection_resume.find_one({"_id": ObjectId(resume_id)})
-    coverletter = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
-    jobdescription = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
-    
-    if not all([resume, coverletter, jobdescription]):
-        raise HTTPException(status_code=404, detail="One or more documents not found")
-    
-    # Prüfe die Benutzerrechte
-    if str(resume.get("userId", "")) != user_id or str(coverletter.get("userId", "")) != user_id or str(jobdescription.get("userId", "")) != user_id:
-        raise HTTPException(status_code=403, detail="Access forbidden")
+    # Hole die Dokumente parallel aus der Datenbank und prüfe die Benutzerrechte
+    resume, coverletter, jobdescription = await load_analysis_documents(
+        user_id, resume_id, coverletter_id, jobdescription_id,
+        resume_field="optimized_resume" if use_optimized_resume else "structured_resume",
+        coverletter_field="optimized_coverletter" if use_optimized_coverletter else "structured_coverletter"
+    )
     
     # Wähle die richtigen Texte basierend auf den Optimierungsoptionen
     resume_text = resume.get("optimized_resume", "") if use_optimized_resume else resume.get("structured_resume", "")
@@ -73,21 +67,18 @@ async def analysis_ats(
         language=language
     )
     # Führe die Analyse durch
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=messages,
+    # Extrahiere die Analyseergebnisse
+    # (Modell-Kaskade: schnelles Modell zuerst, bei ungültiger Ausgabe OPENAI_MODEL)
+    analysis_dict, analysis_status = await cascade.chat_json(
+        "analysis",
+        messages,
+        "analysis",
         temperature=0.7,
         max_tokens=4000
     )
-    
-    # Extrahiere die Analyseergebnisse
-    analysis_result = response.choices[0].message.content
-    
-    # Parse den JSON-String in ein Python-Dictionary
-    try:
-        analysis_dict = json.loads(analysis_result)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Invalid analysis result format")
+    if analysis_status != "analysis_complete":
+        raise HTTPException(status_code=500, detail=f"Analysis failed ({failure_detail(analysis_dict, analysis_status)})")
+    apply_match_score(analysis_dict)
     
     # Erstelle das Analyse-Dokument
     analysis_doc = {
@@ -106,7 +97,7 @@ async def analysis_ats(
     # Speichere oder aktualisiere die Analyse
     if update_existing_analysis_id:
         analysis_doc["updatedAt"] = datetime.utcnow()
-        result = collection_analysis.update_one(
+        result = await db.collection_analysis.update_one(
             {"_id": ObjectId(update_existing_analysis_id)},
             {"$set": analysis_doc}
         )
@@ -114,7 +105,7 @@ async def analysis_ats(
             raise HTTPException(status_code=404, detail="Analysis not found")
         analysis_id = update_existing_analysis_id
     else:
-        result = collection_analysis.insert_one(analysis_doc)
+        result = await db.collection_analysis.insert_one(analysis_doc)
         analysis_id = str(result.inserted_id)
     
     # Konvertiere ObjectId in String für die Antwort
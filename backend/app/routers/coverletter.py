@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, Query, Form
 from bson import ObjectId
 from datetime import datetime
-from app.core.database import collection_coverletter
+from app.core.database import db
+from app.core.config import settings
+from app.core.documents import list_documents
+from app.core import stats
+from app.core.stats import user_stats
 from app.prompts.prompt_coverletter import get_prompt_messages as get_prompt_messages_coverletter
 from app.prompts.prompt_coverletter_optimize import get_prompt_messages as get_prompt_messages_coverletter_optimize
 from app.utils.calc import count_tokens
-from openai import OpenAI
-import os
 from typing import List, Optional
 
 from typing import List, Dict, Any, Union
@@ -23,13 +25,12 @@ class CoverletterPatch(BaseModel):
     user_id: str
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("RESUME_OPENAI_API_KEY"))
 
 
 
 @router.get("/count")
 async def count_coverletters(user_id: str = Query(..., description="User ID to count coverletters for")):
-    count = collection_coverletter.count_documents({"userId": user_id})
+    count = await db.collection_coverletter.count_documents({"userId": user_id})
     return {"collection": "coverletters", "count": count}
 
 @router.post("/create")
@@ -49,9 +50,10 @@ async def create_coverletter(
             "updatedAt": datetime.utcnow()
         }
         
-        result = collection_coverletter.insert_one(coverletter_doc)
+        result = await db.collection_coverletter.insert_one(coverletter_doc)
         
         if result.inserted_id:
+            await user_stats.incr(user_id, stats.COVER_LETTERS)
             return {
                 "status": "success",
                 "message": "Lebenslauf erfolgreich erstellt",
@@ -76,31 +78,25 @@ async def create_coverletter(
         )
 
 @router.get("/view")
-async def view_coverletters(user_id: str = Query(..., description="User ID to fetch coverletters for")):
-    """Gibt alle Lebensläufe eines Nutzers zurück."""
+async def view_coverletters(
+    user_id: str = Query(..., description="User ID to fetch coverletters for"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.LISTING_MAX_LIMIT, description="Maximum number of entries per page (omit to get all entries)"),
+    after: Optional[str] = Query(None, description="Cursor: id of the last entry of the previous page")
+):
+    """Gibt die Anschreiben eines Nutzers zurück; mit limit seitenweise (Cursor: after), ohne limit alle."""
     try:
-        # Suche alle Dokumente für den Benutzer
-        cursor = collection_coverletter.find({"userId": user_id})
-        
-        # Konvertiere die Dokumente in eine Liste und formatiere sie
-        coverletters = []
-        for doc in cursor:
-            coverletter = {
-                "id": str(doc["_id"]),
-                "title": doc["title"],
-                "createdAt": doc["createdAt"].isoformat(),
-                "updatedAt": doc["updatedAt"].isoformat(),
-                "status": doc["status"],
-                "preview": doc["rawText"][:100] if "rawText" in doc else ""
-            }
-            coverletters.append(coverletter)
-        
+        # Nur die Listenfelder laden, Vorschau wird in der Datenbank berechnet
+        coverletters, next_cursor = await list_documents(db.collection_coverletter, user_id, limit, after)
+
         return {
             "status": "success",
             "message": "Lebensläufe erfolgreich geladen",
-            "data": coverletters
+            "data": coverletters,
+            "next_cursor": next_cursor
         }
-            
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -113,7 +109,7 @@ async def get_coverletter(coverletter_id: str, user_id: str = Query(..., descrip
     Ruft ein einzelnes coverletter anhand seiner ID ab.
     """
     try:
-        coverletter = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
+        coverletter = await db.collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
         if not coverletter:
             raise HTTPException(status_code=404, detail="coverletter not found")
         
@@ -155,7 +151,7 @@ async def patch_coverletter(
     """
     try:
         # Prüfe, ob der Lebenslauf existiert und dem Benutzer gehört
-        coverletter = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
+        coverletter = await db.collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
         if not coverletter:
             raise HTTPException(status_code=404, detail="coverletter not found")
         
@@ -192,7 +188,7 @@ async def patch_coverletter(
                 update_doc[field] = operation.value
         
         # Führe das Update durch
-        result = collection_coverletter.update_one(
+        result = await db.collection_coverletter.update_one(
             {"_id": ObjectId(coverletter_id)},
             {"$set": update_doc}
         )
@@ -201,7 +197,7 @@ async def patch_coverletter(
             raise HTTPException(status_code=400, detail="Keine Änderungen am Lebenslauf vorgenommen")
         
         # Hole den aktualisierten Lebenslauf
-        updated_coverletter = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
+        updated_coverletter = await db.collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
         
         return {
             "status": "success",
@@ -233,7 +229,7 @@ async def delete_coverletter(
     """
     try:
         # Prüfe, ob der Lebenslauf existiert und dem Benutzer gehört
-        coverletter = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
+        coverletter = await db.collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
         if not coverletter:
             raise HTTPException(status_code=404, detail="coverletter not found")
         
@@ -241,10 +237,12 @@ async def delete_coverletter(
             raise HTTPException(status_code=403, detail="Access forbidden: coverletter does not belong to this user")
         
         # Führe das Löschen durch
-        result = collection_coverletter.delete_one({"_id": ObjectId(coverletter_id)})
+        result = await db.collection_coverletter.delete_one({"_id": ObjectId(coverletter_id)})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="coverletter not found")
+
+        await user_stats.incr(user_id, stats.COVER_LETTERS, -1)
         
         return {
             "status": "success",
@@ -1,37 +1,24 @@
 from fastapi import APIRouter, HTTPException, Query
 from bson import ObjectId
 from datetime import datetime
-import json
-from app.core.database import collection_coverletter, collection_jobdesc, collection_analysis
+from app.core.database import db
 from app.utils.prompts import system_prompt_coverletter_analysis
 from app.core.config import COVERLETTER_ANALYSIS_SCHEMA
-from openai import OpenAI
-import os
+from app.core.cascade import cascade, failure_detail
+from app.utils.prompt_encoding import PromptEncoder
+from app.prompts.registry import get_system_prompt, register_system_prompt
 
 router = APIRouter()
 
-# OpenAI Client initialisieren
-client = OpenAI(api_key=os.getenv("RESUME_OPENAI_API_KEY"))
-
-def get_prompt_messages_coverletter_analysis(
-    cover_letter: dict,
-    job_description: dict,
-    language: str = "en"
-) -> list:
-    """
-    Erzeugt eine Liste von Nachrichten (System + User), um eine
-    Coverletter-Analyse durchzuführen.
-    """
-    # JSON-Dumps für die Eingaben
-    cover_letter_str = json.dumps(cover_letter, ensure_ascii=False, indent=2)
-    job_desc_str = json.dumps(job_description, ensure_ascii=False, indent=2)
-    
+# System-Prompt inkl. Schema, einmal pro Sprache gerendert
+@register_system_prompt("coverletter_analysis_router", schema=COVERLETTER_ANALYSIS_SCHEMA, legacy_schema_copies=2)
+def render_system_prompt(language: str, structure: str) -> str:
     # Hole die Prompts für die gewählte Sprache
     prompts = system_prompt_coverletter_analysis()
     lang_prompts = prompts.get(language, prompts["en"])
     
     # Baue den System-Prompt
-    system_prompt = f"""
+    return f"""
     {lang_prompts['intro']}
     
     {lang_prompts['input_desc']}
@@ -40,25 +27,30 @@ def get_prompt_messages_coverletter_analysis(
     
     {lang_prompts['format']}
     
-    {COVERLETTER_ANALYSIS_SCHEMA.strip()}
+    {structure}
     """
-    
-    # Baue den User-Prompt
-    user_prompt = f"""
-    COVER LETTER (JSON):
-    {cover_letter_str}
-    
-    JOB DESCRIPTION (JSON):
-    {job_desc_str}
-    
-    {lang_prompts['format']}
-    {COVERLETTER_ANALYSIS_SCHEMA.strip()}
+
+def get_prompt_messages_coverletter_analysis(
+    cover_letter: dict,
+    job_description: dict,
+    language: str = "en"
+) -> list:
     """
-    
-    return [
-        {"role": "system", "content": system_prompt.strip()},
-        {"role": "user", "content": user_prompt.strip()}
-    ]
+    Erzeugt eine Liste von Nachrichten (System + User), um eine
+    Coverletter-Analyse durchzuführen.
+    """
+    # Kompaktes JSON für die Eingaben, Schema nur einmal (im vorgerenderten System-Prompt)
+    encoder = PromptEncoder("coverletter_analysis_router")
+    cover_letter_str = encoder.json(cover_letter)
+    job_desc_str = encoder.json(job_description)
+    system_prompt = encoder.prefix(get_system_prompt("coverletter_analysis_router", language))
+    
+    # Baue den User-Prompt (nur die dynamischen Abschnitte nach dem statischen Präfix)
+    encoder.report()
+    return system_prompt.messages([
+        ("COVER LETTER (JSON)", cover_letter_str),
+        ("JOB DESCRIPTION (JSON)", job_desc_str)
+    ])
 
 @router.get("/analysis-ats")
 async def analysis_ats(
@@ -69,8 +61,8 @@ async def analysis_ats(
     user_id: str = Query(..., description="User ID (as string) to restrict access")
 ):
     # Hole die Dokumente aus der Datenbank
-    coverletter = collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
-    jobdescription = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+    coverletter = await db.collection_coverletter.find_one({"_id": ObjectId(coverletter_id)})
+    jobdescription = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
     
     if not all([coverletter, jobdescription]):
         raise HTTPException(status_code=404, detail="One or more documents not found")
@@ -91,21 +83,17 @@ async def analysis_ats(
     )
     
     # Führe die Analyse durch
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=messages,
+    # Extrahiere die Analyseergebnisse
+    # (Modell-Kaskade: schnelles Modell zuerst, bei ungültiger Ausgabe OPENAI_MODEL)
+    analysis_dict, analysis_status = await cascade.chat_json(
+        "coverletter_analysis",
+        messages,
+        "analysis",
         temperature=0.7,
         max_tokens=4000
     )
-    
-    # Extrahiere die Analyseergebnisse
-    analysis_result = response.choices[0].message.content
-    
-    # Parse den JSON-String in ein Python-Dictionary
-    try:
-        analysis_dict = json.loads(analysis_result)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Invalid analysis result format")
+    if analysis_status != "analysis_complete":
+        raise HTTPException(status_code=500, detail=f"Analysis failed ({failure_detail(analysis_dict, analysis_status)})")
     
     # Erstelle das Analyse-Dokument
     analysis_doc = {
@@ -121,7 +109,7 @@ async def analysis_ats(
     # Speichere oder aktualisiere die Analyse
     if update_existing_analysis_id:
         analysis_doc["updatedAt"] = datetime.utcnow()
-        result = collection_analysis.update_one(
+        result = await db.collection_analysis.update_one(
             {"_id": ObjectId(update_existing_analysis_id)},
             {"$set": analysis_doc}
         )
@@ -129,7 +117,7 @@ async def analysis_ats(
             raise HTTPException(status_code=404, detail="Analysis not found")
         analysis_id = update_existing_analysis_id
     else:
-        result = collection_analysis.insert_one(analysis_doc)
+        result = await db.collection_analysis.insert_one(analysis_doc)
         analysis_id = str(result.inserted_id)
     
     # Konvertiere ObjectId in String für die Antwort
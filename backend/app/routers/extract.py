@@ -1,35 +1,80 @@
+import functools
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from PyPDF2 import PdfReader
-import io
-import mammoth
+from app.core.extraction import extraction_cache, extraction_engine
+from app.utils.streaming import CleanupStreamingResponse, sse_event
 
 router = APIRouter()
 
 @router.post("/extract-text")
 async def extract_text(file: UploadFile = File(...)):
     """Extrahiert Text aus einer PDF- oder Word-Datei."""
-    file_extension = file.filename.lower().split('.')[-1]
-    
-    if file_extension not in ['pdf', 'doc', 'docx']:
-        raise HTTPException(status_code=400, detail="Nur PDF- und Word-Dateien sind erlaubt")
-
+    source = None
     try:
-        content = await file.read()
-        
-        if file_extension == 'pdf':
-            pdf = PdfReader(io.BytesIO(content))
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() + "\n\n"
-        else:  # doc oder docx
-            result = mammoth.extract_raw_text(io.BytesIO(content))
-            text = result.value
-        
+        source = await extraction_engine.spool(file)
+        text = await extraction_engine.extract_text(source)
         return {"text": text}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Fehler beim Extrahieren des Textes: {str(e)}"
+        )
+    finally:
+        extraction_engine.cleanup(source)
+        await file.close()
+
+@router.post("/extract-text/stream")
+async def extract_text_stream(file: UploadFile = File(...)):
+    """
+    Streaming-Variante von /extract-text (Server-Sent Events).
+
+    Events:
+      - page:  {"page": 1, "text": "..."} sobald eine Seite extrahiert ist (Word-Dateien: eine Seite;
+               bereits bekannte Uploads kommen sofort aus dem Fingerprint-Cache)
+      - done:  {"pages": 3}
+      - error: {"detail": "..."} falls die Extraktion während des Streams fehlschlägt
+    """
+    # Upload und Limits vor dem Stream prüfen, damit Fehler weiterhin als HTTP-Status ankommen
+    source = None
+    page_count = None
+    try:
+        source = await extraction_engine.spool(file)
+        cached_pages = await extraction_cache.get(source.cache_key, source.size)
+        if cached_pages is None:
+            page_count = await extraction_engine.page_count(source)
+    except HTTPException:
+        extraction_engine.cleanup(source)
+        raise
     except Exception as e:
+        extraction_engine.cleanup(source)
         raise HTTPException(
             status_code=500,
             detail=f"Fehler beim Extrahieren des Textes: {str(e)}"
         )
     finally:
-        await file.close() 
\ No newline at end of file
+        await file.close()
+
+    async def event_stream():
+        pages = []
+        try:
+            if cached_pages is not None:
+                for text in cached_pages:
+                    pages.append(text)
+                    yield sse_event("page", {"page": len(pages), "text": text})
+            else:
+                async for text in extraction_engine.iter_pages(source, page_count):
+                    pages.append(text)
+                    yield sse_event("page", {"page": len(pages), "text": text})
+                await extraction_cache.set(source.cache_key, pages)
+            yield sse_event("done", {"pages": len(pages)})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Fehler beim Extrahieren des Textes: {str(e)}"})
+
+    # Temporäre Datei wird von der Response entfernt, nicht im Generator (der evtl. nie startet)
+    return CleanupStreamingResponse(
+        event_stream(),
+        cleanup=functools.partial(extraction_engine.cleanup, source),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,18 +1,19 @@
 from fastapi import APIRouter, HTTPException, Query, Form
 from bson import ObjectId
 from datetime import datetime
-from app.core.database import collection_jobdesc
+from app.core.database import db
+from app.core.config import settings
+from app.core.documents import list_documents
+from app.core import stats
+from app.core.stats import user_stats
 from app.prompts.prompt_jobdescription import get_prompt_messages as get_prompt_messages_jobdescription
 from app.utils.calc import count_tokens
-from openai import OpenAI
-import os
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 # Router mit korrektem Präfix
 router = APIRouter()
 
-client = OpenAI(api_key=os.getenv("RESUME_OPENAI_API_KEY"))
 
 class PatchOperation(BaseModel):
     op: str
@@ -23,30 +24,25 @@ class JobDescriptionPatch(BaseModel):
     operations: List[PatchOperation]
 
 @router.get("/view")
-async def view_jobdescriptions(user_id: str = Query(..., description="User ID to fetch job descriptions for")):
-    """Gibt alle Stellenausschreibungen eines Nutzers zurück."""
+async def view_jobdescriptions(
+    user_id: str = Query(..., description="User ID to fetch job descriptions for"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.LISTING_MAX_LIMIT, description="Maximum number of entries per page (omit to get all entries)"),
+    after: Optional[str] = Query(None, description="Cursor: id of the last entry of the previous page")
+):
+    """Gibt die Stellenausschreibungen eines Nutzers zurück; mit limit seitenweise (Cursor: after), ohne limit alle."""
     try:
-        cursor = collection_jobdesc.find({"userId": user_id})
-        
-        jobdescriptions = []
-        for doc in cursor:
-            jobdesc = {
-                "id": str(doc["_id"]),
-                "title": doc["title"],
-                "content": doc.get("rawText", ""),
-                "createdAt": doc["createdAt"].isoformat(),
-                "updatedAt": doc["updatedAt"].isoformat(),
-                "status": doc["status"],
-                "preview": doc.get("rawText", "")[:100] if "rawText" in doc else ""
-            }
-            jobdescriptions.append(jobdesc)
-        
+        # Nur die Listenfelder laden, Vorschau wird in der Datenbank berechnet
+        jobdescriptions, next_cursor = await list_documents(db.collection_jobdesc, user_id, limit, after)
+
         return {
             "status": "success",
             "message": "Stellenausschreibungen erfolgreich geladen",
-            "data": jobdescriptions
+            "data": jobdescriptions,
+            "next_cursor": next_cursor
         }
-            
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -57,7 +53,7 @@ async def view_jobdescriptions(user_id: str = Query(..., description="User ID to
 async def view_jobdescription(jobdescription_id: str, user_id: str = Query(..., description="User ID to verify ownership")):
     """Gibt eine spezifische Stellenausschreibung zurück."""
     try:
-        doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+        doc = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
         if not doc:
             raise HTTPException(status_code=404, detail="Stellenausschreibung nicht gefunden")
         
@@ -105,9 +101,10 @@ async def create_jobdescription(
             "updatedAt": datetime.utcnow()
         }
         
-        result = collection_jobdesc.insert_one(jobdesc_doc)
+        result = await db.collection_jobdesc.insert_one(jobdesc_doc)
         
         if result.inserted_id:
+            await user_stats.incr(user_id, stats.JOB_DESCRIPTIONS)
             return {
                 "status": "success",
                 "message": "Stellenausschreibung erfolgreich erstellt",
@@ -140,14 +137,14 @@ async def update_jobdescription(
 ):
     """Aktualisiert eine bestehende Stellenausschreibung."""
     try:
-        doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+        doc = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
         if not doc:
             raise HTTPException(status_code=404, detail="Stellenausschreibung nicht gefunden")
         
         if str(doc.get("userId", "")) != user_id:
             raise HTTPException(status_code=403, detail="Keine Berechtigung für diese Stellenausschreibung")
         
-        update_result = collection_jobdesc.update_one(
+        update_result = await db.collection_jobdesc.update_one(
             {"_id": ObjectId(jobdescription_id)},
             {
                 "$set": {
@@ -187,16 +184,17 @@ async def update_jobdescription(
 async def delete_jobdescription(jobdescription_id: str, user_id: str = Query(..., description="User ID to verify ownership")):
     """Löscht eine Stellenausschreibung."""
     try:
-        doc = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+        doc = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
         if not doc:
             raise HTTPException(status_code=404, detail="Stellenausschreibung nicht gefunden")
         
         if str(doc.get("userId", "")) != user_id:
             raise HTTPException(status_code=403, detail="Keine Berechtigung für diese Stellenausschreibung")
         
-        delete_result = collection_jobdesc.delete_one({"_id": ObjectId(jobdescription_id)})
+        delete_result = await db.collection_jobdesc.delete_one({"_id": ObjectId(jobdescription_id)})
         
         if delete_result.deleted_count:
+            await user_stats.incr(user_id, stats.JOB_DESCRIPTIONS, -1)
             return {
                 "status": "success",
                 "message": "Stellenausschreibung erfolgreich gelöscht"
@@ -217,7 +215,7 @@ async def delete_jobdescription(jobdescription_id: str, user_id: str = Query(...
 
 @router.get("/count")
 async def count_jobdescriptions(user_id: str = Query(..., description="User ID to count job descriptions for")):
-    count = collection_jobdesc.count_documents({"userId": user_id})
+    count = await db.collection_jobdesc.count_documents({"userId": user_id})
     return {"collection": "jobdescriptions", "count": count}
 
 @router.patch("/patch/{jobdescription_id}")
@@ -235,7 +233,7 @@ async def patch_jobdescription(
     """
     try:
         # Prüfe, ob die Stellenausschreibung existiert und dem Benutzer gehört
-        jobdescription = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+        jobdescription = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
         if not jobdescription:
             raise HTTPException(status_code=404, detail="Stellenausschreibung nicht gefunden")
         
@@ -272,7 +270,7 @@ async def patch_jobdescription(
                 update_doc[field] = operation.value
         
         # Führe das Update durch
-        result = collection_jobdesc.update_one(
+        result = await db.collection_jobdesc.update_one(
             {"_id": ObjectId(jobdescription_id)},
             {"$set": update_doc}
         )
@@ -281,7 +279,7 @@ async def patch_jobdescription(
             raise HTTPException(status_code=400, detail="Keine Änderungen an der Stellenausschreibung vorgenommen")
         
         # Hole die aktualisierte Stellenausschreibung
-        updated_jobdescription = collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
+        updated_jobdescription = await db.collection_jobdesc.find_one({"_id": ObjectId(jobdescription_id)})
         
         return {
             "status": "success",
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Query, Path
+from bson import ObjectId
+from pydantic import BaseModel
+from typing import Any, Dict
+from app.core.jobs import job_manager
+
+router = APIRouter()
+
+class JobSubmit(BaseModel):
+    type: str
+    user_id: str
+    params: Dict[str, Any] = {}
+
+@router.get("/types")
+async def list_job_types():
+    """Gibt die registrierten Job-Typen zurück."""
+    return {"types": job_manager.job_types}
+
+@router.post("", status_code=202)
+async def submit_job(job: JobSubmit):
+    """
+    Legt einen Hintergrund-Job an und gibt sofort die Job-ID zurück.
+    `params` entspricht den Query-Parametern des jeweiligen Endpunkts (ohne user_id).
+    """
+    job_id = await job_manager.submit(job.type, job.params, job.user_id)
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str = Path(..., description="Die ID des Jobs"),
+    user_id: str = Query(..., description="User ID (als String) zur Zugriffsbeschränkung")
+):
+    """Gibt Status, Versuche und (falls abgeschlossen) das Ergebnis eines Jobs zurück."""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job id.")
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job.get("userId") != user_id:
+        raise HTTPException(status_code=403, detail="Access forbidden: Job does not belong to this user.")
+
+    return {
+        "job_id": job_id,
+        "type": job["type"],
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "lastError": job.get("lastError"),
+        "createdAt": job.get("createdAt"),
+        "finishedAt": job.get("finishedAt")
+    }
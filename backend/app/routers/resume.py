@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query, Body, Form, UploadFile, File, Path
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
-from app.core.database import collection_resume
+from app.core.database import db
+from app.core.config import settings
+from app.core.documents import list_documents
+from app.core import stats
+from app.core.stats import user_stats
 from app.prompts.prompt_resume import get_prompt_messages as get_prompt_messages_resume
 from app.prompts.prompt_resume_optimize import get_prompt_messages as get_prompt_messages_resume_optimize
 from app.utils.calc import count_tokens
-from openai import OpenAI
-import os
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
 
 # Pydantic Modelle für die PATCH-Operation
@@ -21,11 +24,10 @@ class ResumePatch(BaseModel):
     user_id: str
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("RESUME_OPENAI_API_KEY"))
 
 @router.get("/count")
 async def count_resumes(user_id: str = Query(..., description="User ID to count resumes for")):
-    count = collection_resume.count_documents({"userId": user_id})
+    count = await db.collection_resume.count_documents({"userId": user_id})
     return {"collection": "resumes", "count": count}
 
 @router.post("/create")
@@ -45,9 +47,10 @@ async def create_resume(
             "updatedAt": datetime.utcnow()
         }
         
-        result = collection_resume.insert_one(resume_doc)
+        result = await db.collection_resume.insert_one(resume_doc)
         
         if result.inserted_id:
+            await user_stats.incr(user_id, stats.RESUMES)
             return {
                 "status": "success",
                 "message": "Lebenslauf erfolgreich erstellt",
@@ -72,31 +75,25 @@ async def create_resume(
         )
 
 @router.get("/view")
-async def view_resumes(user_id: str = Query(..., description="User ID to fetch resumes for")):
-    """Gibt alle Lebensläufe eines Nutzers zurück."""
+async def view_resumes(
+    user_id: str = Query(..., description="User ID to fetch resumes for"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.LISTING_MAX_LIMIT, description="Maximum number of entries per page (omit to get all entries)"),
+    after: Optional[str] = Query(None, description="Cursor: id of the last entry of the previous page")
+):
+    """Gibt die Lebensläufe eines Nutzers zurück; mit limit seitenweise (Cursor: after), ohne limit alle."""
     try:
-        # Suche alle Dokumente für den Benutzer
-        cursor = collection_resume.find({"userId": user_id})
-        
-        # Konvertiere die Dokumente in eine Liste und formatiere sie
-        resumes = []
-        for doc in cursor:
-            resume = {
-                "id": str(doc["_id"]),
-                "title": doc["title"],
-                "createdAt": doc["createdAt"].isoformat(),
-                "updatedAt": doc["updatedAt"].isoformat(),
-                "status": doc["status"],
-                "preview": doc["rawText"][:100] if "rawText" in doc else ""
-            }
-            resumes.append(resume)
-        
+        # Nur die Listenfelder laden, Vorschau wird in der Datenbank berechnet
+        resumes, next_cursor = await list_documents(db.collection_resume, user_id, limit, after)
+
         return {
             "status": "success",
             "message": "Lebensläufe erfolgreich geladen",
-            "data": resumes
+            "data": resumes,
+            "next_cursor": next_cursor
         }
-            
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -109,7 +106,7 @@ async def get_resume(resume_id: str, user_id: str = Query(..., description="User
     Ruft ein einzelnes Resume anhand seiner ID ab.
     """
     try:
-        resume = collection_resume.find_one({"_id": ObjectId(resume_id)})
+        resume = await db.collection_resume.find_one({"_id": ObjectId(resume_id)})
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
         
@@ -151,7 +148,7 @@ async def patch_resume(
     """
     try:
         # Prüfe, ob der Lebenslauf existiert und dem Benutzer gehört
-        resume = collection_resume.find_one({"_id": ObjectId(resume_id)})
+        resume = await db.collection_resume.find_one({"_id": ObjectId(resume_id)})
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
         
@@ -187,17 +184,21 @@ async def patch_resume(
             else:
                 update_doc[field] = operation.value
         
-        # Führe das Update durch
-        result = collection_resume.update_one(
+        # Führe das Update durch (Dokument vor dem Update für den Statusvergleich der Zähler)
+        previous = await db.collection_resume.find_one_and_update(
             {"_id": ObjectId(resume_id)},
-            {"$set": update_doc}
+            {"$set": update_doc},
+            projection={"userId": 1, "status": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.modified_count == 0:
-            raise HTTPException(status_code=400, detail="Keine Änderungen am Lebenslauf vorgenommen")
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+
+        await user_stats.resume_updated(previous, update_doc)
         
         # Hole den aktualisierten Lebenslauf
-        updated_resume = collection_resume.find_one({"_id": ObjectId(resume_id)})
+        updated_resume = await db.collection_resume.find_one({"_id": ObjectId(resume_id)})
         
         return {
             "status": "success",
@@ -229,7 +230,7 @@ async def delete_resume(
     """
     try:
         # Prüfe, ob der Lebenslauf existiert und dem Benutzer gehört
-        resume = collection_resume.find_one({"_id": ObjectId(resume_id)})
+        resume = await db.collection_resume.find_one({"_id": ObjectId(resume_id)})
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
         
@@ -237,10 +238,14 @@ async def delete_resume(
             raise HTTPException(status_code=403, detail="Access forbidden: Resume does not belong to this user")
         
         # Führe das Löschen durch
-        result = collection_resume.delete_one({"_id": ObjectId(resume_id)})
+        result = await db.collection_resume.delete_one({"_id": ObjectId(resume_id)})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Resume not found")
+
+        await user_stats.incr(user_id, stats.RESUMES, -1)
+        if stats.is_optimized(resume):
+            await user_stats.incr(user_id, stats.OPTIMIZED_RESUMES, -1)
         
         return {
             "status": "success",
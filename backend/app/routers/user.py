@@ -4,7 +4,7 @@ from typing import Optional
 from datetime import datetime
 from app.core.config import settings
 from app.core.security import get_current_user
-from app.core.database import collection_resume, collection_jobdesc, collection_coverletter, collection_analysis
+from app.core.stats import user_stats
 
 router = APIRouter()
 
@@ -47,15 +47,16 @@ async def get_user_profile(current_user = Depends(get_current_user)):
     }
 
 @router.get("/stats", response_model=UserStats)
-async def get_user_stats(user_id: str = Query(..., description="User ID (email) to get stats for")):
+async def get_user_stats(
+    user_id: str = Query(..., description="User ID (email) to get stats for"),
+    refresh: bool = Query(False, description="Zähler neu aus den Collections berechnen")
+):
     """
-    Gibt die Statistiken des Benutzers zurück
+    Gibt die Statistiken des Benutzers zurück (aus dem user_stats-Dokument)
     """
+    counts = await user_stats.get(user_id, refresh=refresh)
     return {
-        "resumes_count": await count_user_resumes(user_id),
-        "job_descriptions_count": await count_user_job_descriptions(user_id),
-        "optimized_resumes_count": await count_user_optimized_resumes(user_id),
-        "cover_letters_count": await count_user_cover_letters(user_id),
+        **counts,
         "available_credits": 10  # Temporärer Wert, später aus der Datenbank
     }
 
@@ -69,19 +70,3 @@ async def update_user_profile(
     """
     # TODO: Implementiere Datenbankupdate
     return profile_update
-
-# Hilfsfunktionen für Datenbankabfragen
-async def count_user_resumes(user_id: str) -> int:
-    return collection_resume.count_documents({"userId": user_id})
-
-async def count_user_job_descriptions(user_id: str) -> int:
-    return collection_jobdesc.count_documents({"userId": user_id})
-
-async def count_user_optimized_resumes(user_id: str) -> int:
-    return collection_resume.count_documents({
-        "userId": user_id,
-        "status": "optimized"
-    })
-
-async def count_user_cover_letters(user_id: str) -> int:
-    return collection_coverletter.count_documents({"userId": user_id}) 
\ No newline at end of file
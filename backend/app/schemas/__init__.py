@@ -1,15 +1,15 @@
-from .resume_schema import Resume, CareerItem, KeySkillItem, OptionalItem
-from .coverletter_schema import CoverLetter, Sender, Recipient, Paragraphs
+from .resume_schema import Resume, Summary, CareerItem, KeySkillItem, KeySkills, TitledItems, OptionalItem
+from .coverletter_schema import CoverLetter, CoverLetterDocument, Sender, Recipient, Paragraphs
 from .jobdescription_schema import jobdescription, Skills, ApplicationProcess
 from .analysis_schema import (
-    Analysis, AtsScore, MatchScore, RecruiterEvaluation,
-    ImprovementSuggestions, CoverLetterAnalysis
+    Analysis, AnalysisResult, AtsScore, MatchScore, RecruiterEvaluation,
+    ImprovementSuggestions, CoverLetterAnalysis, CoverLetterAnalysisResult
 )
 
 __all__ = [
-    'Resume', 'CareerItem', 'KeySkillItem', 'OptionalItem',
-    'CoverLetter', 'Sender', 'Recipient', 'Paragraphs',
+    'Resume', 'Summary', 'CareerItem', 'KeySkillItem', 'KeySkills', 'TitledItems', 'OptionalItem',
+    'CoverLetter', 'CoverLetterDocument', 'Sender', 'Recipient', 'Paragraphs',
     'jobdescription', 'Skills', 'ApplicationProcess',
-    'Analysis', 'AtsScore', 'MatchScore', 'RecruiterEvaluation',
-    'ImprovementSuggestions', 'CoverLetterAnalysis'
+    'Analysis', 'AnalysisResult', 'AtsScore', 'MatchScore', 'RecruiterEvaluation',
+    'ImprovementSuggestions', 'CoverLetterAnalysis', 'CoverLetterAnalysisResult'
 ]
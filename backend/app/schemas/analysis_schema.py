@@ -34,6 +34,10 @@ class Analysis(BaseModel):
     improvement_suggestions: ImprovementSuggestions
     summary: str
 
+class AnalysisResult(BaseModel):
+    # Ausgabe der ATS-Analyse: {"analysis": {...}}
+    analysis: Analysis
+
 class CoverLetterAnalysis(BaseModel):
     tone: str
     clarity: str
@@ -41,3 +45,7 @@ class CoverLetterAnalysis(BaseModel):
     alignment_with_job: str
     creative_improvement_suggestions: str
     summary: str
+
+class CoverLetterAnalysisResult(BaseModel):
+    # Ausgabe der Anschreiben-Analyse: {"cover_letter_analysis": {...}}
+    cover_letter_analysis: CoverLetterAnalysis
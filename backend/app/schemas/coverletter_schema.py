@@ -30,3 +30,7 @@ class CoverLetter(BaseModel):
     reference: str
     salutation: str
     paragraphs: Paragraphs
+
+class CoverLetterDocument(BaseModel):
+    # Ausgabe der Strukturierung: {"cover_letter": {...}}
+    cover_letter: CoverLetter
@@ -1,9 +1,10 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Union
 
 class Skills(BaseModel):
-    hard_skills: List[str]
-    soft_skills: List[str]
+    # Einträge als String oder Objekt mit importance_level (must_have / recommended)
+    hard_skills: List[Union[str, Dict[str, str]]]
+    soft_skills: List[Union[str, Dict[str, str]]]
 
 class ApplicationProcess(BaseModel):
     contact_person: str
@@ -1,6 +1,10 @@
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 
+class Summary(BaseModel):
+    experience: str
+    key_aspects: List[str]
+
 class CareerItem(BaseModel):
     position: str
     company: str
@@ -13,16 +17,24 @@ class KeySkillItem(BaseModel):
     category: str
     skills: List[str]
 
+class KeySkills(BaseModel):
+    title: str = "Key Skills"
+    items: List[KeySkillItem]
+
+class TitledItems(BaseModel):
+    title: str = ""
+    items: List[str]
+
 class OptionalItem(BaseModel):
     title: str
     items: List[str]
 
 class Resume(BaseModel):
-    summary: Dict[str, str]
+    summary: Summary
     personal_statement: str
     references: List[Dict[str, str]]
     career: List[CareerItem]
-    key_skills: Dict[str, List[KeySkillItem]]
-    education: Dict[str, List[str]]
-    languages: Dict[str, List[str]]
+    key_skills: KeySkills
+    education: TitledItems
+    languages: TitledItems
     optionals: Optional[List[OptionalItem]] = None
@@ -1,24 +1,31 @@
-# 🧮 Match Score Berechnungslogik – gemeinsam für alle Sprachen
 import tiktoken
+from functools import lru_cache
 
-def match_score_logic():
-    return '''
-        Berechne den Match-Score nach folgender Formel:
+DEFAULT_ENCODING = "cl100k_base"
 
-        - matching_skills_ratio = len(matching_skills) / (len(matching_skills) + len(missing_skills))
-        - additional_keywords_ratio = min(len(additional_keywords) / 10, 1)
-        - penalty_for_missing_skills = 1 - min(len(missing_skills) / 10, 1)
-
-        Dann:
-        total_score = round((matching_skills_ratio × 0.6 +
-                            additional_keywords_ratio × 0.2 +
-                            penalty_for_missing_skills × 0.2) × 100)
-        '''
+@lru_cache(maxsize=32)
+def get_encoding(model: str = "gpt-4"):
+    """
+    Liefert den tiktoken-Encoder für ein Modell, einmal pro Modell geladen und gecacht.
+    Unbekannte oder leere Modellnamen fallen auf cl100k_base zurück.
+    """
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(DEFAULT_ENCODING)
 
 def count_tokens(text: str, model: str = "gpt-4") -> int:
     """Hilfsfunktion zur Ermittlung der Token-Anzahl im gegebenen Text."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
\ No newline at end of file
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+def count_tokens_many(texts: list, model: str = "gpt-4", num_threads: int = 8) -> list:
+    """
+    Ermittelt die Token-Anzahl mehrerer Texte in einem Aufruf.
+    Nutzt encode_batch von tiktoken, das die Texte auf mehrere Threads verteilt.
+    """
+    if not texts:
+        return []
+    encoded = get_encoding(model).encode_batch(list(texts), num_threads=num_threads, disallowed_special=())
+    return [len(tokens) for tokens in encoded]
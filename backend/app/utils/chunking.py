@@ -0,0 +1,255 @@
+# ✂️ Zerlegung langer Rohtexte in Abschnitte und deterministisches Zusammenführen der Teilergebnisse
+import json
+import re
+from app.core.config import RESUME_SCHEMA, jobdescription_SCHEMA
+from app.utils.calc import count_tokens_many, get_encoding
+
+# Überschriften, an denen ein neuer Abschnitt beginnt (Zeilenanfang, normalisiert, de/en/pl)
+SECTION_HEADINGS = {
+    "resume": (
+        "profil", "kurzprofil", "zusammenfassung", "über mich", "summary", "profile", "about me", "podsumowanie", "o mnie",
+        "berufserfahrung", "berufliche erfahrung", "beruflicher werdegang", "werdegang", "praxiserfahrung",
+        "experience", "work experience", "professional experience", "employment", "career", "doświadczenie",
+        "ausbildung", "bildung", "studium", "education", "academic", "wykształcenie", "edukacja",
+        "kenntnisse", "fähigkeiten", "kompetenzen", "technologien", "skills", "technologies", "umiejętności",
+        "sprachen", "sprachkenntnisse", "languages", "języki",
+        "projekte", "projects", "projekty",
+        "zertifikate", "zertifizierungen", "weiterbildung", "certifications", "certificates", "certyfikaty",
+        "auszeichnungen", "awards", "nagrody",
+        "referenzen", "references", "referencje",
+        "hobbys", "hobbies", "interessen", "interests", "zainteresowania",
+    ),
+    "jobdescription": (
+        "über uns", "unternehmen", "about us", "company", "o nas",
+        "aufgaben", "ihre aufgaben", "deine aufgaben", "was dich erwartet", "responsibilities", "your tasks",
+        "what you will do", "obowiązki", "zakres obowiązków",
+        "profil", "ihr profil", "dein profil", "anforderungen", "qualifikationen", "was du mitbringst",
+        "requirements", "qualifications", "your profile", "what you bring", "wymagania",
+        "wir bieten", "was wir bieten", "benefits", "we offer", "what we offer", "oferujemy",
+        "bewerbung", "kontakt", "how to apply", "application", "contact", "aplikuj",
+    ),
+}
+
+# Schema, in dessen Form die Teilergebnisse zusammengeführt werden (nur diese Typen werden zerlegt)
+CHUNK_SCHEMAS = {
+    "resume": RESUME_SCHEMA,
+    "jobdescription": jobdescription_SCHEMA,
+}
+
+MAX_HEADING_LENGTH = 60
+MAX_ENTRY_LINE_LENGTH = 120
+
+# Beginn eines Werdegang-/Ausbildungseintrags, z. B. "03/2019 - heute", "2015 – 2018", "2020 to present"
+DATE_RANGE = re.compile(
+    r"(?:\b(?:0?[1-9]|1[0-2])[./])?(?:19|20)\d{2}\s*(?:-|–|—|bis|to|do)\s*"
+    r"(?:(?:(?:0?[1-9]|1[0-2])[./])?(?:19|20)\d{2}|heute|today|present|now|jetzt|obecnie)",
+    re.IGNORECASE
+)
+
+# Werte, die das Modell bei fehlenden Informationen aus dem Schema übernimmt
+PLACEHOLDERS = ("", "...", "…")
+
+# Felder, über die gleichartige Listeneinträge aus verschiedenen Teilen zusammengeführt werden
+IDENTITY_KEYS = (("category",), ("title",), ("position", "company"), ("skill",), ("name",))
+
+
+# ------------------------------------------------------------
+# Zerlegung
+# ------------------------------------------------------------
+def _normalize_heading(line: str) -> str:
+    return re.sub(r"[\s:•\-–|#*]+", " ", line).strip().casefold()
+
+
+def is_heading(line: str, headings: tuple) -> bool:
+    if not line.strip() or len(line.strip()) > MAX_HEADING_LENGTH:
+        return False
+    normalized = _normalize_heading(line)
+    return any(normalized == heading or normalized.startswith(heading + " ") for heading in headings)
+
+
+def _split_at(text: str, is_boundary) -> list:
+    """Teilt einen Text vor jeder Zeile, für die is_boundary(line) zutrifft."""
+    blocks, current = [], []
+    for line in text.splitlines():
+        if current and is_boundary(line):
+            blocks.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return [block for block in blocks if block.strip()]
+
+
+def split_sections(text: str, headings: tuple) -> list:
+    return _split_at(text, lambda line: is_heading(line, headings))
+
+
+def split_entries(text: str) -> list:
+    return _split_at(text, lambda line: len(line) <= MAX_ENTRY_LINE_LENGTH and DATE_RANGE.search(line) is not None)
+
+
+def split_paragraphs(text: str) -> list:
+    return [block for block in re.split(r"\n\s*\n", text) if block.strip()]
+
+
+def split_lines(text: str) -> list:
+    return [line for line in text.splitlines() if line.strip()]
+
+
+# Von grob nach fein: Einträge (Datumsbereiche), Absätze, Zeilen
+SPLITTERS = (split_entries, split_paragraphs, split_lines)
+
+
+def _split_tokens(text: str, budget: int, model: str) -> list:
+    """Letzter Ausweg für einzelne überlange Zeilen: hartes Teilen nach Tokens."""
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[start:start + budget]) for start in range(0, len(tokens), budget)]
+
+
+def _fit(text: str, budget: int, model: str, level: int = 0) -> list:
+    """Zerlegt einen Block so lange mit immer feineren Grenzen, bis jedes Stück ins Budget passt."""
+    if count_tokens_many([text], model)[0] <= budget:
+        return [text]
+    if level >= len(SPLITTERS):
+        return _split_tokens(text, budget, model)
+    parts = SPLITTERS[level](text)
+    if len(parts) <= 1:
+        return _fit(text, budget, model, level + 1)
+    return [piece for part in parts for piece in _fit(part, budget, model, level + 1)]
+
+
+def _pack(pieces: list, budget: int, model: str) -> list:
+    """Fasst aufeinanderfolgende Stücke gierig zu Chunks bis zum Budget zusammen (Reihenfolge bleibt erhalten)."""
+    chunks, current, current_tokens = [], [], 0
+    for piece, tokens in zip(pieces, count_tokens_many(pieces, model)):
+        if current and current_tokens + tokens > budget:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def chunk_text(text: str, document_type: str, budget: int, model: str) -> list:
+    """
+    Zerlegt einen Rohtext entlang erkannter Abschnittsgrenzen (Überschriften, dann Einträge
+    mit Datumsbereich, Absätze, Zeilen) in Chunks von höchstens `budget` Tokens.
+    Wird ein Abschnitt geteilt, beginnt jedes Folgestück mit seiner Überschrift,
+    damit das Modell den Kontext (z. B. Berufserfahrung) behält.
+    """
+    headings = SECTION_HEADINGS.get(document_type, ())
+    pieces = []
+    for section in split_sections(text, headings):
+        heading = section.splitlines()[0]
+        if not is_heading(heading, headings):
+            pieces.extend(_fit(section, budget, model))
+            continue
+        heading_tokens = count_tokens_many([heading], model)[0]
+        parts = _fit(section, max(budget - heading_tokens, 1), model)
+        pieces.extend([parts[0]] + [f"{heading}\n{part}" for part in parts[1:]])
+    return _pack(pieces, budget, model)
+
+
+# ------------------------------------------------------------
+# Zusammenführen
+# ------------------------------------------------------------
+def _is_empty(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip() in PLACEHOLDERS
+    if isinstance(value, dict):
+        return all(_is_empty(item) for item in value.values())
+    if isinstance(value, list):
+        return all(_is_empty(item) for item in value)
+    return False
+
+
+def skeleton(schema: str):
+    """Leere Struktur eines Schemas: Strings -> "", Listen -> [], Objekte rekursiv."""
+    def empty(node):
+        if isinstance(node, dict):
+            return {key: empty(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return []
+        return ""
+    return empty(json.loads(schema))
+
+
+def _identity(item):
+    if not isinstance(item, dict):
+        return None
+    for keys in IDENTITY_KEYS:
+        values = [item.get(key) for key in keys]
+        if all(isinstance(value, str) and not _is_empty(value) for value in values):
+            return (keys, tuple(value.strip().casefold() for value in values))
+    return None
+
+
+def _fingerprint(item) -> str:
+    if isinstance(item, str):
+        return item.strip().casefold()
+    return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+
+def _merge_lists(left: list, right: list) -> list:
+    merged = []
+    identities = {}
+    seen = set()
+    for item in left + right:
+        if _is_empty(item):
+            continue
+        identity = _identity(item)
+        if identity is not None and identity in identities:
+            index = identities[identity]
+            merged[index] = _merge(merged[index], item)
+            continue
+        fingerprint = _fingerprint(item)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        if identity is not None:
+            identities[identity] = len(merged)
+        merged.append(_clean(item))
+    return merged
+
+
+def _merge(left, right):
+    if isinstance(left, dict) and isinstance(right, dict):
+        merged = {key: _merge(value, right[key]) if key in right else value for key, value in left.items()}
+        for key, value in right.items():
+            if key not in merged:
+                merged[key] = _clean(value)
+        return merged
+    if isinstance(left, list) and isinstance(right, list):
+        return _merge_lists(left, right)
+    # Skalare: der erste nicht-leere Wert gewinnt (Reihenfolge der Chunks = Reihenfolge im Dokument)
+    return _clean(left) if not _is_empty(left) else _clean(right)
+
+
+def _clean(value):
+    """Entfernt Platzhalter ("...") und leere Listeneinträge, die das Modell aus dem Schema übernommen hat."""
+    if isinstance(value, str):
+        return "" if value.strip() in PLACEHOLDERS else value
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return _merge_lists([], value)
+    return value
+
+
+def merge_structured(parts: list, schema: str) -> dict:
+    """
+    Führt die Teilergebnisse der Chunks deterministisch in der Form des Schemas zusammen:
+      - Objekte rekursiv, Skalare: erster nicht-leerer Wert
+      - Listen: in Chunk-Reihenfolge aneinandergehängt, Duplikate entfernt; Einträge mit gleicher
+        Identität (category, title, position+company, ...) werden zu einem Eintrag zusammengeführt
+    """
+    merged = skeleton(schema)
+    for part in parts:
+        if isinstance(part, dict):
+            merged = _merge(merged, part)
+    return merged
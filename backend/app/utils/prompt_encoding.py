@@ -0,0 +1,79 @@
+# 🗜️ Kompakte Serialisierung der Prompt-Eingaben
+import json
+import random
+from functools import lru_cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.utils.calc import count_tokens_many
+
+
+def strip_empty(value):
+    """Entfernt rekursiv leere Werte ("", None, [], {}) aus dicts und Listen."""
+    if isinstance(value, dict):
+        stripped = {key: strip_empty(item) for key, item in value.items()}
+        return {key: item for key, item in stripped.items() if item not in ("", None, [], {})}
+    if isinstance(value, list):
+        stripped = [strip_empty(item) for item in value]
+        return [item for item in stripped if item not in ("", None, [], {})]
+    return value
+
+
+def compact_json(value, strip: bool = True) -> str:
+    """Minifiziertes JSON ohne Einrückung, standardmäßig ohne leere Felder."""
+    if strip:
+        value = strip_empty(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+@lru_cache(maxsize=None)
+def compact_schema(schema: str) -> str:
+    """Minifiziert ein JSON-Schema aus app.core.config (Struktur und leere Platzhalter bleiben erhalten)."""
+    try:
+        return json.dumps(json.loads(schema), ensure_ascii=False, separators=(",", ":"))
+    except json.JSONDecodeError:
+        return schema.strip()
+
+
+class PromptEncoder:
+    """
+    Kodiert die Eingaben eines Prompt-Builders kompakt und merkt sich zum Vergleich die
+    bisherige Darstellung (json.dumps mit indent=2).
+
+    report() zählt die Tokens beider Varianten in einem Batch, addiert die vorberechneten
+    Tokens des System-Prompts (siehe app.prompts.registry) und schreibt sie unter
+    prompt.<name>.tokens_before / prompt.<name>.tokens_after in die Metriken (/metrics).
+    Gemessen wird nur eine Stichprobe (PROMPT_TOKEN_SAMPLE_RATE), prompt.<name>.calls zählt
+    die gemessenen Prompts; für alle übrigen entfallen Vergleichs-Serialisierung und Tokenisierung.
+    """
+
+    def __init__(self, name: str, sample_rate: float = None):
+        self.name = name
+        rate = settings.PROMPT_TOKEN_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.sampled = random.random() < rate
+        self._before = []
+        self._after = []
+        self._static_before = 0
+        self._static_after = 0
+
+    def json(self, value, strip: bool = True) -> str:
+        encoded = compact_json(value, strip=strip)
+        if not self.sampled:
+            return encoded
+        self._before.append(json.dumps(value, ensure_ascii=False, indent=2))
+        self._after.append(encoded)
+        return encoded
+
+    def prefix(self, system_prompt):
+        """Übernimmt die vorberechneten Token-Zahlen eines SystemPrompt aus der Registry."""
+        self._static_before += system_prompt.legacy_tokens
+        self._static_after += system_prompt.tokens
+        return system_prompt
+
+    def report(self, model: str = "gpt-4"):
+        if not self.sampled:
+            return
+        before, after = len(self._before), len(self._after)
+        counts = count_tokens_many(self._before + self._after, model)
+        metrics.incr(f"prompt.{self.name}.calls")
+        metrics.incr(f"prompt.{self.name}.tokens_before", self._static_before + sum(counts[:before]))
+        metrics.incr(f"prompt.{self.name}.tokens_after", self._static_after + sum(counts[before:before + after]))
@@ -1,42 +1,3 @@
-# 🧮 ATS Berechnungslogik – gemeinsam für alle Sprachen
-def match_score_logic(lang='en'):
-    if lang == 'en':
-        return '''
-        Calculate the match score using the following formula:
-        - matching_skills_ratio = len(matching_skills) / (len(matching_skills) + len(missing_skills))
-        - additional_keywords_ratio = min(len(additional_keywords) / 10, 1)
-        - penalty_for_missing_skills = 1 - min(len(missing_skills) / 10, 1)
-
-        Then:
-        total_score = round((matching_skills_ratio × 0.6 +
-                            additional_keywords_ratio × 0.2 +
-                            penalty_for_missing_skills × 0.2) × 100)
-        '''
-    elif lang == 'de':  # German
-        return '''
-            Berechne den Match-Score nach folgender Formel:
-            - matching_skills_ratio = len(matching_skills) / (len(matching_skills) + len(missing_skills))
-            - additional_keywords_ratio = min(len(additional_keywords) / 10, 1)
-            - penalty_for_missing_skills = 1 - min(len(missing_skills) / 10, 1)
-
-            Dann:
-            total_score = round((matching_skills_ratio × 0.6 +
-                                additional_keywords_ratio × 0.2 +
-                                penalty_for_missing_skills × 0.2) × 100)
-            '''
-    elif lang == 'pl':  # Polish
-        return '''
-            Oblicz wynik dopasowania za pomocą następującego wzoru:
-            - matching_skills_ratio = len(matching_skills) / (len(matching_skills) + len(missing_skills))
-            - additional_keywords_ratio = min(len(additional_keywords) / 10, 1)
-            - penalty_for_missing_skills = 1 - min(len(missing_skills) / 10, 1)
-
-            Następnie:
-            total_score = round((matching_skills_ratio × 0.6 +
-                                additional_keywords_ratio × 0.2 +
-                                penalty_for_missing_skills × 0.2) × 100)
-            '''
-
 # ------------------------
 # SYSTEM PROMPTS
 # ------------------------
@@ -186,7 +147,6 @@ def system_prompt_resume_analysis_before_optimize():
             "intro": "You are a highly advanced resume optimization assistant.",
             "input_desc": "You will receive:\n1) An existing resume in JSON format\n2) Some improvement suggestions (keywords, bullet points, instructions)",
             "ats_logic": "⚖️ Calculation logic for ATS score:\n- keyword_density (40%)\n- skill_alignment (40%)\n- format_compliance (20%)",
-            "match_logic": "⚖️ Match score logic (standardized):\n" + match_score_logic('en'),
             "instructions": """
             Your task:
             1) Integrate the suggestions into the resume where appropriate.
@@ -201,7 +161,6 @@ def system_prompt_resume_analysis_before_optimize():
             "intro": "Du bist ein hochmoderner Assistent zur Optimierung von Lebensläufen (Resume).",
             "input_desc": "Du erhältst:\n1) Einen bestehenden Lebenslauf im JSON-Format\n2) Einige Verbesserungsvorschläge (Keywords, Bullet-Points, Instruktionen)",
             "ats_logic": "⚖️ Rechenlogik für ATS-Score:\n- keyword_density (40 %)\n- skill_alignment (40 %)\n- format_compliance (20 %)",
-            "match_logic": "⚖️ Rechenlogik für Match-Score (standardisiert):\n" +  match_score_logic('de'),
             "instructions": """
             Deine Aufgabe:
             1) Integriere die Vorschläge in den Lebenslauf, wo es sinnvoll ist.
@@ -216,7 +175,6 @@ def system_prompt_resume_analysis_before_optimize():
             "intro": "Jesteś nowoczesnym asystentem do optymalizacji CV.",
             "input_desc": "Otrzymasz:\n1) Istniejące CV w formacie JSON\n2) Kilka sugestii dotyczących ulepszeń (słowa kluczowe, punkty listy, instrukcje)",
             "ats_logic": "⚖️ Logika obliczania wyniku ATS:\n- keyword_density (40%)\n- skill_alignment (40%)\n- format_compliance (20%)",
-            "match_logic": "⚖️ Logika punktacji dopasowania (standaryzowana):\n" +  match_score_logic('pl'),
             "instructions": """
             Twoje zadanie:
             1) Zintegruj sugestie w CV tam, gdzie ma to sens.
@@ -238,12 +196,11 @@ def system_prompt_resume_analysis_after_optimize():
             "intro": "You are an advanced ATS and recruiting expert. You will be analyzing a resume that has already been optimized to improve its ATS performance.",
             "input_desc": "You will receive:\n1) A job description (JSON)\n2) A cover letter (JSON)\n3) An optimized resume as formatted text (no JSON!), with `(*SUGGESTION*)` markers.",
             "ats_logic": "⚖️ Calculation logic for ATS score:\n- keyword_density (40%)\n- skill_alignment (40%)\n- format_compliance (20%)",
-            "match_logic": "⚖️ Match score logic (standardized):\n" + match_score_logic('en'),
             "instructions": 
                 """
                 Your task:
                 1) Re-evaluate the optimized resume and calculate an updated ATS score (keyword_density × 0.4 + skill_alignment × 0.4 + format_compliance × 0.2).
-                2) Recalculate the match score using the logic above.
+                2) Determine matching_skills, missing_skills and additional_keywords for the match score again (leave total_score at 0, it is calculated automatically).
                 3) Provide a new recruiter evaluation.
                 4) Give updated improvement suggestions (resume, coverletter, overall).
                 5) Create a summary with clear reference to the improvements and their impact.
@@ -263,11 +220,10 @@ def system_prompt_resume_analysis_after_optimize():
             "intro": "Du bist ein fortschrittlicher ATS- und Recruiting-Experte. Du analysierst einen Lebenslauf, der bereits gezielt optimiert wurde, um die ATS-Leistung zu verbessern.",
             "input_desc": "Du erhältst:\n1) Eine Stellenbeschreibung (JSON)\n2) Ein Anschreiben (JSON)\n3) Einen optimierten Lebenslauf als formatierten Text (kein JSON!), mit `(*SUGGESTION*)`-Markierungen.",
             "ats_logic": "⚖️ Rechenlogik für ATS-Score:\n- keyword_density (40 %)\n- skill_alignment (40 %)\n- format_compliance (20 %)",
-            "match_logic": "⚖️ Rechenlogik für Match-Score (standardisiert):\n" +  match_score_logic('de'),
             "instructions": """
             Deine Aufgabe:
             1) Bewerte den optimierten Lebenslauf neu und berechne einen aktualisierten ATS-Score (keyword_density × 0.4 + skill_alignment × 0.4 + format_compliance × 0.2).
-            2) Berechne einen neuen Match-Score basierend auf der obigen Logik.
+            2) Ermittle matching_skills, missing_skills und additional_keywords für den Match-Score neu (total_score bleibt 0, er wird automatisch berechnet).
             3) Erstelle eine neue Recruiter-Einschätzung.
             4) Gib aktualisierte Verbesserungsvorschläge (resume, coverletter, overall).
             5) Erstelle eine Zusammenfassung, die auf die Verbesserungen und deren Wirkung eingeht.
@@ -286,11 +242,10 @@ def system_prompt_resume_analysis_after_optimize():
             "intro": "Jesteś zaawansowanym ekspertem ATS. Przeanalizujesz zoptymalizowane CV, które zostało poprawione pod kątem wydajności ATS.",
             "input_desc": "Otrzymasz:\n1) Opis stanowiska (JSON)\n2) List motywacyjny (JSON)\n3) Zoptymalizowane CV jako sformatowany tekst (bez JSON!), z oznaczeniami `(*SUGGESTION*)`.",
             "ats_logic": "⚖️ Logika obliczania wyniku ATS:\n- keyword_density (40%)\n- skill_alignment (40%)\n- format_compliance (20%)",
-            "match_logic": "⚖️ Logika punktacji dopasowania (standaryzowana):\n" +  match_score_logic('pl'),
             "instructions": """
             Twoje zadanie:
             1) Oceń zoptymalizowane CV i oblicz zaktualizowany wynik ATS (keyword_density × 0.4 + skill_alignment × 0.4 + format_compliance × 0.2).
-            2) Oblicz ponownie wynik dopasowania zgodnie z powyższą logiką.
+            2) Określ ponownie matching_skills, missing_skills i additional_keywords dla wyniku dopasowania (pozostaw total_score jako 0, jest obliczany automatycznie).
             3) Stwórz nową ocenę rekrutera.
             4) Podaj aktualne sugestie ulepszeń (resume, coverletter, overall).
             5) Utwórz podsumowanie z uwzględnieniem wpływu ulepszeń.
@@ -313,11 +268,10 @@ def system_prompt_resume_coverletter_analysis_after_optimize_part_resume():
             "intro": "Du bist ein fortschrittlicher ATS- und Recruiting-Experte. Du analysierst einen Lebenslauf und ein Anschreiben, die bereits gezielt optimiert wurden, um die ATS-Leistung zu verbessern.",
             "input_desc": "Du erhältst:\n1) Eine Stellenbeschreibung (JSON)\n2) Ein optimiertes Anschreiben als formatierten Text (kein JSON!), mit `(*SUGGESTION*)`-Markierungen.\n3) Einen optimierten Lebenslauf als formatierten Text (kein JSON!), mit `(*SUGGESTION*)`-Markierungen.\n4) Verbesserungsvorschläge.",
             "ats_logic": "⚖️ Rechenlogik für ATS-Score:\n- keyword_density (40 %)\n- skill_alignment (40 %)\n- format_compliance (20 %)",
-            "match_logic": "⚖️ Rechenlogik für Match-Score (standardisiert):\n" + match_score_logic('de'),
             "instructions": """
 Deine Aufgabe:
 1) Bewerte den optimierten Lebenslauf neu und berechne einen aktualisierten ATS-Score (keyword_density × 0.4 + skill_alignment × 0.4 + format_compliance × 0.2).
-2) Berechne einen neuen Match-Score basierend auf der obigen Logik.
+2) Ermittle matching_skills, missing_skills und additional_keywords für den Match-Score neu (total_score bleibt 0, er wird automatisch berechnet).
 3) Erstelle eine neue Recruiter-Einschätzung.
 4) Gib aktualisierte Verbesserungsvorschläge für den Lebenslauf.
 5) Bewerte das Anschreiben hinsichtlich Ton, Klarheit und Relevanz.
@@ -339,11 +293,10 @@ Wichtig:
             "intro": "You are an advanced ATS and recruiting expert. You will analyze a resume and cover letter that have already been optimized to improve ATS performance.",
             "input_desc": "You will receive:\n1) A job description (JSON)\n2) An optimized cover letter as formatted text (not JSON), with `(*SUGGESTION*)` markers.\n3) An optimized resume as formatted text (not JSON), with `(*SUGGESTION*)` markers.\n4) Improvement suggestions.",
             "ats_logic": "⚖️ Calculation logic for ATS score:\n- keyword_density (40%)\n- skill_alignment (40%)\n- format_compliance (20%)",
-            "match_logic": "⚖️ Match score logic (standardized):\n" + match_score_logic('en'),
             "instructions": """
 Your task:
 1) Re-evaluate the optimized resume and calculate an updated ATS score (keyword_density × 0.4 + skill_alignment × 0.4 + format_compliance × 0.2).
-2) Recalculate the match score using the above logic.
+2) Determine matching_skills, missing_skills and additional_keywords for the match score again (leave total_score at 0, it is calculated automatically).
 3) Provide a new recruiter evaluation.
 4) Give updated improvement suggestions for the resume.
 5) Evaluate the cover letter regarding its tone, clarity, and relevance.
@@ -365,11 +318,10 @@ Important:
             "intro": "Jesteś zaawansowanym ekspertem ATS i rekrutacji. Przeanalizujesz zoptymalizowane CV oraz list motywacyjny, które zostały poprawione pod kątem wydajności ATS.",
             "input_desc": "Otrzymasz:\n1) Opis stanowiska (JSON)\n2) Zoptymalizowany list motywacyjny jako sformatowany tekst (bez JSON), z oznaczeniami `(*SUGGESTION*)`.\n3) Zoptymalizowane CV jako sformatowany tekst (bez JSON), z oznaczeniami `(*SUGGESTION*)`.\n4) Sugestie ulepszeń.",
             "ats_logic": "⚖️ Logika obliczania wyniku ATS:\n- keyword_density (40%)\n- skill_alignment (40%)\n- format_compliance (20%)",
-            "match_logic": "⚖️ Logika punktacji dopasowania (standaryzowana):\n" + match_score_logic('pl'),
             "instructions": """
 Twoje zadanie:
 1) Ponownie oceń zoptymalizowane CV i oblicz zaktualizowany wynik ATS (keyword_density × 0,4 + skill_alignment × 0,4 + format_compliance × 0,2).
-2) Oblicz ponownie wynik dopasowania zgodnie z powyższą logiką.
+2) Określ ponownie matching_skills, missing_skills i additional_keywords dla wyniku dopasowania (pozostaw total_score jako 0, jest obliczany automatycznie).
 3) Stwórz nową ocenę rekrutacyjną.
 4) Podaj aktualne sugestie ulepszeń dla CV.
 5) Oceń list motywacyjny pod kątem tonu, przejrzystości i relewantności.
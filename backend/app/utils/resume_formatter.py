@@ -2,11 +2,11 @@ def simplify_optimized_resume(resume: dict) -> str:
     lines = []
 
     # 1. Summary
-    summary = resume.get("summary", {})
+    summary = resume.get("summary") or {}
     if summary:
         lines.append("== SUMMARY ==")
         lines.append(summary.get("experience", ""))
-        lines.extend(summary.get("key_aspects", []))
+        lines.extend(summary.get("key_aspects") or [])
 
     # 2. Personal Statement
     if resume.get("personal_statement"):
@@ -18,29 +18,29 @@ def simplify_optimized_resume(resume: dict) -> str:
         lines.append("\n== CAREER ==")
         for job in resume["career"]:
             lines.append(f"\n→ {job.get('position')} @ {job.get('company')} ({job.get('time_period')})")
-            for t in job.get("tasks", []):
+            for t in job.get("tasks") or []:
                 lines.append(f"- {t}")
-            for a in job.get("achievements", []):
+            for a in job.get("achievements") or []:
                 lines.append(f"✓ {a}")
 
     # 4. Key Skills
     if resume.get("key_skills"):
         lines.append("\n== KEY SKILLS ==")
-        for group in resume["key_skills"].get("items", []):
+        for group in resume["key_skills"].get("items") or []:
             lines.append(f"{group.get('category')}:")
-            for skill in group.get("skills", []):
+            for skill in group.get("skills") or []:
                 lines.append(f"- {skill}")
 
     # 5. Education
     if resume.get("education"):
         lines.append("\n== EDUCATION ==")
-        for item in resume["education"].get("items", []):
+        for item in resume["education"].get("items") or []:
             lines.append(f"- {item}")
 
     # 6. Languages
     if resume.get("languages"):
         lines.append("\n== LANGUAGES ==")
-        for item in resume["languages"].get("items", []):
+        for item in resume["languages"].get("items") or []:
             lines.append(f"- {item}")
 
     # 7. Optionals (falls vorhanden)
@@ -48,7 +48,7 @@ def simplify_optimized_resume(resume: dict) -> str:
         lines.append("\n== OPTIONALE BEREICHE ==")
         for section in resume["optionals"]:
             lines.append(f"\n-- {section.get('title')} --")
-            for item in section.get("items", []):
+            for item in section.get("items") or []:
                 lines.append(f"- {item}")
 
     return "\n".join(line for line in lines if line.strip())
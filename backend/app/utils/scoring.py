@@ -0,0 +1,76 @@
+# 🧮 Match-Score-Berechnung – lokal und deterministisch statt im Prompt
+import math
+
+MATCHING_SKILLS_WEIGHT = 0.6
+ADDITIONAL_KEYWORDS_WEIGHT = 0.2
+MISSING_SKILLS_PENALTY_WEIGHT = 0.2
+SATURATION = 10  # Ab 10 zusätzlichen Keywords bzw. fehlenden Skills ist der jeweilige Anteil ausgeschöpft
+
+# Pfade, unter denen gespeicherte Analysen einen match_score enthalten
+MATCH_SCORE_PATHS = (
+    "analysisResult.resume.analysis.match_score",
+    "analysisResult.optimized.analysis.match_score",
+    "analysis.analysis.match_score",
+)
+
+
+def _round_half_up(value: float) -> int:
+    return int(math.floor(value + 0.5))
+
+
+def _count(value) -> int:
+    return len(value) if isinstance(value, list) else 0
+
+
+def compute_match_score(matching_count: int, missing_count: int, additional_count: int) -> int:
+    """
+    Berechnet match_score.total_score (0–100):
+
+        matching_skills_ratio = matching / (matching + missing)
+        additional_keywords_ratio = min(additional / 10, 1)
+        penalty_for_missing_skills = 1 - min(missing / 10, 1)
+        total_score = round((0.6 × matching_skills_ratio + 0.2 × additional_keywords_ratio
+                             + 0.2 × penalty_for_missing_skills) × 100)
+    """
+    return compute_match_scores([matching_count], [missing_count], [additional_count])[0]
+
+
+def compute_match_scores(matching_counts: list, missing_counts: list, additional_counts: list) -> list:
+    """
+    Batch-Variante von compute_match_score: rechnet spaltenweise über drei gleich lange
+    Listen von Zählern und liefert die total_scores in derselben Reihenfolge.
+    """
+    return [
+        _round_half_up((
+            (matching / (matching + missing) if matching + missing else 0.0) * MATCHING_SKILLS_WEIGHT
+            + min(additional / SATURATION, 1) * ADDITIONAL_KEYWORDS_WEIGHT
+            + (1 - min(missing / SATURATION, 1)) * MISSING_SKILLS_PENALTY_WEIGHT
+        ) * 100)
+        for matching, missing, additional in zip(matching_counts, missing_counts, additional_counts)
+    ]
+
+
+def apply_match_score(result: dict) -> dict:
+    """
+    Setzt analysis.match_score.total_score im Modell-Ergebnis anhand der zurückgegebenen
+    Listen matching_skills, missing_skills und additional_keywords. Ergebnisse ohne
+    match_score (z. B. raw_response, error oder "analysis" ist kein Objekt) bleiben unverändert.
+    """
+    match_score = get_path(result, "analysis.match_score")
+    if isinstance(match_score, dict):
+        match_score["total_score"] = compute_match_score(
+            _count(match_score.get("matching_skills")),
+            _count(match_score.get("missing_skills")),
+            _count(match_score.get("additional_keywords"))
+        )
+    return result
+
+
+def get_path(doc: dict, path: str):
+    """Liest einen Wert über einen Mongo-Punktpfad (z. B. "analysisResult.resume.analysis") aus."""
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
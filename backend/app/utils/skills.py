@@ -0,0 +1,247 @@
+# 🔎 Lokales Skill-Matching zwischen Lebenslauf und Stellenbeschreibung (ohne LLM)
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import NamedTuple
+from app.utils.resume_formatter import simplify_optimized_resume
+
+# Normalisierte Skill-Bezeichnung -> Aliase (ebenfalls normalisiert)
+SKILL_ALIASES = {
+    "javascript": ["js", "ecmascript"],
+    "typescript": ["ts"],
+    "python": ["python3"],
+    "java": [],
+    "c#": ["csharp", "c sharp"],
+    "c++": ["cpp"],
+    "go": ["golang"],
+    "node.js": ["nodejs", "node js"],
+    "react": ["react.js", "reactjs"],
+    "angular": ["angularjs", "angular.js"],
+    "vue.js": ["vue", "vuejs"],
+    "next.js": ["nextjs"],
+    "fastapi": [],
+    "django": [],
+    "flask": [],
+    "spring boot": ["springboot"],
+    ".net": ["dotnet", "asp.net"],
+    "sql": [],
+    "postgresql": ["postgres", "psql"],
+    "mysql": [],
+    "mongodb": ["mongo"],
+    "redis": [],
+    "elasticsearch": ["elastic search"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "terraform": [],
+    "ansible": [],
+    "amazon web services": ["aws"],
+    "microsoft azure": ["azure"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "ci/cd": ["cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "git": ["github", "gitlab"],
+    "jenkins": [],
+    "linux": [],
+    "rest api": ["rest", "restful", "rest apis"],
+    "graphql": [],
+    "machine learning": ["ml", "maschinelles lernen"],
+    "artificial intelligence": ["ai", "ki", "künstliche intelligenz"],
+    "data science": [],
+    "pandas": [],
+    "tensorflow": [],
+    "pytorch": [],
+    "scrum": [],
+    "kanban": [],
+    "agile": ["agil", "agile methoden", "agile methods"],
+    "jira": [],
+    "confluence": [],
+    "sap": [],
+    "excel": ["ms excel", "microsoft excel"],
+    "power bi": ["powerbi"],
+    "tableau": [],
+    "project management": ["projektmanagement", "zarządzanie projektami"],
+}
+
+
+def normalize_skill(text: str) -> str:
+    """Normalisiert Skill-Bezeichnungen und Texte für den Vergleich (NFKC, casefold, Whitespace)."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in "+#"
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick-Automat für die Suche vieler Begriffe in einem Durchlauf über den Text.
+    Treffer zählen nur an Wortgrenzen, damit z. B. "java" nicht in "javascript" gefunden wird.
+    """
+
+    def __init__(self, patterns: dict):
+        # patterns: normalisierter Suchbegriff -> Wert, der bei einem Treffer geliefert wird
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for pattern, value in patterns.items():
+            if pattern:
+                self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern: str, value):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((len(pattern), value))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> set:
+        """Liefert die Werte aller Begriffe, die im (normalisierten) Text vorkommen."""
+        found = set()
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                start = i - length + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[i + 1] if i + 1 < len(text) else " "
+                if not _is_word_char(before) and not _is_word_char(after):
+                    found.add(value)
+        return found
+
+
+@lru_cache(maxsize=1)
+def _dictionary_matcher() -> AhoCorasick:
+    """Automat über alle bekannten Skills und Aliase, liefert die kanonische Bezeichnung."""
+    patterns = {}
+    for canonical, aliases in SKILL_ALIASES.items():
+        patterns[canonical] = canonical
+        for alias in aliases:
+            patterns[alias] = canonical
+    return AhoCorasick(patterns)
+
+
+def _skill_patterns(skill: str) -> set:
+    """Suchbegriffe für einen Skill der Stellenbeschreibung: die Bezeichnung selbst plus bekannte Skills darin samt Aliasen."""
+    normalized = normalize_skill(skill)
+    patterns = {normalized}
+    for canonical in _dictionary_matcher().find(normalized):
+        patterns.add(canonical)
+        patterns.update(SKILL_ALIASES[canonical])
+    return patterns
+
+
+def resume_skills(resume: dict) -> list:
+    """Skills aus key_skills und career[].tools_technologies, ohne Duplikate, in Original-Schreibweise."""
+    skills = []
+    for group in (resume.get("key_skills") or {}).get("items") or []:
+        skills.extend(group.get("skills") or [])
+    for job in resume.get("career") or []:
+        skills.extend(job.get("tools_technologies") or [])
+
+    seen = set()
+    unique = []
+    for skill in skills:
+        if not isinstance(skill, str):
+            continue
+        key = normalize_skill(skill)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(skill)
+    return unique
+
+
+def resume_text(resume: dict) -> str:
+    """Vereinfachter Lebenslauftext inklusive tools_technologies, normalisiert für die Suche."""
+    tools = [
+        tool for job in resume.get("career") or [] for tool in job.get("tools_technologies") or []
+        if isinstance(tool, str)
+    ]
+    return normalize_skill(simplify_optimized_resume(resume) + "\n" + "\n".join(tools))
+
+
+class SkillMatch(NamedTuple):
+    matching_skills: list
+    missing_skills: list
+    additional_keywords: list
+
+    def as_match_score(self) -> dict:
+        return {
+            "total_score": 0,
+            "matching_skills": self.matching_skills,
+            "missing_skills": self.missing_skills,
+            "additional_keywords": self.additional_keywords
+        }
+
+
+def skill_name(skill) -> str:
+    """
+    Bezeichnung eines Skills der Stellenbeschreibung. Der Prompt fordert pro Skill ein
+    importance_level, daher kommen Skills als String oder als Objekt ({"skill": ..., "importance_level": ...}).
+    """
+    if isinstance(skill, dict):
+        skill = skill.get("skill") or skill.get("name")
+    return skill.strip() if isinstance(skill, str) else ""
+
+
+def match_skills(resume: dict, job_description: dict) -> SkillMatch:
+    """
+    Vergleicht die hard_skills der Stellenbeschreibung mit dem Lebenslauf.
+
+    - matching_skills: Skills der Stelle, die im Lebenslauf vorkommen (inkl. Aliase)
+    - missing_skills: Skills der Stelle, die im Lebenslauf fehlen
+    - additional_keywords: Skills des Lebenslaufs, die die Stelle nicht fordert
+    """
+    job_skills = [
+        name for name in map(skill_name, (job_description.get("skills") or {}).get("hard_skills") or [])
+        if name
+    ]
+    pattern_skills = {}
+    for index, skill in enumerate(job_skills):
+        for pattern in _skill_patterns(skill):
+            pattern_skills.setdefault(pattern, set()).add(index)
+    matcher = AhoCorasick({pattern: pattern for pattern in pattern_skills})
+
+    found = set()
+    for pattern in matcher.find(resume_text(resume)):
+        found.update(pattern_skills[pattern])
+    matching = [skill for index, skill in enumerate(job_skills) if index in found]
+    missing = [skill for index, skill in enumerate(job_skills) if index not in found]
+
+    job_normalized = {normalize_skill(skill) for skill in job_skills}
+    job_canonicals = _dictionary_matcher().find("\n".join(job_normalized))
+    additional = []
+    for skill in resume_skills(resume):
+        normalized = normalize_skill(skill)
+        canonicals = _dictionary_matcher().find(normalized)
+        if normalized in job_normalized or (canonicals and canonicals <= job_canonicals):
+            continue
+        additional.append(skill)
+
+    return SkillMatch(matching, missing, additional)
+
+
+def merge_skill_match(result: dict, skill_match: SkillMatch) -> dict:
+    """Übernimmt die lokal ermittelten Skill-Listen als analysis.match_score in das Modell-Ergebnis."""
+    if isinstance(result, dict) and isinstance(result.get("analysis"), dict):
+        result["analysis"]["match_score"] = skill_match.as_match_score()
+    return result
@@ -0,0 +1,92 @@
+import json
+from fastapi.responses import StreamingResponse
+
+
+class CleanupStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse, die nach dem Senden immer `cleanup()` aufruft – auch wenn der Client
+    abbricht, bevor der Generator startet (dessen finally liefe dann nie) oder Starlette den
+    Hintergrund-Task wegen eines Verbindungsabbruchs überspringt.
+    """
+
+    def __init__(self, content, cleanup, **kwargs):
+        super().__init__(content, **kwargs)
+        self._cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._cleanup()
+
+
+def sse_event(event: str, data) -> str:
+    """Formatiert ein Server-Sent-Event mit JSON-Payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class JsonSectionParser:
+    """
+    Inkrementeller Parser für ein JSON-Objekt, das als Token-Stream eintrifft.
+
+    feed() nimmt das nächste Textstück entgegen und liefert alle Top-Level-Abschnitte
+    (z. B. "summary", "career", "key_skills"), deren Wert seit dem letzten Aufruf
+    vollständig geworden ist, als Liste von (key, value)-Tupeln.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key_end = None
+        self._key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> list:
+        self._text += chunk
+        sections = []
+
+        while self._pos < len(self._text):
+            i = self._pos
+            char = self._text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key_end = i + 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = i
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0 and self._value_start is not None:
+                    self._finish_section(i, sections)
+            elif char == ":" and self._depth == 1 and self._value_start is None:
+                self._key = json.loads(self._text[self._key_start:self._key_end])
+                self._value_start = i + 1
+            elif char == "," and self._depth == 1 and self._value_start is not None:
+                self._finish_section(i, sections)
+
+        return sections
+
+    def _finish_section(self, end: int, sections: list):
+        raw_value = self._text[self._value_start:end].strip()
+        self._value_start = None
+        try:
+            sections.append((self._key, json.loads(raw_value)))
+        except json.JSONDecodeError:
+            pass
@@ -0,0 +1,91 @@
+import os
+import asyncio
+import pytest
+from bson import ObjectId
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MONGODB_URI = os.getenv("MONGODB_URI")
+TEST_USER_ID = "fff3a8923a9c3b6e12345678"
+
+def hot_queries():
+    """Häufige Abfragen der Router: (Collection-Property, Filter, Sortierung)."""
+    from app.core.stats import OPTIMIZED_QUERY
+
+    return [
+        ("collection_resume", {"userId": TEST_USER_ID}, None),
+        # Zählung optimierter Lebensläufe in UserStatsService.compute()
+        ("collection_resume", {"userId": TEST_USER_ID, **OPTIMIZED_QUERY}, None),
+        ("collection_resume", {"userId": TEST_USER_ID, "_id": {"$gt": ObjectId("000000000000000000000000")}}, [("_id", 1)]),
+        ("collection_coverletter", {"userId": TEST_USER_ID}, [("_id", 1)]),
+        ("collection_jobdesc", {"userId": TEST_USER_ID}, [("_id", 1)]),
+        ("collection_analysis", {"userId": TEST_USER_ID}, [("createdAt", -1)]),
+        ("collection_analysis", {"resumeId": "67ddec795be8f80d1458c770"}, None),
+        ("collection_analysis", {"jobdescriptionId": "67ddec795be8f80d1458c770"}, None),
+    ]
+
+
+def find_stages(plan, stage):
+    """Sucht rekursiv nach einer Stage (z. B. COLLSCAN) im Query-Plan."""
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            return True
+        return any(find_stages(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(find_stages(item, stage) for item in plan)
+    return False
+
+
+def covering_index(collection: str, query: dict, sort: list):
+    """
+    Sucht in der Index-Registry einen Index, dessen Präfix genau die Filter- und Sortierfelder
+    der Abfrage enthält (Gleichheitsfelder zuerst). Funktioniert ohne laufende MongoDB.
+    """
+    from app.core.indexes import INDEXES
+
+    equality = {field for field, value in query.items() if not isinstance(value, dict)}
+    rest = [field for field, value in query.items() if isinstance(value, dict)] + [field for field, _ in sort or []]
+    for spec in INDEXES:
+        if spec.collection != collection:
+            continue
+        fields = [field for field, _ in spec.keys]
+        prefix = fields[:len(equality | set(rest))]
+        if set(prefix[:len(equality)]) == equality and set(prefix[len(equality):]) == set(rest):
+            return spec
+    return None
+
+
+async def explain_hot_queries():
+    from app.core.database import db
+    from app.core.indexes import ensure_indexes
+
+    db.connect()
+    try:
+        await ensure_indexes()
+        plans = []
+        for collection, query, sort in hot_queries():
+            cursor = getattr(db, collection).find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            explain = await cursor.explain()
+            plans.append((collection, query, explain["queryPlanner"]["winningPlan"]))
+        return plans
+    finally:
+        await db.close()
+
+
+def test_hot_queries_are_covered_by_registry():
+    for collection, query, sort in hot_queries():
+        assert covering_index(collection, query, sort), f"Kein Index in INDEXES für {collection}: {query} {sort or ''}"
+
+
+@pytest.mark.skipif(not MONGODB_URI, reason="MONGODB_URI nicht gesetzt")
+def test_hot_queries_use_indexes():
+    try:
+        plans = asyncio.run(explain_hot_queries())
+    except Exception as e:
+        pytest.skip(f"MongoDB nicht erreichbar: {e}")
+
+    for collection, query, plan in plans:
+        assert not find_stages(plan, "COLLSCAN"), f"Collection-Scan auf {collection} für {query}"
@@ -0,0 +1,29 @@
+import pytest
+from app.utils.scoring import apply_match_score, compute_match_score
+
+
+def test_apply_match_score_sets_total_score():
+    result = {"analysis": {"match_score": {
+        "matching_skills": ["Python", "SQL", "Docker"],
+        "missing_skills": ["Kubernetes"],
+        "additional_keywords": ["Git"],
+        "total_score": 99
+    }}}
+    apply_match_score(result)
+    assert result["analysis"]["match_score"]["total_score"] == compute_match_score(3, 1, 1)
+
+
+@pytest.mark.parametrize("result", [
+    None,
+    "x",
+    [1],
+    {"raw_response": "kein JSON"},
+    {"analysis": None},
+    {"analysis": "x"},
+    {"analysis": [1]},
+    {"analysis": {"match_score": None}},
+    {"analysis": {"match_score": "x"}},
+])
+def test_apply_match_score_ignores_malformed_results(result):
+    # Fehlerhafte Modell-Ausgaben bleiben unverändert (Status analysis_incomplete statt HTTP 500)
+    assert apply_match_score(result) == result
@@ -0,0 +1,63 @@
+from app.utils.skills import match_skills, merge_skill_match, skill_name
+
+# Ausgabeform von prompts/prompt_jobdescription.py: hard_skills mit importance_level pro Skill
+JOB_DESCRIPTION = {
+    "job_title": "Backend Developer",
+    "skills": {
+        "hard_skills": [
+            {"skill": "Python", "importance_level": "must_have"},
+            {"skill": "Kubernetes", "importance_level": "must_have"},
+            {"name": "PostgreSQL", "importance_level": "recommended"},
+        ],
+        "soft_skills": [
+            {"skill": "Teamfähigkeit", "importance_level": "recommended"},
+        ],
+    },
+}
+
+RESUME = {
+    "summary": {"experience": "8 Jahre Backend-Entwicklung", "key_aspects": ["APIs"]},
+    "career": [
+        {
+            "position": "Developer",
+            "company": "Firma A",
+            "time_period": "2018 - heute",
+            "tasks": ["REST-APIs mit FastAPI"],
+            "achievements": [],
+            "tools_technologies": ["Python3", "Postgres"],
+        },
+        {"position": "Werkstudent", "company": "Firma B", "tools_technologies": None},
+    ],
+    "key_skills": {"title": "Key Skills", "items": [{"category": "Tools", "skills": ["Docker"]}]},
+}
+
+
+def test_skill_name_accepts_strings_and_objects():
+    assert skill_name(" Python ") == "Python"
+    assert skill_name({"skill": "Python", "importance_level": "must_have"}) == "Python"
+    assert skill_name({"name": "Go"}) == "Go"
+    assert skill_name({"importance_level": "must_have"}) == ""
+    assert skill_name(None) == ""
+
+
+def test_match_skills_with_prompt_output_shape():
+    match = match_skills(RESUME, JOB_DESCRIPTION)
+
+    assert match.matching_skills == ["Python", "PostgreSQL"]
+    assert match.missing_skills == ["Kubernetes"]
+    assert match.additional_keywords == ["Docker"]
+
+
+def test_match_skills_tolerates_null_lists():
+    resume = {"career": [{"tools_technologies": None}], "key_skills": {"items": None}}
+    match = match_skills(resume, {"skills": {"hard_skills": None}})
+
+    assert match == ([], [], [])
+
+
+def test_merge_skill_match_overwrites_match_score():
+    result = {"analysis": {"match_score": {"total_score": 50, "matching_skills": ["x"]}}}
+    merge_skill_match(result, match_skills(RESUME, JOB_DESCRIPTION))
+
+    assert result["analysis"]["match_score"]["matching_skills"] == ["Python", "PostgreSQL"]
+    assert result["analysis"]["match_score"]["missing_skills"] == ["Kubernetes"]